@@ -2,6 +2,24 @@
 # This CLI simulates the CoinGrok input processing pipeline.
 # It currently runs locally. Later this logic will move into a FastAPI backend.
 
+import re
+
+# Sentence-mode query: "Analyze <coin> in <timeframe> with $<budget>"
+_INPUT_RE = re.compile(r"\s*analyze\s+(\S+)\s+in\s+(\S+)\s+with\s+\$?(\S+)", re.IGNORECASE)
+
+# Final prompt template, rendered with the parsed coin/timeframe/budget
+_PROMPT_TEMPLATE = """You are an AI crypto assistant. Analyze {coin} over the last {timeframe} with an investment budget of ${budget}.
+
+Use Grok tools to return:
+1. Sentiment from X (Twitter)
+2. News overview from CoinGecko/CMC
+3. Market snapshot (price, volume, volatility)
+4. Buy/Sell Recommendation
+5. Risk Score (1–10)
+
+Disclaimer: This is not financial advice.
+"""
+
 def get_input_method():
     print("\n[Deconstruct] Select input mode:")
     print("1 - Full sentence (e.g., 'Analyze ETH in 7d with $300')")
@@ -19,7 +37,7 @@ def get_sentence_input():
 
 def get_form_input():
     print("[Deconstruct] Collecting fields manually...")
-    coin = input("Enter coin symbol (e.g., ETH): ").upper().strip() or "ETH"
+    coin = input("Enter coin symbol (e.g., ETH): ").strip().upper() or "ETH"
     timeframe = input("Enter timeframe (e.g., 7d or 48h): ").strip() or "7d"
     budget = input("Enter budget (e.g., 300): ").strip() or "300"
     return f"Analyze {coin} in {timeframe} with ${budget}"
@@ -27,13 +45,13 @@ def get_form_input():
 
 def deconstruct(user_input):
     print("[Deconstruct] Parsing input...")
-    words = user_input.lower().split()
+    match = _INPUT_RE.match(user_input)
 
-    try:
-        coin = words[1].upper()
-        timeframe = words[3]
-        budget = words[5].replace('$', '')
-    except IndexError:
+    if match:
+        coin = match.group(1).upper()
+        timeframe = match.group(2).lower()
+        budget = match.group(3)
+    else:
         print("[Diagnose] Could not parse input, using defaults.")
         coin, timeframe, budget = "ETH", "7d", "300"
 
@@ -50,17 +68,7 @@ def diagnose(parsed_input):
 
 def develop(final_input):
     print("[Develop] Building final prompt...")
-    return f"""You are an AI crypto assistant. Analyze {final_input['coin']} over the last {final_input['timeframe']} with an investment budget of ${final_input['budget']}.
-
-Use Grok tools to return:
-1. Sentiment from X (Twitter)
-2. News overview from CoinGecko/CMC
-3. Market snapshot (price, volume, volatility)
-4. Buy/Sell Recommendation
-5. Risk Score (1–10)
-
-Disclaimer: This is not financial advice.
-"""
+    return _PROMPT_TEMPLATE.format_map(final_input)
 
 def deliver(prompt):
     print("[Deploy] Delivering final prompt...\n")
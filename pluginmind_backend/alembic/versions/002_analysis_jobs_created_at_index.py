@@ -0,0 +1,27 @@
+"""Index analysis_jobs.created_at
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-16
+
+Adds an index on analysis_jobs.created_at so the newest-first /jobs
+listing and the expired-job cleanup avoid full table scans. job_id is
+already covered by the unique ix_analysis_jobs_job_id index from 001.
+"""
+from alembic import op
+
+# revision identifiers
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Upgrade database schema - Index analysis job creation time."""
+    op.create_index(op.f('ix_analysis_jobs_created_at'), 'analysis_jobs', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade database schema - Drop analysis job creation time index."""
+    op.drop_index(op.f('ix_analysis_jobs_created_at'), table_name='analysis_jobs')
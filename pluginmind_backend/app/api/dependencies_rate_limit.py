@@ -5,6 +5,7 @@ Provides rate limiting functionality that can be applied to specific endpoints
 using FastAPI's dependency injection system.
 """
 
+from operator import itemgetter
 from typing import Optional
 from fastapi import Request, Response, HTTPException, Depends
 from fastapi.security import HTTPAuthorizationCredentials
@@ -13,13 +14,19 @@ from app.core.config import settings
 from app.core.logging import get_logger
 from app.utils.rate_limit import rate_limiter
 from app.utils.ip import extract_client_ip
-from app.middleware.auth import security, verify_google_id_token
+from app.middleware.auth import security, verify_google_id_token_async
 from app.core.exceptions import AuthenticationError
 
 logger = get_logger(__name__)
 
+# Rate limit settings bound once at import; settings are not reloaded at runtime
+_USER_LIMIT = settings.rate_limit_per_min
+_IP_LIMIT = settings.rate_limit_ip_per_min
+_IP_BURST = settings.rate_limit_ip_burst
+_IP_REFILL = settings.rate_limit_ip_per_min / 60.0
 
-def get_rate_limit_key(
+
+async def get_rate_limit_key(
     request: Request,
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)
 ) -> str:
@@ -27,7 +34,9 @@ def get_rate_limit_key(
     Generate rate limiting key based on authentication status.
     
     For authenticated users, use user ID. For unauthenticated requests,
-    use client IP address.
+    use client IP address. Declared ``async`` so FastAPI resolves it on the
+    event loop instead of dispatching it to the threadpool. The result is
+    memoized on request.state for the rest of the request.
     
     Args:
         request: FastAPI request object
@@ -36,18 +45,29 @@ def get_rate_limit_key(
     Returns:
         str: Rate limiting key in format "user:{id}" or "ip:{address}"
     """
+    # The key is fixed for a request; reuse it if already computed
+    cached_key = getattr(request.state, "rate_limit_key", None)
+    if cached_key is not None:
+        return cached_key
+    
     # Try to get authenticated user ID
-    if credentials and credentials.credentials:
+    user_id = getattr(request.state, "verified_user_id", None)
+    if user_id is None and credentials and credentials.credentials:
         try:
-            user_id = verify_google_id_token(credentials.credentials)
-            return f"user:{user_id}"
+            user_id = await verify_google_id_token_async(credentials.credentials)
+            request.state.verified_user_id = user_id
         except AuthenticationError:
             # Invalid token, fall back to IP-based limiting
             pass
     
-    # Fall back to IP-based rate limiting using hardened extraction
-    client_ip = extract_client_ip(request)
-    return f"ip:{client_ip}"
+    if user_id:
+        key = f"user:{user_id}"
+    else:
+        # Fall back to IP-based rate limiting using hardened extraction
+        key = f"ip:{extract_client_ip(request)}"
+    
+    request.state.rate_limit_key = key
+    return key
 
 
 async def rate_limiter_dependency(
@@ -70,11 +90,12 @@ async def rate_limiter_dependency(
     Raises:
         HTTPException: 429 if rate limit is exceeded
     """
-    # Check if user is authenticated
-    user_id = None
-    if credentials and credentials.credentials:
+    # Check if user is authenticated, reusing any identity verified earlier in this request
+    user_id = getattr(request.state, "verified_user_id", None)
+    if user_id is None and credentials and credentials.credentials:
         try:
-            user_id = verify_google_id_token(credentials.credentials)
+            user_id = await verify_google_id_token_async(credentials.credentials)
+            request.state.verified_user_id = user_id
         except AuthenticationError:
             # Invalid token, user_id remains None
             pass
@@ -87,28 +108,28 @@ async def rate_limiter_dependency(
     if user_id:
         user_key = f"user:{user_id}"
         
-        # Check user limit (standard rates)
-        user_allowed, user_remaining, user_retry_after = await rate_limiter.consume(user_key, tokens=1)
-        
-        # Check IP limit (higher rates for authenticated users)
-        ip_allowed, ip_remaining, ip_retry_after = await rate_limiter.consume(
-            ip_key, 
-            tokens=1,
-            capacity_override=settings.rate_limit_ip_burst,
-            refill_rate_override=settings.rate_limit_ip_per_min / 60.0
+        # Check user limit (standard rates) and IP limit (higher rates for
+        # authenticated users) in a single atomic call
+        (user_allowed, user_remaining, user_retry_after), (ip_allowed, ip_remaining, ip_retry_after) = (
+            await rate_limiter.consume_many(
+                [
+                    (user_key, None, None),
+                    (ip_key, _IP_BURST, _IP_REFILL),
+                ],
+                tokens=1
+            )
         )
         
-        # Set headers based on most restrictive limit
-        if user_remaining < ip_remaining:
-            response.headers["X-RateLimit-Limit"] = str(settings.rate_limit_per_min)
-            response.headers["X-RateLimit-Remaining"] = str(user_remaining)
-            effective_retry_after = user_retry_after
-            limiting_type = "user"
-        else:
-            response.headers["X-RateLimit-Limit"] = str(settings.rate_limit_ip_per_min)
-            response.headers["X-RateLimit-Remaining"] = str(ip_remaining)
-            effective_retry_after = ip_retry_after
-            limiting_type = "ip"
+        # Set headers based on most restrictive limit (ties go to the IP limit)
+        candidates = (
+            (ip_remaining, _IP_LIMIT, ip_retry_after, "ip"),
+            (user_remaining, _USER_LIMIT, user_retry_after, "user"),
+        )
+        effective_remaining, effective_limit, effective_retry_after, limiting_type = min(
+            candidates, key=itemgetter(0)
+        )
+        response.headers["X-RateLimit-Limit"] = str(effective_limit)
+        response.headers["X-RateLimit-Remaining"] = str(effective_remaining)
         
         # Check if either limit exceeded
         if not user_allowed or not ip_allowed:
@@ -125,14 +146,14 @@ async def rate_limiter_dependency(
                 detail="Too many requests"
             )
         
-        logger.debug(f"Rate limit check passed for user {user_id} (user: {user_remaining}, ip: {ip_remaining})")
+        logger.debug("Rate limit check passed for user %s (user: %s, ip: %s)", user_id, user_remaining, ip_remaining)
     
     else:
         # For unauthenticated users: check only IP limit (standard rates)
         ip_allowed, ip_remaining, ip_retry_after = await rate_limiter.consume(ip_key, tokens=1)
         
         # Set response headers
-        response.headers["X-RateLimit-Limit"] = str(settings.rate_limit_per_min)
+        response.headers["X-RateLimit-Limit"] = str(_USER_LIMIT)
         response.headers["X-RateLimit-Remaining"] = str(ip_remaining)
         
         # Check if limit exceeded
@@ -149,7 +170,7 @@ async def rate_limiter_dependency(
                 detail="Too many requests"
             )
         
-        logger.debug(f"Rate limit check passed for {ip_key} (remaining: {ip_remaining})")
+        logger.debug("Rate limit check passed for %s (remaining: %s)", ip_key, ip_remaining)
 
 
 # Dependency alias for cleaner imports
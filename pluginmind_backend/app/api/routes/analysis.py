@@ -7,10 +7,17 @@ the enhanced 4-D Prompt Engine with AI service registry.
 """
 
 import asyncio
-from datetime import datetime
-from fastapi import APIRouter, HTTPException, Depends
+import hashlib
+import time
+import uuid
+from typing import AsyncIterator, Dict, Optional
+from fastapi import APIRouter, HTTPException, Depends, Response
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from sqlmodel import Session
 from app.core.logging import get_logger
 from app.api.dependencies import SessionDep
+from app.database import engine
 from app.middleware.auth import get_current_user
 from app.api.dependencies_rate_limit import RateLimiter
 from app.models.schemas import (
@@ -21,23 +28,215 @@ from app.models.schemas import (
     JobResult
 )
 from app.ash_prompt import AnalysisType
+from app.models.database import QueryLog, User
 from app.services.analysis_service import analysis_service
 from app.services.user_service import user_service
-from app.utils.background_tasks import create_analysis_job, process_analysis_background
+from app.utils.background_tasks import (
+    JOB_BY_ID_STMT,
+    TERMINAL_JOB_STATUSES,
+    cache_job_result,
+    create_analysis_job,
+    fail_job,
+    job_result_cache,
+    wait_for_job_update
+)
+from app.queue import enqueue_analysis
+from app.utils.query_log_writer import save_query_log
+from app.utils.cache import TTLCache
 from app.core.exceptions import (
     AIServiceError, 
     RateLimitError, 
     UserAccessError, 
     QueryLimitExceededError,
-    JobNotFoundError
+    JobNotFoundError,
+    ServiceUnavailableError
 )
 
 logger = get_logger(__name__)
 router = APIRouter()
 
+# Recent /analyze responses keyed by a hash of the exact user input, so
+# identical requests skip both upstream AI calls
+_ANALYSIS_CACHE_TTL_SECONDS = 600
+_analysis_cache = TTLCache(maxsize=1024, ttl=_ANALYSIS_CACHE_TTL_SECONDS)
+
+# Analyses currently running, by the same key; identical concurrent requests
+# await one shared task instead of each calling the providers
+_analysis_inflight: Dict[bytes, "asyncio.Task[AnalysisResponse]"] = {}
+
+
+# Server-Sent Events stream limits: clients reconnect after the timeout and
+# jobs finished by another process are picked up by re-reading periodically
+_STREAM_TIMEOUT_SECONDS = 60
+_STREAM_RECHECK_SECONDS = 2
+_TERMINAL_STATUS_VALUES = frozenset(status.value for status in TERMINAL_JOB_STATUSES)
+
+
+def _analysis_cache_key(user_input: str) -> bytes:
+    """Content-hash key for an analysis input."""
+    return hashlib.blake2b(user_input.encode(), digest_size=16).digest()
+
+
+async def _record_query(
+    user_id: str,
+    user_input: str,
+    start_time: float,
+    response: Optional[AnalysisResponse] = None,
+    error: Optional[Exception] = None
+) -> None:
+    """
+    Write the QueryLog row for one /analyze request.
+    
+    Every request gets its own row, whether it was answered from cache,
+    ran the analysis or joined one already running. Failures are logged
+    rather than raised so bookkeeping never fails the request.
+    """
+    query_log = QueryLog(
+        user_id=user_id,
+        user_input=user_input,
+        optimized_prompt=response.optimized_prompt if response else None,
+        ai_result=response.analysis if response else None,
+        response_time_ms=int((time.perf_counter() - start_time) * 1000),
+        success=error is None,
+        error_message=str(error) if error is not None else None
+    )
+    try:
+        await save_query_log(query_log)
+    except Exception as e:
+        logger.error(f"Failed to save query log: {str(e)}")
+
+
+async def _run_analysis(cache_key: bytes, user_input: str, user_id: str) -> AnalysisResponse:
+    """Run the analysis workflow for an input and cache the response (callers log the query)."""
+    optimized_prompt, analysis_result = await analysis_service.perform_analysis(
+        user_input, user_id
+    )
+    response = AnalysisResponse(
+        optimized_prompt=optimized_prompt,
+        analysis=analysis_result
+    )
+    _analysis_cache.set(cache_key, response)
+    return response
+
+
+def _finish_inflight_analysis(cache_key: bytes, task: asyncio.Task) -> None:
+    """
+    Forget a finished shared analysis.
+    
+    Retrieves its outcome so an exception nobody awaited (every requester
+    disconnected) is not reported as unhandled.
+    """
+    _analysis_inflight.pop(cache_key, None)
+    if not task.cancelled():
+        task.exception()
+
+
+async def _analyze_coalesced(cache_key: bytes, user_input: str, user_id: str) -> AnalysisResponse:
+    """
+    Analyze an input, sharing one in-flight analysis between identical
+    concurrent requests.
+    
+    The first request starts the analysis as a task and later identical
+    requests join it; each caller writes its own query log. The task is
+    shielded so a client disconnecting does not cancel the analysis for
+    the others.
+    """
+    task = _analysis_inflight.get(cache_key)
+    if task is None:
+        task = asyncio.create_task(_run_analysis(cache_key, user_input, user_id))
+        _analysis_inflight[cache_key] = task
+        task.add_done_callback(lambda done: _finish_inflight_analysis(cache_key, done))
+    else:
+        logger.info("Joining in-flight analysis for user: %s", user_id)
+    return await asyncio.shield(task)
+
+
+def _reserve_user_query(user_id: str) -> User:
+    """
+    Load the user, enforce the query limit and count this query.
+    
+    Uses a single upsert statement in its own short-lived session that is
+    closed before the caller awaits the AI providers, so no DB connection
+    is held during analysis. The session does not expire objects on commit
+    so the returned user stays readable once detached.
+    
+    Args:
+        user_id: Authenticated user ID from JWT token
+        
+    Returns:
+        User: Detached user model with up-to-date usage counters
+        
+    Raises:
+        UserAccessError: If the user record cannot be loaded or checked
+        QueryLimitExceededError: If the user has no queries left
+    """
+    with Session(engine, expire_on_commit=False) as session:
+        # Get or create the user, check the limit and count the query in one statement
+        try:
+            allowed, user = user_service.consume_query_atomic(session, user_id)
+        except Exception as db_error:
+            logger.error(f"Failed to reserve query for user {user_id}: {str(db_error)}")
+            raise UserAccessError("User account access failed. Please try again.")
+        
+        if not allowed:
+            if user is None:
+                raise UserAccessError("User account access failed. Please try again.")
+            logger.warning(f"Query limit exceeded for user {user_id}: {user.queries_used}/{user.queries_limit}")
+            raise QueryLimitExceededError(f"Query limit exceeded. Used {user.queries_used}/{user.queries_limit} queries.")
+        
+        logger.debug("Incremented query count for user %s: %s/%s", user_id, user.queries_used, user.queries_limit)
+    
+    return user
+
+
+def _get_job_result(session: Session, job_id: str) -> Optional[JobResult]:
+    """Return a job's polling response from cache or the database."""
+    cached = job_result_cache.get(job_id)
+    if cached is not None:
+        return cached
+    
+    job = session.exec(JOB_BY_ID_STMT, params={"job_id": job_id}).first()
+    if not job:
+        return None
+    
+    return cache_job_result(job)
+
+
+def _load_job_result(job_id: str) -> Optional[JobResult]:
+    """Look up a job's polling response in a short-lived session."""
+    with Session(engine) as session:
+        return _get_job_result(session, job_id)
+
+
+async def _job_status_events(job_id: str, result: JobResult) -> AsyncIterator[str]:
+    """Yield SSE frames for each status change until the job finishes or the stream times out."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + _STREAM_TIMEOUT_SECONDS
+    last_status = None
+    
+    while True:
+        if result.status != last_status:
+            yield f"event: status\ndata: {result.model_dump_json()}\n\n"
+            last_status = result.status
+        
+        if result.status in _TERMINAL_STATUS_VALUES:
+            return
+        
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            yield "event: timeout\ndata: {}\n\n"
+            return
+        
+        await wait_for_job_update(job_id, min(remaining, _STREAM_RECHECK_SECONDS))
+        
+        result = await run_in_threadpool(_load_job_result, job_id)
+        if result is None:
+            yield 'event: error\ndata: {"error": "Job not found"}\n\n'
+            return
+
 
 @router.post("/analyze", response_model=AnalysisResponse)
-async def analyze(req: AnalysisRequest, session: SessionDep, user_id: str = Depends(get_current_user), _rate_limit=RateLimiter):
+async def analyze(req: AnalysisRequest, user_id: str = Depends(get_current_user), _rate_limit=RateLimiter):
     """
     Legacy Crypto Analysis Endpoint (Protected)
     
@@ -50,11 +249,13 @@ async def analyze(req: AnalysisRequest, session: SessionDep, user_id: str = Depe
     4. Deliver: Return structured insights with sentiment, news, recommendations
     
     This endpoint requires authentication and tracks user queries for billing/limits.
+    Identical inputs seen in the last few minutes are answered from cache,
+    and identical inputs arriving together share one analysis (both still
+    counted against the user's query limit).
     Maintained for backward compatibility - new code should use /process.
     
     Args:
         req: Analysis request with user input (analysis_type ignored, always crypto)
-        session: Database session for query logging
         user_id: Authenticated user ID from JWT token
         
     Returns:
@@ -63,47 +264,33 @@ async def analyze(req: AnalysisRequest, session: SessionDep, user_id: str = Depe
     Raises:
         HTTPException: For authentication, query limits, API failures, or validation errors
     """
-    logger.info(f"Starting authenticated analysis for user: {user_id}, input length: {len(req.user_input)}")
+    logger.info("Starting authenticated analysis for user: %s, input length: %s", user_id, len(req.user_input))
+    start_time = time.perf_counter()
     
     try:
-        # Get or create user in database
-        try:
-            user = user_service.get_or_create_user(session, user_id)
-            logger.debug(f"Successfully retrieved/created user: {user.email if hasattr(user, 'email') else user_id}")
-        except Exception as db_error:
-            logger.error(f"Failed to get/create user {user_id}: {str(db_error)}")
-            raise UserAccessError("User account access failed. Please try again.")
+        # Check limits and count the query in a short-lived session (off the event loop)
+        user = await run_in_threadpool(_reserve_user_query, user_id)
         
-        # Check query limits
-        try:
-            if not user_service.check_query_limit(user):
-                logger.warning(f"Query limit exceeded for user {user_id}: {user.queries_used}/{user.queries_limit}")
-                raise QueryLimitExceededError(f"Query limit exceeded. Used {user.queries_used}/{user.queries_limit} queries.")
-        except QueryLimitExceededError:
-            raise
-        except Exception as limit_error:
-            logger.error(f"Failed to check query limit for user {user_id}: {str(limit_error)}")
-            raise UserAccessError("Query limit check failed. Please try again.")
+        cache_key = _analysis_cache_key(req.user_input)
+        cached = _analysis_cache.get(cache_key)
+        if cached is not None:
+            logger.info("Serving cached analysis for user: %s (%s/%s queries used)", user_id, user.queries_used, user.queries_limit)
+            await _record_query(user.google_id or user_id, req.user_input, start_time, cached)
+            return cached
         
-        # Increment user query count
+        # Perform analysis (shared with identical concurrent requests) and
+        # log this request's query either way
+        log_user_id = user.google_id or user_id
         try:
-            user = user_service.increment_user_queries(session, user)
-            logger.debug(f"Incremented query count for user {user_id}: {user.queries_used}/{user.queries_limit}")
-        except Exception as increment_error:
-            logger.error(f"Failed to increment query count for user {user_id}: {str(increment_error)}")
-            # Don't fail the request for this, just log the error
-        
-        # Perform analysis with user tracking
-        optimized_prompt, analysis_result = await analysis_service.perform_analysis_with_logging(
-            req.user_input, session, user_id=user.google_id or user_id
-        )
+            response = await _analyze_coalesced(cache_key, req.user_input, log_user_id)
+        except Exception as e:
+            await _record_query(log_user_id, req.user_input, start_time, error=e)
+            raise
+        await _record_query(log_user_id, req.user_input, start_time, response)
         
-        logger.info(f"Analysis completed for user: {user.email if hasattr(user, 'email') else user_id} ({user.queries_used}/{user.queries_limit} queries used)")
+        logger.info("Analysis completed for user: %s (%s/%s queries used)", user.email if hasattr(user, 'email') else user_id, user.queries_used, user.queries_limit)
         
-        return AnalysisResponse(
-            optimized_prompt=optimized_prompt,
-            analysis=analysis_result
-        )
+        return response
         
     except (UserAccessError, QueryLimitExceededError, RateLimitError, AIServiceError):
         # Re-raise custom exceptions (handled by error handlers)
@@ -114,7 +301,7 @@ async def analyze(req: AnalysisRequest, session: SessionDep, user_id: str = Depe
 
 
 @router.post("/process", response_model=GenericAnalysisResponse)
-async def process_generic(req: AnalysisRequest, session: SessionDep, user_id: str = Depends(get_current_user), _rate_limit=RateLimiter):
+async def process_generic(req: AnalysisRequest, user_id: str = Depends(get_current_user), _rate_limit=RateLimiter):
     """
     Generic AI Processing Endpoint (Protected)
     
@@ -133,7 +320,6 @@ async def process_generic(req: AnalysisRequest, session: SessionDep, user_id: st
     
     Args:
         req: Analysis request with user input and analysis type
-        session: Database session for query logging and result storage
         user_id: Authenticated user ID from JWT token
         
     Returns:
@@ -143,38 +329,13 @@ async def process_generic(req: AnalysisRequest, session: SessionDep, user_id: st
         HTTPException: For authentication, query limits, API failures, or validation errors
     """
     analysis_type = req.analysis_type or AnalysisType.CUSTOM
-    logger.info(f"Starting generic {analysis_type} analysis for user: {user_id}, input length: {len(req.user_input)}")
+    logger.info("Starting generic %s analysis for user: %s, input length: %s", analysis_type, user_id, len(req.user_input))
     
     try:
-        # Get or create user in database
-        try:
-            user = user_service.get_or_create_user(session, user_id)
-            logger.debug(f"Successfully retrieved/created user: {user.email if hasattr(user, 'email') else user_id}")
-        except Exception as db_error:
-            logger.error(f"Failed to get/create user {user_id}: {str(db_error)}")
-            raise UserAccessError("User account access failed. Please try again.")
-        
-        # Check query limits
-        try:
-            if not user_service.check_query_limit(user):
-                logger.warning(f"Query limit exceeded for user {user_id}: {user.queries_used}/{user.queries_limit}")
-                raise QueryLimitExceededError(f"Query limit exceeded. Used {user.queries_used}/{user.queries_limit} queries.")
-        except QueryLimitExceededError:
-            raise
-        except Exception as limit_error:
-            logger.error(f"Failed to check query limit for user {user_id}: {str(limit_error)}")
-            raise UserAccessError("Query limit check failed. Please try again.")
-        
-        # Increment user query count
-        try:
-            user = user_service.increment_user_queries(session, user)
-            logger.debug(f"Incremented query count for user {user_id}: {user.queries_used}/{user.queries_limit}")
-        except Exception as increment_error:
-            logger.error(f"Failed to increment query count for user {user_id}: {str(increment_error)}")
-            # Don't fail the request for this, just log the error
+        # Check limits and count the query in a short-lived session (off the event loop)
+        user = await run_in_threadpool(_reserve_user_query, user_id)
         
         # Generate unique analysis ID
-        import uuid
         analysis_id = str(uuid.uuid4())
         
         # Perform generic analysis with database storage
@@ -182,13 +343,15 @@ async def process_generic(req: AnalysisRequest, session: SessionDep, user_id: st
             user_input=req.user_input,
             analysis_type=analysis_type,
             user_id=user.google_id or user_id,
-            analysis_id=analysis_id,
-            session=session
+            analysis_id=analysis_id
         )
         
         logger.info(
-            f"Generic {analysis_type} analysis completed for user: {user.email if hasattr(user, 'email') else user_id} "
-            f"({user.queries_used}/{user.queries_limit} queries used)"
+            "Generic %s analysis completed for user: %s (%s/%s queries used)",
+            analysis_type,
+            user.email if hasattr(user, 'email') else user_id,
+            user.queries_used,
+            user.queries_limit
         )
         
         return GenericAnalysisResponse(
@@ -222,39 +385,57 @@ async def start_async_analysis(req: AnalysisRequest, _rate_limit=RateLimiter):
     Returns:
         JobResponse: Job ID and initial status information
     """
-    logger.info(f"Starting async analysis for input length: {len(req.user_input)}")
+    logger.info("Starting async analysis for input length: %s", len(req.user_input))
     
     try:
-        # Create job in database
-        job_id = create_analysis_job(req.user_input)
+        # Create job in database (created_at is populated on insert)
+        job = await run_in_threadpool(create_analysis_job, req.user_input)
+        job_id = job.job_id
         
-        # Start background processing
-        asyncio.create_task(process_analysis_background(job_id, req.user_input))
+        # Hand off to the configured job queue (JOB_QUEUE_BACKEND); a job that
+        # cannot be queued is marked failed so no queued row is left behind
+        try:
+            await enqueue_analysis(job_id, req.user_input)
+        except ServiceUnavailableError:
+            # The local queue was full and already failed the job
+            raise
+        except Exception:
+            await fail_job(job_id, "Failed to queue analysis job. Please try again.")
+            raise
         
-        logger.info(f"Started async analysis job {job_id}")
+        logger.info("Started async analysis job %s", job_id)
         
         return JobResponse(
             job_id=job_id,
             status="queued",
-            created_at=datetime.now(),
+            created_at=job.created_at,
             message="Analysis started. Use the job_id to check status."
         )
         
+    except ServiceUnavailableError:
+        # Job queue is full; surfaces as 503 so clients retry later
+        raise
     except Exception as e:
         logger.error(f"Failed to start async analysis: {str(e)}")
         raise AIServiceError("Failed to start analysis job")
 
 
 @router.get("/analyze-async/{job_id}", response_model=JobResult)
-async def get_analysis_result(job_id: str, session: SessionDep):
+def get_analysis_result(job_id: str, session: SessionDep, response: Response):
     """
     Get Analysis Job Results
     
     Retrieves the status and results of an asynchronous analysis job.
+    Results are cached in-process (finished jobs for a minute, in-flight
+    jobs for a couple of seconds) so concurrent pollers collapse into one
+    DB read, and the response allows clients to reuse it for a second.
+    Declared as a plain function so FastAPI runs the blocking query in
+    its threadpool.
     
     Args:
         job_id: Unique job identifier from start_async_analysis
         session: Database session
+        response: Response used to set caching headers
         
     Returns:
         JobResult: Job status, results, and metadata
@@ -262,21 +443,40 @@ async def get_analysis_result(job_id: str, session: SessionDep):
     Raises:
         HTTPException: If job is not found
     """
-    from sqlmodel import select
-    from app.models.database import AnalysisJob
+    response.headers["Cache-Control"] = "max-age=1"
     
-    statement = select(AnalysisJob).where(AnalysisJob.job_id == job_id)
-    job = session.exec(statement).first()
+    result = _get_job_result(session, job_id)
+    if result is None:
+        raise JobNotFoundError("Job not found")
     
-    if not job:
+    return result
+
+
+@router.get("/analyze-async/{job_id}/stream")
+async def stream_analysis_result(job_id: str, _rate_limit=RateLimiter):
+    """
+    Stream Analysis Job Status
+    
+    Server-Sent Events alternative to polling GET /analyze-async/{job_id}.
+    Sends a "status" event with the JobResult payload on every status
+    change and closes once the job completes or fails. After 60 seconds
+    a "timeout" event is sent and the client should reconnect.
+    
+    Args:
+        job_id: Unique job identifier from start_async_analysis
+        
+    Returns:
+        StreamingResponse: text/event-stream of job status events
+        
+    Raises:
+        HTTPException: If job is not found
+    """
+    result = await run_in_threadpool(_load_job_result, job_id)
+    if result is None:
         raise JobNotFoundError("Job not found")
     
-    return JobResult(
-        job_id=job.job_id,
-        status=job.status.value,
-        created_at=job.created_at,
-        completed_at=job.completed_at,
-        optimized_prompt=job.optimized_prompt,
-        analysis=job.analysis,
-        error=job.error
-    )
\ No newline at end of file
+    return StreamingResponse(
+        _job_status_events(job_id, result),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
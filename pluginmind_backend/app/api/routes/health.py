@@ -5,68 +5,47 @@ Provides application health monitoring and system status information
 for load balancers and monitoring systems.
 """
 
-import os
 import asyncio
-from datetime import datetime, timedelta
-from typing import Dict, Any
+from datetime import datetime
+from typing import Any
 from fastapi import APIRouter, HTTPException
 from sqlmodel import text
 from app.core.logging import get_logger
 from app.core.config import settings
-from app.models.schemas import HealthResponse
+from app.models.schemas import HealthResponse, LivenessResponse, ReadinessResponse, VersionResponse
 from app.api.dependencies import SessionDep
-from app.core.exceptions import ServiceUnavailableError
+from app.utils.background_tasks import count_active_jobs_cached
 
 logger = get_logger(__name__)
 router = APIRouter()
 
-# Legacy in-memory job store for backward compatibility
-# TODO: Remove after full migration to database-only jobs
-job_store: Dict[str, dict] = {}
-
-
-async def cleanup_old_jobs():
-    """Remove jobs older than 1 hour from legacy storage."""
-    cutoff = datetime.now() - timedelta(hours=1)
-    to_remove = [
-        job_id for job_id, job_data in job_store.items()
-        if job_data.get("created_at", datetime.now()) < cutoff
-    ]
-    for job_id in to_remove:
-        del job_store[job_id]
-    if to_remove:
-        logger.info(f"Cleaned up {len(to_remove)} old jobs from legacy storage")
-
 
 @router.get("/health", response_model=HealthResponse)
 async def health_check():
     """
     Health check endpoint for monitoring systems.
     
-    Performs basic system health checks and cleanup operations.
-    Used by load balancers and monitoring tools to verify service status.
+    Performs basic system health checks. Used by load balancers and
+    monitoring tools to verify service status, so it does no cleanup work
+    and reads the active job count from a short-lived cache.
     
     Returns:
         HealthResponse: System status and active job count
-        
-    Raises:
-        HTTPException: If service is unavailable
     """
     try:
-        # Clean up old jobs during health check
-        await cleanup_old_jobs()
-        
-        return HealthResponse(
-            status="ok",
-            active_jobs=len(job_store)
-        )
-        
+        active_jobs = await count_active_jobs_cached()
     except Exception as e:
-        logger.error(f"Health check failed: {str(e)}")
-        raise ServiceUnavailableError("Service unavailable")
+        # The job count is informational; /ready reports database health
+        logger.warning(f"Failed to count active jobs: {str(e)}")
+        active_jobs = None
+    
+    return HealthResponse(
+        status="ok",
+        active_jobs=active_jobs
+    )
 
 
-@router.get("/live")
+@router.get("/live", response_model=LivenessResponse)
 async def liveness_check():
     """
     Liveness probe endpoint.
@@ -75,13 +54,13 @@ async def liveness_check():
     Used by orchestrators (K8s, Docker) to determine if container should be restarted.
     
     Returns:
-        dict: Simple live status
+        LivenessResponse: Simple live status
     """
-    return {"status": "live"}
+    return LivenessResponse(status="live")
 
 
-@router.get("/ready")
-async def readiness_check(session: SessionDep):
+@router.get("/ready", response_model=ReadinessResponse)
+def readiness_check(session: SessionDep):
     """
     Readiness probe endpoint.
     
@@ -92,7 +71,7 @@ async def readiness_check(session: SessionDep):
         session: Database session for connectivity check
         
     Returns:
-        dict: Readiness status with check details
+        ReadinessResponse: Readiness status with check details
         
     Raises:
         HTTPException: 503 if any readiness checks fail
@@ -126,7 +105,7 @@ async def readiness_check(session: SessionDep):
         logger.debug("Environment readiness check passed")
     
     if all_ready:
-        return {"status": "ready", "checks": checks}
+        return ReadinessResponse(status="ready", checks=checks)
     else:
         # For readiness checks, we still use HTTPException with custom detail format
         # This preserves the structured response format expected by orchestrators
@@ -136,7 +115,7 @@ async def readiness_check(session: SessionDep):
         )
 
 
-@router.get("/version")
+@router.get("/version", response_model=VersionResponse)
 async def version_info():
     """
     Version information endpoint.
@@ -145,13 +124,13 @@ async def version_info():
     Useful for verifying deployments and debugging version-specific issues.
     
     Returns:
-        dict: Application version information
+        VersionResponse: Application version information
     """
-    return {
-        "name": settings.app_name,
-        "version": settings.version,
-        "git_sha": os.getenv("GIT_SHA", "-")
-    }
+    return VersionResponse(
+        name=settings.app_name,
+        version=settings.version,
+        git_sha=settings.git_sha
+    )
 
 
 @router.get("/services")
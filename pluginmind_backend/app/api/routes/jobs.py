@@ -6,75 +6,111 @@ for debugging and administrative purposes.
 """
 
 from uuid import UUID
-from fastapi import APIRouter, HTTPException
-from sqlmodel import select
+from fastapi import APIRouter, HTTPException, Query, Response
+from sqlalchemy import bindparam, delete
+from sqlmodel import func, select
 from app.core.logging import get_logger
 from app.api.dependencies import SessionDep
 from app.models.database import AnalysisJob
+from app.models.schemas import JobSummary, JobsListResponse, MessageResponse
 from app.core.exceptions import JobNotFoundError
+from app.utils.background_tasks import job_result_cache, jobs_page_cache
 
 logger = get_logger(__name__)
 router = APIRouter()
 
+# Statements are built once with bound parameters so each request only
+# binds values; SQLAlchemy reuses the compiled SQL from its cache
+_JOB_SUMMARIES_STMT = (
+    select(
+        AnalysisJob.job_id,
+        AnalysisJob.status,
+        AnalysisJob.created_at,
+        AnalysisJob.completed_at,
+        AnalysisJob.user_id,
+        (func.coalesce(AnalysisJob.error, "") != "").label("has_error")
+    )
+    .order_by(AnalysisJob.created_at.desc())
+    .limit(bindparam("limit"))
+    .offset(bindparam("offset"))
+)
+_JOB_COUNT_STMT = select(func.count()).select_from(AnalysisJob)
+_DELETE_JOB_STMT = delete(AnalysisJob).where(AnalysisJob.job_id == bindparam("job_id"))
 
-@router.get("/jobs")
-async def list_jobs(session: SessionDep):
+
+@router.get("/jobs", response_model=JobsListResponse)
+def list_jobs(
+    session: SessionDep,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0)
+):
     """
-    List All Analysis Jobs
+    List Analysis Jobs
     
-    Returns a summary of all analysis jobs for debugging and monitoring.
-    Jobs are ordered by creation time (newest first).
+    Returns a page of analysis job summaries for debugging and monitoring.
+    Jobs are ordered by creation time (newest first). Only the summary
+    columns are selected, so large prompt/analysis texts are never loaded.
+    Serialized pages are cached briefly so monitoring polls skip the
+    queries and response validation.
     
     Args:
         session: Database session
+        limit: Maximum number of jobs to return (default: 100)
+        offset: Number of jobs to skip (default: 0)
         
     Returns:
-        Dict containing total job count and job summaries
+        JobsListResponse: Total job count and job summaries for this page
     """
-    statement = select(AnalysisJob).order_by(AnalysisJob.created_at.desc())
-    jobs = session.exec(statement).all()
-    
-    return {
-        "total_jobs": len(jobs),
-        "jobs": {
-            job.job_id: {
-                "status": job.status.value,
-                "created_at": job.created_at,
-                "completed_at": job.completed_at,
-                "user_id": job.user_id,
-                "has_error": bool(job.error)
+    cache_key = (limit, offset)
+    body = jobs_page_cache.get(cache_key)
+    if body is None:
+        rows = session.exec(_JOB_SUMMARIES_STMT, params={"limit": limit, "offset": offset}).all()
+        total_jobs = session.exec(_JOB_COUNT_STMT).one()
+        
+        body = JobsListResponse(
+            total_jobs=total_jobs,
+            jobs={
+                row.job_id: JobSummary(
+                    status=row.status.value,
+                    created_at=row.created_at,
+                    completed_at=row.completed_at,
+                    user_id=row.user_id,
+                    has_error=bool(row.has_error)
+                )
+                for row in rows
             }
-            for job in jobs
-        }
-    }
+        ).model_dump_json()
+        jobs_page_cache.set(cache_key, body)
+    
+    return Response(content=body, media_type="application/json")
 
 
-@router.delete("/jobs/{job_id}")
-async def delete_job(job_id: UUID, session: SessionDep):
+@router.delete("/jobs/{job_id}", response_model=MessageResponse)
+def delete_job(job_id: UUID, session: SessionDep):
     """
     Delete Analysis Job
     
-    Removes a specific analysis job from the database.
-    Useful for cleanup and testing purposes.
+    Removes a specific analysis job from the database with a single
+    DELETE (no prior lookup). Useful for cleanup and testing purposes.
     
     Args:
         job_id: Unique job identifier
         session: Database session
         
     Returns:
-        Success message
+        MessageResponse: Success message
         
     Raises:
         HTTPException: If job is not found
     """
-    statement = select(AnalysisJob).where(AnalysisJob.job_id == str(job_id))
-    job = session.exec(statement).first()
+    deleted = session.exec(_DELETE_JOB_STMT, params={"job_id": str(job_id)}).rowcount
     
-    if not job:
+    if not deleted:
         raise JobNotFoundError("Job not found")
     
-    session.delete(job)
     session.commit()
+    job_result_cache.pop(str(job_id))
+    jobs_page_cache.clear()
     
-    logger.info(f"Deleted analysis job {job_id}")
-    return {"message": f"Job {job_id} deleted successfully"}
\ No newline at end of file
+    logger.info("Deleted analysis job %s", job_id)
+    return MessageResponse(message=f"Job {job_id} deleted successfully")
\ No newline at end of file
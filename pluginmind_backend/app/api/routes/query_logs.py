@@ -7,6 +7,7 @@ performance monitoring, and usage analytics.
 
 from typing import Optional
 from fastapi import APIRouter
+from sqlalchemy import bindparam
 from sqlmodel import select
 from app.core.logging import get_logger
 from app.api.dependencies import SessionDep
@@ -16,9 +17,27 @@ from app.models.schemas import QueryLogsResponse, QueryLogSummary
 logger = get_logger(__name__)
 router = APIRouter()
 
+# Prebuilt listing statements (SQLAlchemy reuses their compiled SQL). Only the
+# summary columns are loaded, not the stored prompts and AI results.
+_SUMMARY_COLUMNS = (
+    QueryLog.id,
+    QueryLog.user_id,
+    QueryLog.user_input,
+    QueryLog.success,
+    QueryLog.response_time_ms,
+    QueryLog.created_at,
+    QueryLog.error_message,
+)
+RECENT_QUERY_LOGS_STMT = (
+    select(*_SUMMARY_COLUMNS)
+    .order_by(QueryLog.created_at.desc())
+    .limit(bindparam("limit"))
+)
+RECENT_USER_QUERY_LOGS_STMT = RECENT_QUERY_LOGS_STMT.where(QueryLog.user_id == bindparam("user_id"))
+
 
 @router.get("/query-logs", response_model=QueryLogsResponse)
-async def list_query_logs(
+def list_query_logs(
     session: SessionDep,
     limit: int = 50,
     user_id: Optional[str] = None
@@ -37,12 +56,12 @@ async def list_query_logs(
     Returns:
         QueryLogsResponse: List of query log summaries
     """
-    statement = select(QueryLog).order_by(QueryLog.created_at.desc()).limit(limit)
-    
     if user_id:
-        statement = statement.where(QueryLog.user_id == user_id)
-    
-    query_logs = session.exec(statement).all()
+        query_logs = session.exec(
+            RECENT_USER_QUERY_LOGS_STMT, params={"limit": limit, "user_id": user_id}
+        ).all()
+    else:
+        query_logs = session.exec(RECENT_QUERY_LOGS_STMT, params={"limit": limit}).all()
     
     # Convert to summary format with truncated input for readability
     log_summaries = []
@@ -18,7 +18,7 @@ router = APIRouter()
 
 
 @router.get("/me", response_model=UserProfile)
-async def get_current_user_profile(session: SessionDep, user_id: str = Depends(get_current_user)):
+def get_current_user_profile(session: SessionDep, user_id: str = Depends(get_current_user)):
     """
     Get Current User Profile
     
@@ -35,7 +35,7 @@ async def get_current_user_profile(session: SessionDep, user_id: str = Depends(g
     Raises:
         HTTPException: 404 if user not found
     """
-    logger.info(f"Getting profile for user: {user_id}")
+    logger.info("Getting profile for user: %s", user_id)
     
     # Get or create user (in case they haven't made any queries yet)
     user = user_service.get_or_create_user(session, user_id)
@@ -54,7 +54,7 @@ async def get_current_user_profile(session: SessionDep, user_id: str = Depends(g
 
 
 @router.get("/me/usage", response_model=UserUsage)
-async def get_current_user_usage(session: SessionDep, user_id: str = Depends(get_current_user)):
+def get_current_user_usage(session: SessionDep, user_id: str = Depends(get_current_user)):
     """
     Get Current User Usage Statistics
     
@@ -71,7 +71,7 @@ async def get_current_user_usage(session: SessionDep, user_id: str = Depends(get
     Raises:
         HTTPException: 404 if user not found
     """
-    logger.info(f"Getting usage stats for user: {user_id}")
+    logger.info("Getting usage stats for user: %s", user_id)
     
     # Get or create user (in case they haven't made any queries yet)
     user = user_service.get_or_create_user(session, user_id)
@@ -6,6 +6,7 @@ Uses the proven 4-D methodology (Deconstruct, Diagnose, Develop, Deliver)
 adapted for generic AI workflows.
 """
 
+import json
 from typing import Dict, Any, Optional
 from enum import Enum
 
@@ -199,3 +200,10 @@ prompt_engine = PromptTemplateEngine()
 
 # Legacy compatibility - maintain existing API
 ASH_SYSTEM_PROMPT = prompt_engine.get_system_prompt(AnalysisType.CRYPTO)
+
+# The default system message never changes, so build it and its compact
+# JSON encoding once instead of on every OpenAI request (treat as read-only)
+ASH_SYSTEM_MESSAGE: Dict[str, str] = {"role": "system", "content": ASH_SYSTEM_PROMPT}
+ASH_SYSTEM_MESSAGE_JSON: bytes = json.dumps(
+    ASH_SYSTEM_MESSAGE, separators=(",", ":"), ensure_ascii=False
+).encode("utf-8")
@@ -6,15 +6,68 @@ with comprehensive validation at startup.
 """
 
 import os
-import re
+import sys
 import logging
-from typing import List
-from dotenv import load_dotenv
+from functools import lru_cache
+from types import MappingProxyType
+from collections.abc import Mapping
+from urllib.parse import urlsplit
+from app.core.env import load_env_file
 
-load_dotenv()
+load_env_file()
+
+__all__ = ["Settings", "get_settings", "settings"]
 
 logger = logging.getLogger(__name__)
 
+# Read-only database connect_args, shared instead of rebuilt per access
+_SQLITE_CONNECT_ARGS = MappingProxyType({"check_same_thread": False})
+_NO_CONNECT_ARGS = MappingProxyType({})
+
+# Numeric settings parsed in one pass: (attribute, environment variable, type, default)
+_NUMERIC_SETTINGS = (
+    # Jobs and worker threads (threadpool serves def endpoints and run_in_threadpool)
+    ("job_cleanup_hours", "JOB_CLEANUP_HOURS", int, "1"),
+    ("max_user_input_length", "MAX_USER_INPUT_LENGTH", int, "5000"),
+    ("max_background_jobs", "MAX_BACKGROUND_JOBS", int, "32"),
+    ("job_queue_max_size", "JOB_QUEUE_MAX_SIZE", int, "256"),
+    ("threadpool_max_workers", "THREADPOOL_MAX_WORKERS", int, "100"),
+    # HTTP client
+    ("http_timeout_seconds", "HTTP_TIMEOUT_SECONDS", float, "150"),
+    ("http_max_retries", "HTTP_MAX_RETRIES", int, "1"),
+    ("http_retry_backoff_base", "HTTP_RETRY_BACKOFF_BASE", float, "0.5"),
+    ("http_max_connections", "HTTP_MAX_CONNECTIONS", int, "100"),
+    ("http_max_keepalive", "HTTP_MAX_KEEPALIVE", int, "100"),
+    # Grok-specific timeouts
+    ("grok_timeout_seconds", "GROK_TIMEOUT_SECONDS", float, "200"),
+    ("grok_connect_timeout", "GROK_CONNECT_TIMEOUT", float, "10.0"),
+    ("grok_write_timeout", "GROK_WRITE_TIMEOUT", float, "30.0"),
+    ("grok_pool_timeout", "GROK_POOL_TIMEOUT", float, "5.0"),
+    # Request limits (~1MB body)
+    ("body_max_bytes", "BODY_MAX_BYTES", int, "1000000"),
+    # Rate limiting, per user and per IP
+    ("rate_limit_per_min", "RATE_LIMIT_PER_MIN", int, "60"),
+    ("rate_limit_burst", "RATE_LIMIT_BURST", int, "120"),
+    ("rate_limit_ip_per_min", "RATE_LIMIT_IP_PER_MIN", int, "300"),
+    ("rate_limit_ip_burst", "RATE_LIMIT_IP_BURST", int, "600"),
+)
+
+# Accepted LOG_LEVEL values (after upper-casing)
+_LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+
+# Schemes accepted for outbound API URLs
+_URL_SCHEMES = frozenset({"http", "https"})
+
+# Accepted database URL schemes (the part before "://")
+_DATABASE_URL_SCHEMES = frozenset({
+    'postgresql',
+    'postgresql+psycopg',
+    'postgresql+psycopg2',
+    'sqlite',
+    'mysql',
+    'mysql+pymysql'
+})
+
 
 class Settings:
     """
@@ -22,20 +75,54 @@ class Settings:
     
     Loads and validates configuration from environment variables,
     failing fast with clear errors on invalid configuration.
+    Attributes live in __slots__ (no per-instance dict), so every new
+    setting must also be listed there.
     """
     
+    __slots__ = (
+        "_env",
+        # Application
+        "testing", "app_name", "version", "git_sha", "debug",
+        # AI providers
+        "openai_api_key", "grok_api_key", "openai_api_url", "grok_api_url",
+        "openai_model", "grok_model",
+        # Database, CORS and logging
+        "database_url", "_is_sqlite", "cors_origins", "cors_origins_set",
+        "log_level", "log_format",
+        # Jobs and worker threads
+        "job_cleanup_hours", "max_user_input_length", "max_background_jobs",
+        "job_queue_max_size", "threadpool_max_workers", "job_queue_backend",
+        # HTTP client
+        "http_timeout_seconds", "http_max_retries", "http_retry_backoff_base",
+        "http_max_connections", "http_max_keepalive", "http2_enabled",
+        # Grok timeouts
+        "grok_timeout_seconds", "grok_connect_timeout", "grok_write_timeout",
+        "grok_pool_timeout",
+        # Request and rate limits
+        "body_max_bytes", "rate_limit_per_min", "rate_limit_burst",
+        "rate_limit_ip_per_min", "rate_limit_ip_burst", "rate_limit_storage",
+        "redis_url",
+        # Supabase, JWT and Google OAuth
+        "supabase_url", "supabase_anon_key", "supabase_service_role",
+        "jwt_secret", "jwt_algorithm", "google_client_id", "google_client_secret",
+    )
+    
     def __init__(self):
+        # Snapshot the environment once; every setting below is a plain dict lookup
+        self._env = env = os.environ.copy()
+        
         # Test mode detection
-        self.testing = os.getenv("TESTING", "0") == "1"
+        self.testing = env.get("TESTING", "0") == "1"
         
         # Application Info (configurable)
-        self.app_name = os.getenv("APP_NAME", "PluginMind Backend API")
-        self.version = os.getenv("APP_VERSION", "1.0.0")
-        self.debug = os.getenv("DEBUG", "false").lower() == "true"
+        self.app_name = env.get("APP_NAME", "PluginMind Backend API")
+        self.version = env.get("APP_VERSION", "1.0.0")
+        self.git_sha = env.get("GIT_SHA", "-")
+        self.debug = env.get("DEBUG", "false").lower() == "true"
         
         # API Keys (Required in production, safe defaults in testing)
-        self.openai_api_key = os.getenv("OPENAI_API_KEY")
-        self.grok_api_key = os.getenv("GROK_API_KEY")
+        self.openai_api_key = env.get("OPENAI_API_KEY")
+        self.grok_api_key = env.get("GROK_API_KEY")
         
         if self.testing:
             # In testing mode, provide safe defaults for missing secrets
@@ -45,67 +132,59 @@ class Settings:
                 self.grok_api_key = "test-grok-key"
         
         # API Configuration (configurable)
-        self.openai_api_url = os.getenv("OPENAI_API_URL", "https://api.openai.com/v1/chat/completions")
-        self.grok_api_url = os.getenv("GROK_API_URL", "https://api.x.ai/v1/chat/completions")
-        self.openai_model = os.getenv("OPENAI_MODEL", "gpt-5")
-        self.grok_model = os.getenv("GROK_MODEL", "grok-4-0709")
+        # Interned: these are compared and sent on every AI request
+        self.openai_api_url = sys.intern(env.get("OPENAI_API_URL", "https://api.openai.com/v1/chat/completions"))
+        self.grok_api_url = sys.intern(env.get("GROK_API_URL", "https://api.x.ai/v1/chat/completions"))
+        self.openai_model = sys.intern(env.get("OPENAI_MODEL", "gpt-5"))
+        self.grok_model = sys.intern(env.get("GROK_MODEL", "grok-4-0709"))
         
         # Database Configuration
-        self.database_url = os.getenv("DATABASE_URL", "sqlite:///./coingrok.db")
+        self.database_url = env.get("DATABASE_URL", "sqlite:///./coingrok.db")
+        self._is_sqlite = self.database_url.startswith("sqlite")
         
         # CORS Configuration
-        cors_origins_str = os.getenv("CORS_ORIGINS")
+        cors_origins_str = env.get("CORS_ORIGINS")
         if not cors_origins_str and self.debug:
             cors_origins_str = "http://localhost:3000"  # Dev fallback only
-        self.cors_origins = [origin.strip() for origin in cors_origins_str.split(",")] if cors_origins_str else []
+        # Immutable tuple; blank entries (e.g. from a trailing comma) are dropped
+        self.cors_origins = tuple(
+            origin for origin in map(str.strip, cors_origins_str.split(",")) if origin
+        ) if cors_origins_str else ()
+        # Hash-based lookup for the per-request origin check
+        self.cors_origins_set = frozenset(self.cors_origins)
         
         # Logging Configuration
-        self.log_level = os.getenv("LOG_LEVEL", "INFO")
+        # Normalized once; logging setup and uvicorn reuse it as-is
+        self.log_level = env.get("LOG_LEVEL", "INFO").strip().upper() or "INFO"
         self.log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
         
-        # Job Configuration
-        try:
-            self.job_cleanup_hours = int(os.getenv("JOB_CLEANUP_HOURS", "1"))
-            self.max_user_input_length = int(os.getenv("MAX_USER_INPUT_LENGTH", "5000"))
-        except ValueError as e:
-            raise ValueError(f"Invalid numeric configuration: {e}")
-        
-        # HTTP Client Configuration - parse numerics with error handling
-        self.http_timeout_seconds = self._parse_float("HTTP_TIMEOUT_SECONDS", "150")
-        self.http_max_retries = self._parse_int("HTTP_MAX_RETRIES", "1")
-        self.http_retry_backoff_base = self._parse_float("HTTP_RETRY_BACKOFF_BASE", "0.5")
-        self.http_max_connections = self._parse_int("HTTP_MAX_CONNECTIONS", "100")
-        self.http_max_keepalive = self._parse_int("HTTP_MAX_KEEPALIVE", "10")
-        
-        # Grok-specific timeout configuration
-        self.grok_timeout_seconds = self._parse_float("GROK_TIMEOUT_SECONDS", "200")
-        self.grok_connect_timeout = self._parse_float("GROK_CONNECT_TIMEOUT", "10.0")
-        self.grok_write_timeout = self._parse_float("GROK_WRITE_TIMEOUT", "30.0")
-        self.grok_pool_timeout = self._parse_float("GROK_POOL_TIMEOUT", "5.0")
-        
-        # Request Limits Configuration
-        self.body_max_bytes = self._parse_int("BODY_MAX_BYTES", "1000000")  # ~1MB
-        
-        # Rate Limiting Configuration
-        self.rate_limit_per_min = self._parse_int("RATE_LIMIT_PER_MIN", "60")
-        self.rate_limit_burst = self._parse_int("RATE_LIMIT_BURST", "120")
-        
-        # IP-specific Rate Limiting Configuration  
-        self.rate_limit_ip_per_min = self._parse_int("RATE_LIMIT_IP_PER_MIN", "300")
-        self.rate_limit_ip_burst = self._parse_int("RATE_LIMIT_IP_BURST", "600")
+        # Numeric configuration (jobs, HTTP client, Grok timeouts, limits)
+        for attribute, env_var, kind, default in _NUMERIC_SETTINGS:
+            parse = self._parse_int if kind is int else self._parse_float
+            setattr(self, attribute, parse(env_var, default))
+        
+        # Async job dispatch: "local" (in-process tasks) or "arq" (separate worker via REDIS_URL)
+        self.job_queue_backend = env.get("JOB_QUEUE_BACKEND", "local").strip().lower() or "local"
+        
+        # HTTP Client Configuration
+        self.http2_enabled = env.get("HTTP2_ENABLED", "true").lower() == "true"
+        
+        # Rate limit storage backend: "memory" (per-process) or "redis" (shared)
+        self.rate_limit_storage = env.get("RATE_LIMIT_STORAGE", "memory").strip().lower() or "memory"
+        self.redis_url = env.get("REDIS_URL", "redis://localhost:6379/0")
         
         # Supabase Configuration
-        self.supabase_url = os.getenv("SUPABASE_URL")
-        self.supabase_anon_key = os.getenv("SUPABASE_ANON_KEY")
-        self.supabase_service_role = os.getenv("SUPABASE_SERVICE_ROLE")
+        self.supabase_url = env.get("SUPABASE_URL")
+        self.supabase_anon_key = env.get("SUPABASE_ANON_KEY")
+        self.supabase_service_role = env.get("SUPABASE_SERVICE_ROLE")
 
         # JWT Configuration
-        self.jwt_secret = os.getenv("JWT_SECRET")
-        self.jwt_algorithm = os.getenv("JWT_ALGORITHM", "HS256")
+        self.jwt_secret = env.get("JWT_SECRET")
+        self.jwt_algorithm = sys.intern(env.get("JWT_ALGORITHM", "HS256"))
 
         # Google OAuth
-        self.google_client_id = os.getenv("GOOGLE_CLIENT_ID")
-        self.google_client_secret = os.getenv("GOOGLE_CLIENT_SECRET")
+        self.google_client_id = env.get("GOOGLE_CLIENT_ID")
+        self.google_client_secret = env.get("GOOGLE_CLIENT_SECRET")
 
         # Test-aware validation for additional required fields
         if self.testing:
@@ -129,25 +208,23 @@ class Settings:
     
     def _parse_int(self, env_var: str, default: str) -> int:
         """Parse integer from environment variable with descriptive error."""
+        raw = self._env.get(env_var)
+        # Use default if environment variable is missing or empty
+        value = raw if raw and raw.strip() else default
         try:
-            value = os.getenv(env_var, default)
-            # Use default if environment variable is empty
-            if not value or value.strip() == "":
-                value = default
             return int(value)
         except ValueError:
-            raise ValueError(f"Invalid {env_var}: must be an integer, got '{os.getenv(env_var)}'")
+            raise ValueError(f"Invalid {env_var}: must be an integer, got '{raw}'")
     
     def _parse_float(self, env_var: str, default: str) -> float:
         """Parse float from environment variable with descriptive error."""
+        raw = self._env.get(env_var)
+        # Use default if environment variable is missing or empty
+        value = raw if raw and raw.strip() else default
         try:
-            value = os.getenv(env_var, default)
-            # Use default if environment variable is empty
-            if not value or value.strip() == "":
-                value = default
             return float(value)
         except ValueError:
-            raise ValueError(f"Invalid {env_var}: must be a number, got '{os.getenv(env_var)}'")
+            raise ValueError(f"Invalid {env_var}: must be a number, got '{raw}'")
     
     def _validate_configuration(self) -> None:
         """
@@ -159,14 +236,12 @@ class Settings:
         Raises:
             ValueError: If any configuration is invalid
         """
-        errors: List[str] = []
+        errors: list[str] = []
         
-        # Validate required API keys
-        if not self.openai_api_key or len(self.openai_api_key.strip()) < 10:
-            errors.append("OPENAI_API_KEY is missing or too short (minimum 10 characters)")
-        
-        if not self.grok_api_key or len(self.grok_api_key.strip()) < 10:
-            errors.append("GROK_API_KEY is missing or too short (minimum 10 characters)")
+        # Validate required API keys (length ignores surrounding whitespace)
+        for name, key in (("OPENAI_API_KEY", self.openai_api_key), ("GROK_API_KEY", self.grok_api_key)):
+            if len((key or "").strip()) < 10:
+                errors.append(f"{name} is missing or too short (minimum 10 characters)")
         
         # Validate URLs
         if not self._is_valid_url(self.openai_api_url):
@@ -186,10 +261,10 @@ class Settings:
                 errors.append("CORS_ORIGINS is required in production mode")
             else:
                 for origin in self.cors_origins:
-                    if not self._is_valid_origin(origin):
-                        errors.append(f"Invalid CORS origin: {origin}")
                     if origin == "*":
                         errors.append("Wildcard (*) CORS origin is not allowed in production mode")
+                    elif not self._is_valid_origin(origin):
+                        errors.append(f"Invalid CORS origin: {origin}")
         else:
             # Debug mode: allow wildcards but validate format
             for origin in self.cors_origins:
@@ -204,40 +279,58 @@ class Settings:
         if self.supabase_url and not self.supabase_anon_key:
             errors.append("SUPABASE_ANON_KEY is required when SUPABASE_URL is provided")
         
-        # Validate numeric ranges
-        if not (1 <= self.http_timeout_seconds <= 300):
-            errors.append(f"HTTP_TIMEOUT_SECONDS must be 1-300, got: {self.http_timeout_seconds}")
-        
-        if not (1 <= self.http_max_connections <= 10000):
-            errors.append(f"HTTP_MAX_CONNECTIONS must be 1-10000, got: {self.http_max_connections}")
-        
-        if not (1 <= self.http_max_keepalive <= 10000):
-            errors.append(f"HTTP_MAX_KEEPALIVE must be 1-10000, got: {self.http_max_keepalive}")
-        
-        if not (1 <= self.rate_limit_per_min <= 10000):
-            errors.append(f"RATE_LIMIT_PER_MIN must be 1-10000, got: {self.rate_limit_per_min}")
-        
-        if not (1 <= self.rate_limit_burst <= 20000):
-            errors.append(f"RATE_LIMIT_BURST must be 1-20000, got: {self.rate_limit_burst}")
-        
-        if self.rate_limit_burst < self.rate_limit_per_min:
+        # Validate numeric ranges; a field that fails here skips its later rules
+        numeric_ranges = (
+            ("HTTP_TIMEOUT_SECONDS", self.http_timeout_seconds, 1, 300),
+            ("HTTP_MAX_CONNECTIONS", self.http_max_connections, 1, 10000),
+            ("HTTP_MAX_KEEPALIVE", self.http_max_keepalive, 1, 10000),
+            ("RATE_LIMIT_PER_MIN", self.rate_limit_per_min, 1, 10000),
+            ("RATE_LIMIT_BURST", self.rate_limit_burst, 1, 20000),
+            ("MAX_BACKGROUND_JOBS", self.max_background_jobs, 1, 1000),
+            ("JOB_QUEUE_MAX_SIZE", self.job_queue_max_size, 1, 100000),
+            ("THREADPOOL_MAX_WORKERS", self.threadpool_max_workers, 1, 1000),
+            ("GROK_CONNECT_TIMEOUT", self.grok_connect_timeout, 0.1, 60),
+            ("GROK_WRITE_TIMEOUT", self.grok_write_timeout, 0.1, 120),
+            ("GROK_POOL_TIMEOUT", self.grok_pool_timeout, 0.1, 30),
+        )
+        out_of_range = set()
+        for name, value, low, high in numeric_ranges:
+            if not (low <= value <= high):
+                errors.append(f"{name} must be {low}-{high}, got: {value}")
+                out_of_range.add(name)
+        
+        if (
+            out_of_range.isdisjoint(("RATE_LIMIT_BURST", "RATE_LIMIT_PER_MIN"))
+            and self.rate_limit_burst < self.rate_limit_per_min
+        ):
             errors.append(f"RATE_LIMIT_BURST ({self.rate_limit_burst}) must be >= RATE_LIMIT_PER_MIN ({self.rate_limit_per_min})")
         
-        if not (0.1 <= self.grok_connect_timeout <= 60):
-            errors.append(f"GROK_CONNECT_TIMEOUT must be 0.1-60, got: {self.grok_connect_timeout}")
-        
-        if not (0.1 <= self.grok_write_timeout <= 120):
-            errors.append(f"GROK_WRITE_TIMEOUT must be 0.1-120, got: {self.grok_write_timeout}")
-        
-        if not (0.1 <= self.grok_pool_timeout <= 30):
-            errors.append(f"GROK_POOL_TIMEOUT must be 0.1-30, got: {self.grok_pool_timeout}")
+        if self.rate_limit_storage not in ("memory", "redis"):
+            errors.append(f"RATE_LIMIT_STORAGE must be 'memory' or 'redis', got: {self.rate_limit_storage}")
+        
+        if self.log_level not in _LOG_LEVELS:
+            errors.append(f"LOG_LEVEL must be one of {', '.join(_LOG_LEVELS)}, got: {self.log_level}")
+        
+        if self.job_queue_backend not in ("local", "arq"):
+            errors.append(f"JOB_QUEUE_BACKEND must be 'local' or 'arq', got: {self.job_queue_backend}")
+        
+        # REDIS_URL is checked once and reported once, whichever settings need it
+        redis_users = [
+            name for name, needs_redis in (
+                ("RATE_LIMIT_STORAGE=redis", self.rate_limit_storage == "redis"),
+                ("JOB_QUEUE_BACKEND=arq", self.job_queue_backend == "arq"),
+            ) if needs_redis
+        ]
+        if redis_users and not self._is_valid_redis_url(self.redis_url):
+            errors.append(
+                "REDIS_URL is required and must start with redis://, rediss:// or unix:// when "
+                + " or ".join(redis_users)
+            )
         
         # Validate model names are not empty
-        if not self.openai_model or not self.openai_model.strip():
-            errors.append("OPENAI_MODEL cannot be empty")
-        
-        if not self.grok_model or not self.grok_model.strip():
-            errors.append("GROK_MODEL cannot be empty")
+        for name, model in (("OPENAI_MODEL", self.openai_model), ("GROK_MODEL", self.grok_model)):
+            if not (model or "").strip():
+                errors.append(f"{name} cannot be empty")
         
         # Warn about logical consistency (but don't fail)
         total_grok_timeout = self.grok_connect_timeout + self.grok_write_timeout + self.grok_timeout_seconds
@@ -264,19 +357,17 @@ class Settings:
         Returns:
             bool: True if URL is valid, False otherwise
         """
-        if not url:
+        if not url or any(char.isspace() for char in url):
             return False
         
-        # Simple URL validation pattern
-        url_pattern = re.compile(
-            r'^https?://'  # http:// or https://
-            r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'  # domain...
-            r'localhost|'  # localhost...
-            r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'  # ...or IP
-            r'(?::\d+)?'  # optional port
-            r'(?:/?|[/?]\S+)$', re.IGNORECASE
-        )
-        return bool(url_pattern.match(url))
+        # Linear parse instead of a backtracking regex: http(s) scheme,
+        # a host and, if given, a numeric port
+        try:
+            parts = urlsplit(url)
+            parts.port
+        except ValueError:
+            return False
+        return parts.scheme in _URL_SCHEMES and bool(parts.hostname)
     
     def _is_valid_database_url(self, url: str) -> bool:
         """
@@ -291,16 +382,26 @@ class Settings:
         if not url:
             return False
         
-        # Accept common database URL schemes
-        valid_schemes = (
-            'postgresql://',
-            'postgresql+psycopg://',
-            'postgresql+psycopg2://',
-            'sqlite:///',
-            'mysql://',
-            'mysql+pymysql://'
-        )
-        return any(url.startswith(scheme) for scheme in valid_schemes)
+        scheme, separator, rest = url.partition("://")
+        if not separator or scheme not in _DATABASE_URL_SCHEMES:
+            return False
+        # SQLite URLs carry a path, not a host: sqlite:///relative or sqlite:////absolute
+        return scheme != 'sqlite' or rest.startswith('/')
+    
+    def _is_valid_redis_url(self, url: str) -> bool:
+        """
+        Validate Redis URL format.
+        
+        Args:
+            url: Redis URL string to validate
+            
+        Returns:
+            bool: True if Redis URL is valid, False otherwise
+        """
+        if not url:
+            return False
+        
+        return url.startswith(('redis://', 'rediss://', 'unix://'))
     
     def _is_valid_origin(self, origin: str) -> bool:
         """
@@ -323,17 +424,26 @@ class Settings:
         return origin.startswith(('http://', 'https://'))
     
     @property
-    def connect_args(self) -> dict:
+    def connect_args(self) -> Mapping[str, bool]:
         """Get database connection arguments based on database type."""
-        if self.database_url.startswith("sqlite"):
-            return {"check_same_thread": False}
-        return {}
+        return _SQLITE_CONNECT_ARGS if self._is_sqlite else _NO_CONNECT_ARGS
     
     @property
     def is_sqlite(self) -> bool:
         """Check if using SQLite database."""
-        return self.database_url.startswith("sqlite")
+        return self._is_sqlite
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Return the process-wide Settings instance, built and validated once.
+    
+    Call get_settings.cache_clear() after changing the environment to
+    rebuild it.
+    """
+    return Settings()
 
 
 # Global settings instance
-settings = Settings()
\ No newline at end of file
+settings = get_settings()
@@ -0,0 +1,29 @@
+"""
+Environment bootstrap for PluginMind Backend.
+
+Loads the .env file into os.environ at most once per process, even when
+configuration modules are imported again or reloaded. Deployments can
+bake .env into app/core/_env_baked.py with scripts/bake_env.py; when that
+module exists it is used instead of parsing the file.
+"""
+
+import os
+from dotenv import load_dotenv
+
+_loaded = False
+
+
+def load_env_file() -> None:
+    """Load variables from .env without overriding ones already set (first call only)."""
+    global _loaded
+    if _loaded:
+        return
+    
+    try:
+        from app.core._env_baked import ENV
+    except ImportError:
+        load_dotenv(override=False)
+    else:
+        for key, value in ENV.items():
+            os.environ.setdefault(key, value)
+    _loaded = True
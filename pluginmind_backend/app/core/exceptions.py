@@ -36,6 +36,16 @@ class RateLimitError(AIServiceError):
         self.retry_after = retry_after
 
 
+class AIAuthError(AIServiceError):
+    """Raised when an AI provider rejects the configured API credentials."""
+    pass
+
+
+class AITimeoutError(AIServiceError):
+    """Raised when AI provider requests keep timing out."""
+    pass
+
+
 class InvalidInputError(PluginMindBaseException):
     """Raised when user input validation fails."""
     pass
@@ -87,6 +97,7 @@ class ErrorCodes:
     JOB_NOT_FOUND = "JOB_NOT_FOUND"
     INVALID_INPUT = "INVALID_INPUT"
     AI_SERVICE_ERROR = "AI_SERVICE_ERROR"
+    AI_TIMEOUT = "AI_TIMEOUT"
     RATE_LIMIT_EXCEEDED = "RATE_LIMIT_EXCEEDED"
     DATABASE_ERROR = "DATABASE_ERROR"
     SERVICE_UNAVAILABLE = "SERVICE_UNAVAILABLE"
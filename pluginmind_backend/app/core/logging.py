@@ -4,15 +4,34 @@ Logging configuration for PluginMind Backend.
 Provides centralized logging setup with structured formatting and correlation ID support.
 """
 
+import atexit
 import json
 import logging
+import logging.handlers
+import queue
 import re
 import sys
+from contextvars import ContextVar
 from datetime import datetime
-from typing import Mapping, Any
+from typing import Mapping, Any, Optional
 from app.core.config import settings
 
 
+# Request context stamped onto every record by _context_record_factory; set
+# and reset per request by app.middleware.correlation_id
+request_id_context: ContextVar[str] = ContextVar('request_id', default='-')
+request_route_context: ContextVar[str] = ContextVar('request_route', default=None)
+
+# LogRecord factory wrapped by _context_record_factory
+_base_record_factory = logging.getLogRecordFactory()
+
+# Background listener that owns the real output handler (see setup_logging)
+_log_listener: Optional[logging.handlers.QueueListener] = None
+
+# Log output is buffered up to this size and flushed when the queue drains,
+# coalescing bursts of records into few write() calls on the stdout pipe
+LOG_BUFFER_SIZE = 64 * 1024
+
 # Sensitive header keys that should be redacted in logs
 SENSITIVE_HEADER_KEYS = {"authorization", "proxy-authorization", "x-api-key", "api-key"}
 
@@ -112,74 +131,138 @@ class SecretRedactionFilter(logging.Filter):
         return True
 
 
-class CorrelationIdFilter(logging.Filter):
+def _context_record_factory(*args, **kwargs) -> logging.LogRecord:
     """
-    Logging filter to inject correlation ID and user ID into log records.
+    LogRecord factory that stamps request_id and route onto every record.
     
-    Adds request_id and user_id fields to log records for structured logging
-    and request tracing capabilities.
+    Runs once per record at creation, in the logging task, so the values
+    reflect the request being served regardless of how many handlers the
+    record later passes through.
     """
+    record = _base_record_factory(*args, **kwargs)
+    record.request_id = request_id_context.get()
+    record.route = request_route_context.get()
+    return record
+
+
+def _install_record_factory() -> None:
+    """Wrap the current LogRecord factory with _context_record_factory (once)."""
+    global _base_record_factory
+    current = logging.getLogRecordFactory()
+    if current is not _context_record_factory:
+        _base_record_factory = current
+        logging.setLogRecordFactory(_context_record_factory)
+
+
+class BufferedStreamHandler(logging.StreamHandler):
+    """StreamHandler that leaves flushing to BatchingQueueListener instead of flushing per record."""
     
-    def filter(self, record: logging.LogRecord) -> bool:
-        """
-        Add request_id and user_id to log record.
-        
-        Args:
-            record: Log record to modify
-            
-        Returns:
-            bool: Always True (don't filter out records)
-        """
-        # Import here to avoid circular imports
+    def __init__(self, stream=None, owns_stream: bool = False):
+        super().__init__(stream)
+        self.owns_stream = owns_stream
+    
+    def close(self) -> None:
+        """Close the stream as well when it was opened for this handler."""
         try:
-            from app.middleware.correlation_id import get_request_id, get_request_route
-            record.request_id = get_request_id()
-            record.route = get_request_route()
-        except ImportError:
-            # Fallback if middleware not yet imported
-            record.request_id = "-"
-            record.route = None
-        
-        # Try to extract user_id from request context
-        # For now, user_id extraction is handled at the route level
-        # Individual route handlers can set record.user_id manually if needed
-        # Future enhancement: implement user context variable similar to request_id_context
-        pass
-        
-        return True
+            if self.owns_stream and not self.stream.closed:
+                self.stream.close()
+        finally:
+            super().close()
+    
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+
+class BatchingQueueListener(logging.handlers.QueueListener):
+    """QueueListener that flushes its handlers whenever the queue runs dry."""
+    
+    def dequeue(self, block: bool) -> logging.LogRecord:
+        try:
+            return self.queue.get_nowait()
+        except queue.Empty:
+            for handler in self.handlers:
+                handler.flush()
+            return self.queue.get(block)
+
+
+def _open_log_stream():
+    """
+    Open a LOG_BUFFER_SIZE-buffered text stream on stdout's file descriptor.
+    
+    Falls back to sys.stdout itself when it has no file descriptor (e.g. when
+    captured by a test runner). The descriptor is left open on close.
+    """
+    try:
+        fd = sys.stdout.fileno()
+    except (AttributeError, OSError, ValueError):
+        return sys.stdout
+    return open(
+        fd, "w", buffering=LOG_BUFFER_SIZE, closefd=False,
+        encoding=sys.stdout.encoding or "utf-8", errors="backslashreplace"
+    )
 
 
-def setup_logging() -> None:
+def setup_logging(force: bool = False) -> None:
     """
     Configure application logging with structured format and correlation ID support.
     
     Sets up console logging with appropriate formatting, level, and request ID
     injection based on application settings. Uses JSON formatting for production
     and text formatting for debug mode.
+    
+    Loggers only enqueue records; a background QueueListener formats them and
+    performs the blocking stdout writes, keeping that I/O off the event loop.
+    Request context is stamped on each record by a LogRecord factory when it
+    is created, so it is captured in the logging task, not the listener
+    thread. Output is buffered and flushed each time the queue drains.
+    
+    Idempotent: while the listener is running further calls are no-ops, so
+    modules that each call it at import share one listener thread.
+    
+    Args:
+        force: Stop the running listener and rebuild the configuration
     """
-    # Create handler 
-    handler = logging.StreamHandler(sys.stdout)
+    global _log_listener
+    if _log_listener is not None and not force:
+        return
+    stop_logging()
+    _install_record_factory()
     
-    # Add filters
-    handler.addFilter(CorrelationIdFilter())
-    handler.addFilter(SecretRedactionFilter())
+    # Create the output handler, driven by the listener thread
+    stream = _open_log_stream()
+    handler = BufferedStreamHandler(stream, owns_stream=stream is not sys.stdout)
     
     # Choose formatter based on log level
-    if settings.log_level.upper() == 'DEBUG':
-        # Use text format for local development/debugging
+    if settings.log_level == 'DEBUG':
+        # Use text format for local development/debugging; the defaults cover
+        # records created before the context record factory was installed
         enhanced_format = settings.log_format + " - request_id=%(request_id)s - route=%(route)s"
-        formatter = logging.Formatter(enhanced_format)
+        formatter = logging.Formatter(enhanced_format, defaults={"request_id": "-", "route": None})
     else:
         # Use JSON format for production
         formatter = StructuredJsonFormatter()
     
     handler.setFormatter(formatter)
     
+    # Create the queue handler loggers write to, and add filters
+    queue_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+    queue_handler.addFilter(SecretRedactionFilter())
+    
     # Configure root logger
     root_logger = logging.getLogger()
-    root_logger.setLevel(getattr(logging, settings.log_level.upper()))
+    root_logger.setLevel(settings.log_level)
     root_logger.handlers.clear()  # Remove any existing handlers
-    root_logger.addHandler(handler)
+    root_logger.addHandler(queue_handler)
+    
+    _log_listener = BatchingQueueListener(
+        queue_handler.queue, handler, respect_handler_level=True
+    )
+    _log_listener.start()
     
     # Set specific logger levels
     logging.getLogger("httpx").setLevel(logging.WARNING)
@@ -187,6 +270,40 @@ def setup_logging() -> None:
     logging.getLogger("openai").setLevel(logging.INFO)
 
 
+def stop_logging() -> None:
+    """
+    Flush queued log records and stop the background listener.
+    
+    Records logged afterwards are written synchronously (and unbuffered) with
+    the same formatter and filters, so nothing is lost during shutdown. Safe
+    to call repeatedly.
+    """
+    global _log_listener
+    if _log_listener is None:
+        return
+    
+    listener, _log_listener = _log_listener, None
+    
+    # Drain everything already queued (records keep the context captured when logged)
+    listener.stop()
+    for handler in listener.handlers:
+        handler.flush()
+        handler.close()
+    
+    root_logger = logging.getLogger()
+    for queue_handler in [h for h in root_logger.handlers if isinstance(h, logging.handlers.QueueHandler)]:
+        for buffered_handler in listener.handlers:
+            handler = logging.StreamHandler(sys.stdout)
+            handler.setFormatter(buffered_handler.formatter)
+            for log_filter in queue_handler.filters:
+                handler.addFilter(log_filter)
+            root_logger.addHandler(handler)
+        root_logger.removeHandler(queue_handler)
+
+
+atexit.register(stop_logging)
+
+
 def get_logger(name: str) -> logging.Logger:
     """
     Get a configured logger instance.
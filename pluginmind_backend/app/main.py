@@ -8,15 +8,19 @@ Author: Alexandru G. Mihai
 Version: 2.0.0
 """
 
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from anyio import to_thread
 from fastapi import FastAPI
 
 # Core imports
 from app.core.config import settings
-from app.core.logging import setup_logging, get_logger
+from app.core.logging import setup_logging, stop_logging, get_logger
 
 # Database
 from app.database import create_db_and_tables
+from app.utils.background_tasks import run_job_cleanup_loop, start_job_workers, stop_job_workers
+from app.utils.query_log_writer import start_query_log_writer, stop_query_log_writer
 
 # AI Service Registry
 from app.services.service_initialization import (
@@ -42,6 +46,15 @@ setup_logging()
 logger = get_logger(__name__)
 
 
+async def _prewarm_oidc_issuer() -> None:
+    """Fill the OIDC issuer cache from a worker thread (the discovery fetch blocks)."""
+    try:
+        issuer = await asyncio.to_thread(get_google_issuer)
+        logger.info(f"OIDC issuer cache initialized: {issuer}")
+    except Exception:
+        logger.warning("OIDC issuer cache initialization failed; using fallback")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
@@ -53,15 +66,24 @@ async def lifespan(app: FastAPI):
     """
     # Startup
     logger.info(f"Starting {settings.app_name} v{settings.version}")
+    cleanup_task = None
     
     try:
         # Configuration validation happens during settings import
         logger.info("Validating configuration...")
         logger.info("Configuration validation passed")
         
-        # Initialize database
+        # Size the threadpool that serves sync endpoints and run_in_threadpool
+        to_thread.current_default_thread_limiter().total_tokens = settings.threadpool_max_workers
+        logger.info(f"Threadpool limited to {settings.threadpool_max_workers} workers")
+        
+        # Initialize database off the event loop (blocking DDL), pre-warming
+        # the OIDC issuer cache concurrently
         logger.info("Initializing database...")
-        create_db_and_tables()
+        startup_steps = [asyncio.to_thread(create_db_and_tables)]
+        if not settings.testing:
+            startup_steps.append(_prewarm_oidc_issuer())
+        await asyncio.gather(*startup_steps)
         
         # Initialize AI services registry
         logger.info("Initializing AI services registry...")
@@ -91,6 +113,20 @@ async def lifespan(app: FastAPI):
                 f"(provider: {metadata.provider}, model: {metadata.model})"
             )
         
+        # Connect to the AI providers before the first analysis request
+        if not settings.testing:
+            from app.utils.http import http_client
+            await http_client.warm_up((settings.openai_api_url, settings.grok_api_url))
+        
+        # Write query logs in the background, off the /analyze response path
+        start_query_log_writer()
+        
+        # Run local analysis workers and purge expired jobs periodically
+        # (the arq worker process does both itself)
+        if settings.job_queue_backend == "local":
+            start_job_workers()
+            cleanup_task = asyncio.create_task(run_job_cleanup_loop())
+        
         logger.info("Application startup completed successfully")
         
         yield
@@ -106,6 +142,21 @@ async def lifespan(app: FastAPI):
         # Shutdown
         logger.info("Starting application shutdown")
         
+        # Stop periodic job cleanup
+        if cleanup_task is not None:
+            cleanup_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await cleanup_task
+        
+        # Stop local analysis workers
+        await stop_job_workers()
+        
+        # Write any query logs still queued
+        try:
+            await stop_query_log_writer()
+        except Exception as e:
+            logger.warning(f"Error during query log shutdown: {str(e)}")
+        
         # Cleanup AI services
         try:
             cleanup_ai_services()
@@ -113,6 +164,13 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.warning(f"Error during AI services cleanup: {str(e)}")
         
+        # Close the job queue connection (arq backend only)
+        try:
+            from app.queue import close_queue
+            await close_queue()
+        except Exception as e:
+            logger.warning(f"Error during job queue shutdown: {str(e)}")
+        
         # Gracefully close HTTP client connections
         try:
             from app.utils.http import http_client
@@ -122,6 +180,9 @@ async def lifespan(app: FastAPI):
             logger.warning(f"Error during HTTP client shutdown: {str(e)}")
         
         logger.info("Application shutdown completed")
+        
+        # Flush queued log records last so shutdown messages are written
+        stop_logging()
 
 
 # Initialize FastAPI application
@@ -143,15 +204,6 @@ if not settings.debug:
 
 app = FastAPI(**fastapi_kwargs)
 
-# Pre-warm OIDC issuer cache on startup
-@app.on_event("startup")
-async def _init_oidc_issuer_cache() -> None:
-    try:
-        issuer = get_google_issuer()
-        logger.info(f"OIDC issuer cache initialized: {issuer}")
-    except Exception:
-        logger.warning("OIDC issuer cache initialization failed; using fallback")
-
 # Setup middleware (order matters)
 setup_error_handlers(app)
 app.add_middleware(CorrelationIdMiddleware)
@@ -229,6 +281,8 @@ if __name__ == "__main__":
     import uvicorn
     # Use localhost by default for security, can be overridden via environment
     host = "127.0.0.1" if not settings.debug else "0.0.0.0"  # nosec B104
+    # loop/http "auto" select uvloop and httptools when installed (see
+    # requirements.txt) and fall back to asyncio/h11 otherwise
     uvicorn.run(
         "app.main:app",
         host=host,
@@ -5,25 +5,46 @@ Handles Google ID token verification using Google's public keys and RS256 algori
 Provides FastAPI dependencies for both required and optional authentication.
 """
 
+import base64
+import hashlib
+import json
+import re
 import time
 from typing import Optional, Dict, Any, Tuple
 from fastapi import Request, HTTPException, Depends
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request as StarletteRequest
-from starlette.responses import Response
+from starlette.types import ASGIApp, Receive, Scope, Send
 import requests as http_requests
-from google.auth.transport import requests
-from google.oauth2 import id_token
+from google.auth import jwt as google_jwt
 from app.core.config import settings
 from app.core.logging import get_logger
 from app.core.exceptions import AuthenticationError
+from app.utils.cache import TTLCache
 
 logger = get_logger(__name__)
 
 # 24-hour TTL cache for Google OpenID issuer
 _ISSUER_CACHE_TTL_SECONDS: int = 86400
-_issuer_cache: Tuple[Optional[str], float] = (None, 0.0)  # (issuer, ts)
+_issuer_cache: Tuple[Optional[str], float] = (None, 0.0)  # (issuer, monotonic ts)
+
+# Google's signing certificates (PEM by key ID), fetched over one keep-alive
+# session and kept for the max-age Google sends. A token signed with a key
+# not in the cache forces an early refresh, at most once per minimum interval.
+_GOOGLE_CERTS_URL = "https://www.googleapis.com/oauth2/v1/certs"
+_CERTS_DEFAULT_MAX_AGE_SECONDS: int = 3600
+_CERTS_MIN_REFRESH_SECONDS: int = 60
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+_google_session = http_requests.Session()
+_google_certs: Tuple[Dict[str, str], float, float] = ({}, 0.0, 0.0)  # (certs, expires, fetched) monotonic
+
+# Cache of verified tokens (sha256(token) -> (user identifier, exp claim)).
+# Google ID tokens live an hour and cannot be revoked, so an entry may last
+# as long as the token itself; the exp claim still caps each entry
+_TOKEN_CACHE_TTL_SECONDS: int = 3600
+_TOKEN_CACHE_MAXSIZE: int = 8192
+_token_cache = TTLCache(maxsize=_TOKEN_CACHE_MAXSIZE, ttl=_TOKEN_CACHE_TTL_SECONDS)
 
 security = HTTPBearer(auto_error=False)
 
@@ -34,12 +55,13 @@ def get_google_issuer() -> str:
     Refreshes at most every _ISSUER_CACHE_TTL_SECONDS.
     Falls back to 'https://accounts.google.com' on failure.
     """
+    global _issuer_cache
     issuer, ts = _issuer_cache
-    now = time.time()
+    now = time.monotonic()
     if issuer and (now - ts) < _ISSUER_CACHE_TTL_SECONDS:
         return issuer
     try:
-        discovery = http_requests.get(
+        discovery = _google_session.get(
             "https://accounts.google.com/.well-known/openid-configuration",
             timeout=10
         ).json()
@@ -47,10 +69,41 @@ def get_google_issuer() -> str:
     except Exception:
         new_issuer = "https://accounts.google.com"
     # store and return
-    globals()["_issuer_cache"] = (new_issuer, now)
+    _issuer_cache = (new_issuer, now)
     return new_issuer
 
 
+def get_google_certs(kid: Optional[str] = None) -> Dict[str, str]:
+    """
+    Returns Google's token signing certificates using an in-memory cache.
+    Refreshes when the Cache-Control max-age runs out, or early when `kid`
+    is not among the cached keys (at most every _CERTS_MIN_REFRESH_SECONDS).
+    Raises on fetch failure.
+    """
+    global _google_certs
+    certs, expires_at, fetched_at = _google_certs
+    now = time.monotonic()
+    unknown_kid = kid is not None and kid not in certs
+    if now < expires_at and not (unknown_kid and now - fetched_at >= _CERTS_MIN_REFRESH_SECONDS):
+        return certs
+    response = _google_session.get(_GOOGLE_CERTS_URL, timeout=10)
+    response.raise_for_status()
+    match = _MAX_AGE_RE.search(response.headers.get("cache-control", ""))
+    max_age = int(match.group(1)) if match else _CERTS_DEFAULT_MAX_AGE_SECONDS
+    certs = response.json()
+    _google_certs = (certs, now + max_age, now)
+    return certs
+
+
+def _token_key_id(token: str) -> Optional[str]:
+    """Returns the `kid` from a JWT's (unverified) header, if readable."""
+    try:
+        header = token.split(".", 1)[0]
+        return json.loads(base64.urlsafe_b64decode(header + "=" * (-len(header) % 4))).get("kid")
+    except (ValueError, AttributeError):
+        return None
+
+
 def verify_google_id_token_claims(token: str) -> Dict[str, Any]:
     """
     Verify and decode Google ID token using Google's public keys with explicit validation.
@@ -70,10 +123,10 @@ def verify_google_id_token_claims(token: str) -> Dict[str, Any]:
         # Verify the token using Google's public keys and RS256
         # Note: Clock skew tolerance is handled internally by Google's library
         # which allows for small time differences in exp/iat/nbf claims
-        idinfo = id_token.verify_oauth2_token(
-            token, 
-            requests.Request(), 
-            settings.google_client_id
+        idinfo = google_jwt.decode(
+            token,
+            certs=get_google_certs(_token_key_id(token)),
+            audience=settings.google_client_id
         )
         
         # Explicit audience validation
@@ -99,10 +152,27 @@ def verify_google_id_token_claims(token: str) -> Dict[str, Any]:
         raise HTTPException(status_code=401, detail="Token verification failed")
 
 
+def _cached_user_id(cache_key: bytes) -> Optional[str]:
+    """Return the user of a previously verified, unexpired token, or None."""
+    cached = _token_cache.get(cache_key)
+    if cached is None:
+        return None
+    cached_user_id, cached_exp = cached
+    if cached_exp is None or cached_exp > time.time():
+        return cached_user_id
+    _token_cache.pop(cache_key)
+    return None
+
+
 def verify_google_id_token(token: str) -> str:
     """
     Verify and decode Google ID token using Google's public keys.
     
+    Successful verifications are memoized in a process-local LRU so repeated
+    requests with the same token skip the signature check and JWKS lookup.
+    Entries never outlive the token's own expiry, and a token that fails
+    verification is evicted.
+    
     Args:
         token: Google ID token string from Authorization header
         
@@ -112,25 +182,64 @@ def verify_google_id_token(token: str) -> str:
     Raises:
         HTTPException: 401 if token is invalid or missing required claims
     """
-    idinfo = verify_google_id_token_claims(token)
+    cache_key = hashlib.sha256(token.encode()).digest()
+    cached_user_id = _cached_user_id(cache_key)
+    if cached_user_id is not None:
+        return cached_user_id
     
-    # Extract user identifier - prefer email over sub for user lookup
-    user_id = idinfo.get('email')
-    if not user_id:
-        # Fallback to sub if email is not present
-        user_id = idinfo.get('sub')
+    try:
+        idinfo = verify_google_id_token_claims(token)
         
-    if not user_id:
-        raise AuthenticationError("Invalid token: missing user identifier")
+        # Extract user identifier - prefer email over sub for user lookup
+        user_id = idinfo.get('email')
+        if not user_id:
+            # Fallback to sub if email is not present
+            user_id = idinfo.get('sub')
+            
+        if not user_id:
+            raise AuthenticationError("Invalid token: missing user identifier")
+    except (AuthenticationError, HTTPException):
+        _token_cache.pop(cache_key)
+        raise
+    
+    # Never cache past the token's own expiry
+    ttl = float(_TOKEN_CACHE_TTL_SECONDS)
+    exp = idinfo.get("exp")
+    if not isinstance(exp, (int, float)):
+        exp = None
+    else:
+        ttl = min(ttl, exp - time.time())
+    _token_cache.set(cache_key, (user_id, exp), ttl=ttl)
         
     return user_id
 
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
+async def verify_google_id_token_async(token: str) -> str:
+    """
+    Verify a Google ID token from async code without blocking the event loop.
+    
+    Cached tokens are answered inline; a cache miss may fetch Google's
+    certificates, so verification then runs in the threadpool.
+    
+    Raises:
+        HTTPException: 401 if token is invalid or missing required claims
+    """
+    cached_user_id = _cached_user_id(hashlib.sha256(token.encode()).digest())
+    if cached_user_id is not None:
+        return cached_user_id
+    return await run_in_threadpool(verify_google_id_token, token)
+
+
+def get_current_user(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> str:
     """
     FastAPI dependency for required authentication.
     
-    Extracts and verifies JWT token from Authorization header.
+    Extracts and verifies JWT token from Authorization header. Reuses the
+    identity already verified earlier in the same request (ambient auth
+    middleware or rate limiter) via request.state.verified_user_id.
     
     Returns:
         str: User ID from verified token
@@ -138,15 +247,18 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
     Raises:
         HTTPException: 401 if token is missing or invalid
     """
-    from app.core.logging import get_logger
-    logger = get_logger(__name__)
-    
     if not credentials:
         logger.warning("Authentication failed: Missing Authorization header")
         raise AuthenticationError("Authentication required. Please provide a valid JWT token in the Authorization header.")
     
+    verified_user_id = getattr(request.state, "verified_user_id", None)
+    if verified_user_id is not None:
+        logger.debug("Authentication reused from request state")
+        return verified_user_id
+    
     try:
         user_id = verify_google_id_token(credentials.credentials)
+        request.state.verified_user_id = user_id
         logger.debug("Authentication successful")
         return user_id
     except AuthenticationError as e:
@@ -158,6 +270,7 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
 
 
 def get_current_user_optional(
+    request: Request,
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)
 ) -> Optional[str]:
     """
@@ -174,32 +287,44 @@ def get_current_user_optional(
     if not credentials:
         return None
     
-    return verify_google_id_token(credentials.credentials)
+    verified_user_id = getattr(request.state, "verified_user_id", None)
+    if verified_user_id is not None:
+        return verified_user_id
+    
+    user_id = verify_google_id_token(credentials.credentials)
+    request.state.verified_user_id = user_id
+    return user_id
 
 
-class AmbientJWTAuthMiddleware(BaseHTTPMiddleware):
+class AmbientJWTAuthMiddleware:
     """
     Non-blocking JWT authentication middleware.
     
     Parses Bearer JWT token if present and sets request.state.user.
     Does not enforce authentication - that remains in route dependencies.
+    Plain ASGI middleware; request.state lives in the scope, so the app
+    sees the values set here.
     """
     
-    def __init__(self, app):
-        super().__init__(app)
+    def __init__(self, app: ASGIApp):
+        self.app = app
         logger.info("Ambient JWT auth middleware initialized")
     
-    async def dispatch(self, request: StarletteRequest, call_next) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         Parse JWT token if present and set request state.
         
         Args:
-            request: Incoming HTTP request
-            call_next: Next middleware or application handler
-            
-        Returns:
-            Response: HTTP response with user state potentially set
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
         """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        request = StarletteRequest(scope)
+        
         # Initialize request state
         request.state.user = None
         
@@ -210,8 +335,9 @@ class AmbientJWTAuthMiddleware(BaseHTTPMiddleware):
             
             try:
                 # Verify token and set user in request state
-                user_id = verify_google_id_token(token)
+                user_id = await verify_google_id_token_async(token)
                 request.state.user = user_id
+                request.state.verified_user_id = user_id
                 logger.debug("Set ambient user in request state")
             except HTTPException:
                 # Invalid token - just log and continue (non-blocking)
@@ -221,8 +347,7 @@ class AmbientJWTAuthMiddleware(BaseHTTPMiddleware):
                 logger.warning(f"Unexpected error parsing JWT token: {str(e)}")
         
         # Continue processing
-        response = await call_next(request)
-        return response
+        await self.app(scope, receive, send)
 
 
 # Dependency aliases for cleaner imports
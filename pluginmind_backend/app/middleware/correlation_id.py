@@ -7,36 +7,33 @@ for better debugging and monitoring capabilities.
 
 import re
 import uuid
-import contextvars
 from typing import Optional
 
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
 from starlette.requests import Request
-from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from app.core.logging import get_logger
+# Context variables live in app.core.logging so its LogRecord factory can stamp them on each record
+from app.core.logging import get_logger, request_id_context, request_route_context
 
 logger = get_logger(__name__)
 
-# Context variables to store request information across the request lifecycle
-request_id_context: contextvars.ContextVar[str] = contextvars.ContextVar('request_id', default='-')
-request_route_context: contextvars.ContextVar[str] = contextvars.ContextVar('request_route', default=None)
-
 # Regex for validating request ID format (alphanumeric, hyphens, underscores, dots)
 REQUEST_ID_PATTERN = re.compile(r'^[A-Za-z0-9\-_.]{1,64}$')
 
 
-class CorrelationIdMiddleware(BaseHTTPMiddleware):
+class CorrelationIdMiddleware:
     """
     Middleware to handle correlation IDs and route information for request tracing.
     
     Reads incoming X-Request-ID header if present and valid,
     otherwise generates a new UUID. Also captures the request route/endpoint.
     Sets both ID and route in context for logging and adds ID to response header.
+    Plain ASGI middleware, so the context is set in the task that runs the app.
     """
     
-    def __init__(self, app):
-        super().__init__(app)
+    def __init__(self, app: ASGIApp):
+        self.app = app
         logger.info("Correlation ID middleware initialized")
     
     def _get_or_generate_request_id(self, request: Request) -> str:
@@ -53,15 +50,15 @@ class CorrelationIdMiddleware(BaseHTTPMiddleware):
         incoming_id = request.headers.get("x-request-id")
         
         if incoming_id and self._is_valid_request_id(incoming_id):
-            logger.debug(f"Using incoming request ID: {incoming_id}")
+            logger.debug("Using incoming request ID: %s", incoming_id)
             return incoming_id
         else:
             # Generate new UUID-based request ID
             new_id = str(uuid.uuid4())
             if incoming_id:
-                logger.debug(f"Invalid incoming request ID '{incoming_id}', generated new: {new_id}")
+                logger.debug("Invalid incoming request ID '%s', generated new: %s", incoming_id, new_id)
             else:
-                logger.debug(f"No incoming request ID, generated new: {new_id}")
+                logger.debug("No incoming request ID, generated new: %s", new_id)
             return new_id
     
     def _is_valid_request_id(self, request_id: str) -> bool:
@@ -101,17 +98,21 @@ class CorrelationIdMiddleware(BaseHTTPMiddleware):
             # If anything goes wrong, return unknown
             return 'unknown'
     
-    async def dispatch(self, request: Request, call_next) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         Process request with correlation ID and route handling.
         
         Args:
-            request: Incoming HTTP request
-            call_next: Next middleware or application handler
-            
-        Returns:
-            Response: HTTP response with X-Request-ID header
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel; X-Request-ID is added to the response start
         """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        request = Request(scope)
+        
         # Get or generate request ID
         request_id = self._get_or_generate_request_id(request)
         
@@ -122,14 +123,15 @@ class CorrelationIdMiddleware(BaseHTTPMiddleware):
         request_id_token = request_id_context.set(request_id)
         route_token = request_route_context.set(route_path)
         
+        async def send_with_request_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Add request ID to response headers
+                MutableHeaders(scope=message)["X-Request-ID"] = request_id
+            await send(message)
+        
         try:
             # Process request
-            response = await call_next(request)
-            
-            # Add request ID to response headers
-            response.headers["X-Request-ID"] = request_id
-            
-            return response
+            await self.app(scope, receive, send_with_request_id)
             
         finally:
             # Clean up context
@@ -27,7 +27,7 @@ def setup_cors(app: FastAPI) -> None:
     
     app.add_middleware(
         CORSMiddleware,
-        allow_origins=settings.cors_origins,  # Specific frontend domains
+        allow_origins=settings.cors_origins_set,  # Specific frontend domains (O(1) lookup)
         allow_credentials=True,  # Allow cookies and auth headers
         allow_methods=["GET", "POST", "OPTIONS"],  # Restrict to needed methods
         allow_headers=[  # Explicit header allowlist for security
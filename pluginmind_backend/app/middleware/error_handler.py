@@ -5,6 +5,7 @@ Provides centralized exception handling for consistent error responses
 and proper logging of application errors with single source of truth mapping.
 """
 
+from functools import lru_cache
 from typing import Dict, Type, Tuple, Optional
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.exceptions import RequestValidationError
@@ -16,6 +17,8 @@ from app.core.exceptions import (
     PluginMindBaseException,
     RateLimitError,
     AIServiceError,
+    AIAuthError,
+    AITimeoutError,
     InvalidInputError,
     JobNotFoundError,
     AuthenticationError,
@@ -38,6 +41,8 @@ EXCEPTION_MAP: Dict[Type[PluginMindBaseException], Tuple[int, str]] = {
     ServiceUnavailableError: (503, ErrorCodes.SERVICE_UNAVAILABLE),
     RateLimitError: (429, ErrorCodes.RATE_LIMIT_EXCEEDED),
     AIServiceError: (502, ErrorCodes.AI_SERVICE_ERROR),
+    AIAuthError: (502, ErrorCodes.AI_SERVICE_ERROR),
+    AITimeoutError: (504, ErrorCodes.AI_TIMEOUT),
     InvalidInputError: (400, ErrorCodes.INVALID_INPUT),
     JobNotFoundError: (404, ErrorCodes.JOB_NOT_FOUND),
     DatabaseError: (500, ErrorCodes.DATABASE_ERROR),
@@ -52,12 +57,36 @@ EXCEPTION_MESSAGES: Dict[Type[PluginMindBaseException], str] = {
     ServiceUnavailableError: "Service temporarily unavailable. Please try again later.",
     RateLimitError: "Too many requests. Please try again later.",
     AIServiceError: "External AI service temporarily unavailable. Please try again.",
+    AIAuthError: "External AI service temporarily unavailable. Please try again.",
+    AITimeoutError: "External AI service timed out. Please try again.",
     InvalidInputError: None,  # Use original message (safe for users)
     JobNotFoundError: "Requested job was not found.",
     DatabaseError: "Database operation failed. Please try again.",
 }
 
 
+@lru_cache(maxsize=None)
+def resolve_exception(exc_type: Type[PluginMindBaseException]) -> Optional[Tuple[int, str, Optional[str]]]:
+    """
+    Resolve the (status_code, error_code, message) mapping for an exception type.
+    
+    Unmapped subclasses inherit the entry of their nearest mapped base class.
+    Results are memoized per type, so each raise costs a single cache hit.
+    
+    Args:
+        exc_type: Exception class to resolve
+        
+    Returns:
+        Mapping tuple (message None means use the exception's own text),
+        or None if no class in its hierarchy is mapped
+    """
+    for base in exc_type.__mro__:
+        if base in EXCEPTION_MAP:
+            status_code, error_code = EXCEPTION_MAP[base]
+            return status_code, error_code, EXCEPTION_MESSAGES.get(base)
+    return None
+
+
 def create_error_response(message: str, code: str, status_code: int, extra_headers: Optional[Dict[str, str]] = None) -> JSONResponse:
     """
     Create standardized error response.
@@ -231,12 +260,11 @@ def setup_error_handlers(app: FastAPI) -> None:
         correlation_id = get_request_id()
         exc_type = type(exc)
         
-        # Get status code and error code from mapping
-        if exc_type in EXCEPTION_MAP:
-            status_code, error_code = EXCEPTION_MAP[exc_type]
+        # Get status code, error code and message from mapping
+        mapping = resolve_exception(exc_type)
+        if mapping is not None:
+            status_code, error_code, message = mapping
             
-            # Get user-friendly message or use original if safe
-            message = EXCEPTION_MESSAGES.get(exc_type)
             if message is None:
                 # Use original exception message (marked as safe for users)
                 message = str(exc)
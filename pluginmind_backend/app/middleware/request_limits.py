@@ -5,9 +5,9 @@ Prevents oversized request payloads to protect against memory exhaustion
 and denial-of-service attacks.
 """
 
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response, JSONResponse
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from app.core.config import settings
 from app.core.logging import get_logger
@@ -17,46 +17,53 @@ from app.core.exceptions import ErrorCodes
 logger = get_logger(__name__)
 
 
-class BodySizeLimitMiddleware(BaseHTTPMiddleware):
+class BodySizeLimitMiddleware:
     """
     Middleware to limit request body size.
     
     Rejects requests with bodies larger than the configured limit
-    with a 413 status code and safe JSON response.
+    with a 413 status code and safe JSON response. Plain ASGI middleware,
+    so accepted requests pass straight through to the app.
     """
     
-    def __init__(self, app):
-        super().__init__(app)
+    def __init__(self, app: ASGIApp):
+        self.app = app
         self.max_bytes = settings.body_max_bytes
         logger.info(f"Body size limit middleware initialized with max_bytes={self.max_bytes}")
     
-    async def dispatch(self, request: Request, call_next) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
         # Check Content-Length header if present
-        content_length = request.headers.get("content-length")
-        if content_length is not None:
-            try:
-                content_length = int(content_length)
-                if content_length > self.max_bytes:
-                    logger.warning(
-                        f"Request rejected: body size {content_length} exceeds limit {self.max_bytes} "
-                        f"from {request.client.host if request.client else 'unknown'}"
-                    )
-                    correlation_id = get_request_id()
-                    return JSONResponse(
-                        status_code=413,
-                        content={
-                            "error": {
-                                "message": "Request body too large. Maximum size allowed is 1MB.",
-                                "code": ErrorCodes.REQUEST_TOO_LARGE,
-                                "correlation_id": correlation_id
-                            }
-                        }
-                    )
-            except (ValueError, TypeError):
-                # Invalid Content-Length header, let it pass and potentially fail later
-                pass
+        content_length = Headers(scope=scope).get("content-length")
+        try:
+            body_size = int(content_length) if content_length is not None else None
+        except ValueError:
+            # Invalid Content-Length header, let it pass and potentially fail later
+            body_size = None
+        
+        if body_size is not None and body_size > self.max_bytes:
+            client = scope.get("client")
+            logger.warning(
+                f"Request rejected: body size {body_size} exceeds limit {self.max_bytes} "
+                f"from {client[0] if client else 'unknown'}"
+            )
+            correlation_id = get_request_id()
+            response = JSONResponse(
+                status_code=413,
+                content={
+                    "error": {
+                        "message": "Request body too large. Maximum size allowed is 1MB.",
+                        "code": ErrorCodes.REQUEST_TOO_LARGE,
+                        "correlation_id": correlation_id
+                    }
+                }
+            )
+            await response(scope, receive, send)
+            return
         
         # For requests without Content-Length, we'll let them pass
         # and rely on the body reading to enforce limits if needed
-        response = await call_next(request)
-        return response
\ No newline at end of file
+        await self.app(scope, receive, send)
\ No newline at end of file
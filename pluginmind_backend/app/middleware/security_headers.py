@@ -5,14 +5,13 @@ Adds production-grade HTTP security headers to all responses.
 Headers are configured based on environment (production vs development).
 """
 
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.core.config import settings
 
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
+class SecurityHeadersMiddleware:
     """
     Middleware to add security headers to all HTTP responses.
     
@@ -21,23 +20,32 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
     
     In development (debug=True):
     - Adds all security headers except HSTS (to avoid sticky browser state on http://localhost)
+    
+    Implemented as plain ASGI middleware: headers are added to the
+    response start message, without BaseHTTPMiddleware's per-request
+    task and body stream.
     """
     
-    def __init__(self, app):
-        super().__init__(app)
+    def __init__(self, app: ASGIApp):
+        self.app = app
         self.is_production = not settings.debug
+        self.security_headers = self._get_security_headers()
     
-    async def dispatch(self, request: Request, call_next) -> Response:
-        response = await call_next(request)
-        
-        # Only add headers if they don't already exist (idempotent)
-        headers_to_add = self._get_security_headers()
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         
-        for header_name, header_value in headers_to_add.items():
-            if header_name not in response.headers:
-                response.headers[header_name] = header_value
+        async def send_with_security_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Only add headers if they don't already exist (idempotent)
+                headers = MutableHeaders(scope=message)
+                for header_name, header_value in self.security_headers.items():
+                    if header_name not in headers:
+                        headers[header_name] = header_value
+            await send(message)
         
-        return response
+        await self.app(scope, receive, send_with_security_headers)
     
     def _get_security_headers(self) -> dict[str, str]:
         """Get security headers based on environment."""
@@ -11,13 +11,18 @@ All models use SQLModel for type safety and automatic FastAPI integration.
 
 from sqlmodel import SQLModel, Field, Column
 from sqlalchemy import JSON
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional, Dict, Any
 from enum import Enum
 
 from app.models.enums import JobStatus
 
 
+def utc_now() -> datetime:
+    """Current time as a timezone-aware UTC datetime (for timestamp columns)."""
+    return datetime.now(timezone.utc)
+
+
 class AnalysisResultStatus(str, Enum):
     """Status enumeration for generic analysis results."""
     PENDING = "PENDING"
@@ -45,7 +50,7 @@ class AnalysisJob(SQLModel, table=True):
     status: JobStatus = Field(default=JobStatus.QUEUED, description="Current processing status")
     
     # Timestamps for job lifecycle tracking
-    created_at: datetime = Field(default_factory=datetime.now, description="Job creation time")
+    created_at: datetime = Field(default_factory=utc_now, index=True, description="Job creation time")
     completed_at: Optional[datetime] = Field(None, description="Job completion time")
     
     # AI processing results
@@ -70,7 +75,7 @@ class User(SQLModel, table=True):
     # Primary key and basic info
     id: Optional[int] = Field(default=None, primary_key=True)
     email: str = Field(unique=True, index=True, description="User email address")
-    created_at: datetime = Field(default_factory=datetime.now, description="Account creation time")
+    created_at: datetime = Field(default_factory=utc_now, description="Account creation time")
     
     # Subscription and usage tracking
     subscription_tier: str = Field(default="free", description="Subscription level: free, pro, premium")
@@ -101,7 +106,7 @@ class QueryLog(SQLModel, table=True):
     ai_result: Optional[str] = Field(None, description="Final analysis result from Grok")
     
     # Performance and status tracking
-    created_at: datetime = Field(default_factory=datetime.now, description="Query timestamp")
+    created_at: datetime = Field(default_factory=utc_now, description="Query timestamp")
     response_time_ms: Optional[int] = Field(None, description="Total processing time in milliseconds")
     success: bool = Field(default=True, description="Whether query completed successfully")
     error_message: Optional[str] = Field(None, description="Error details if query failed")
@@ -140,7 +145,7 @@ class AnalysisResult(SQLModel, table=True):
     processing_metadata: Optional[Dict[str, Any]] = Field(None, sa_column=Column(JSON), description="Additional processing metadata")
     
     # Timestamps
-    created_at: datetime = Field(default_factory=datetime.now, index=True, description="Creation time")
+    created_at: datetime = Field(default_factory=utc_now, index=True, description="Creation time")
     updated_at: Optional[datetime] = Field(None, description="Last update time")
     
     # Performance tracking
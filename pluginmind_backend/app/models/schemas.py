@@ -5,6 +5,7 @@ Defines the API contract for all endpoints including validation,
 serialization, and documentation.
 """
 
+import re
 from datetime import datetime
 from enum import Enum
 from typing import Optional
@@ -13,6 +14,11 @@ from pydantic import BaseModel, Field, field_validator
 from app.core.config import settings
 from app.ash_prompt import AnalysisType
 
+# Cheap pre-filters applied before any AI provider is called: input must
+# contain a word (two or more letters in any script) and no control characters
+_WORD_PATTERN = re.compile(r"[^\W\d_]{2,}")
+_CONTROL_CHARS_PATTERN = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]")
+
 
 class SubscriptionTier(str, Enum):
     """Enumeration of subscription tiers."""
@@ -53,13 +59,18 @@ class AnalysisRequest(BaseModel):
             Cleaned and validated input string
             
         Raises:
-            ValueError: If input is empty or whitespace only after strip
+            ValueError: If input is empty or whitespace only after strip,
+                contains control characters or has no words
         """
         stripped = v.strip()
         if not stripped:
             raise ValueError("User input cannot be empty or whitespace only")
         if len(stripped) < 1:
             raise ValueError("User input must be at least 1 character after trimming whitespace")
+        if _CONTROL_CHARS_PATTERN.search(stripped):
+            raise ValueError("User input cannot contain control characters")
+        if not _WORD_PATTERN.search(stripped):
+            raise ValueError("User input must contain at least one word")
         return stripped
 
 
@@ -82,6 +93,21 @@ class JobResult(BaseModel):
     error: Optional[str] = Field(None, description="Error message if job failed")
 
 
+class JobSummary(BaseModel):
+    """Summary model for a single job in the jobs listing."""
+    status: str = Field(description="Current job status")
+    created_at: datetime = Field(description="Job creation timestamp")
+    completed_at: Optional[datetime] = Field(None, description="Job completion timestamp")
+    user_id: Optional[str] = Field(None, description="User identifier")
+    has_error: bool = Field(description="Whether the job failed with an error")
+
+
+class JobsListResponse(BaseModel):
+    """Response model for jobs listing."""
+    total_jobs: int = Field(description="Total number of jobs across all pages")
+    jobs: dict[str, JobSummary] = Field(description="Job summaries keyed by job ID")
+
+
 class AnalysisResponse(BaseModel):
     """Response model for synchronous analysis results (legacy crypto format)."""
     optimized_prompt: str = Field(description="AI-optimized prompt from OpenAI")
@@ -104,6 +130,29 @@ class HealthResponse(BaseModel):
     active_jobs: Optional[int] = Field(None, description="Number of active background jobs")
 
 
+class LivenessResponse(BaseModel):
+    """Response model for liveness probe."""
+    status: str = Field(description="Liveness status")
+
+
+class ReadinessResponse(BaseModel):
+    """Response model for readiness probe."""
+    status: str = Field(description="Readiness status")
+    checks: dict[str, str] = Field(description="Result of each readiness check")
+
+
+class VersionResponse(BaseModel):
+    """Response model for version information."""
+    name: str = Field(description="Application name")
+    version: str = Field(description="Application version")
+    git_sha: str = Field(description="Deployed git commit SHA")
+
+
+class MessageResponse(BaseModel):
+    """Response model for simple confirmation messages."""
+    message: str = Field(description="Human-readable result message")
+
+
 class QueryLogSummary(BaseModel):
     """Summary model for query log entries (for debugging endpoint)."""
     id: int = Field(description="Log entry ID")
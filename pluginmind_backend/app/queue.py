@@ -0,0 +1,69 @@
+"""
+Async analysis job dispatch.
+
+Hands queued analysis jobs to whichever backend JOB_QUEUE_BACKEND selects:
+in-process asyncio tasks ("local") or an arq worker process fed through
+Redis ("arq"). The AnalysisJob row is the source of truth either way; the
+queue only carries the job ID and input.
+"""
+
+from typing import Any, Optional
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.utils.background_tasks import schedule_analysis_job
+
+logger = get_logger(__name__)
+
+# arq task name registered in app.workers.WorkerSettings
+ANALYSIS_TASK_NAME = "run_analysis_job"
+
+# Lazily created arq Redis pool, shared for the lifetime of the process
+_arq_pool: Optional[Any] = None
+
+
+async def _get_arq_pool() -> Any:
+    """
+    Return the shared arq connection pool, creating it on first use.
+
+    Raises:
+        ImportError: If the arq package is not installed
+    """
+    global _arq_pool
+    if _arq_pool is None:
+        try:
+            from arq import create_pool
+            from arq.connections import RedisSettings
+        except ImportError as e:
+            raise ImportError(
+                "JOB_QUEUE_BACKEND=arq requires the 'arq' package (pip install arq)"
+            ) from e
+
+        _arq_pool = await create_pool(RedisSettings.from_dsn(settings.redis_url))
+        logger.info("Connected arq job queue")
+    return _arq_pool
+
+
+async def enqueue_analysis(job_id: str, user_input: str) -> None:
+    """
+    Dispatch an already persisted analysis job for processing.
+
+    Args:
+        job_id: Unique job identifier
+        user_input: User's analysis query
+    """
+    if settings.job_queue_backend == "arq":
+        pool = await _get_arq_pool()
+        # Reusing the job ID makes arq drop duplicate enqueues of the same job
+        await pool.enqueue_job(ANALYSIS_TASK_NAME, job_id, user_input, _job_id=job_id)
+        logger.debug("Enqueued analysis job %s on arq", job_id)
+    else:
+        await schedule_analysis_job(job_id, user_input)
+
+
+async def close_queue() -> None:
+    """Close the arq connection pool if one was opened."""
+    global _arq_pool
+    if _arq_pool is not None:
+        await _arq_pool.close()
+        _arq_pool = None
@@ -7,8 +7,10 @@ through the registry system to deliver comprehensive analysis for multiple use c
 
 import time
 from typing import Tuple, Optional, Dict, Any
+from fastapi.concurrency import run_in_threadpool
 from sqlmodel import Session
 from app.core.logging import get_logger
+from app.database import engine
 from app.models.database import QueryLog, AnalysisResult, AnalysisResultStatus
 from app.core.exceptions import AIServiceError, ServiceUnavailableError
 from app.services.ai_service_interface import (
@@ -17,6 +19,7 @@ from app.services.ai_service_interface import (
     ai_service_registry
 )
 from app.ash_prompt import AnalysisType, prompt_engine
+from app.utils.query_log_writer import save_query_log
 
 logger = get_logger(__name__)
 
@@ -111,8 +114,7 @@ class AnalysisService:
         user_id: Optional[str] = None,
         analysis_id: Optional[str] = None,
         metadata: Optional[Dict[str, Any]] = None,
-        use_fallback: bool = True,
-        session: Optional[Session] = None
+        use_fallback: bool = True
     ) -> Dict[str, Any]:
         """
         Perform generic AI analysis workflow using the enhanced registry system.
@@ -120,7 +122,9 @@ class AnalysisService:
         Coordinates the complete workflow:
         1. Generate optimized prompt for the analysis type
         2. Process content using appropriate AI service
-        3. Store results in AnalysisResult model
+        3. Store results in AnalysisResult model (short-lived session opened
+           only after the AI calls complete, so no DB connection is held
+           while waiting on providers)
         
         Args:
             user_input: Raw user query or content
@@ -138,12 +142,13 @@ class AnalysisService:
             ServiceUnavailableError: If required services are unavailable
         """
         try:
-            logger.info(f"Starting {analysis_type} analysis workflow for user: {user_id}")
+            logger.info("Starting %s analysis workflow for user: %s", analysis_type, user_id)
             
             # Step 1: Generate optimized prompt for the analysis type
             system_prompt = self.prompt_engine.get_system_prompt(analysis_type)
             
-            # Step 2: Get prompt optimizer from registry
+            # Step 2: Resolve both services before any provider call so a
+            # missing analyzer fails fast instead of after a paid optimization
             prompt_optimizer = self._get_prompt_optimizer()
             optimizer_metadata = prompt_optimizer.get_metadata()
             logger.info(
@@ -151,10 +156,6 @@ class AnalysisService:
                 f"(provider: {optimizer_metadata.provider})"
             )
             
-            # Step 3: Optimize prompt using selected service
-            optimized_prompt = await prompt_optimizer.process(user_input)
-            
-            # Step 4: Get appropriate analyzer for the analysis type
             analyzer = self._get_analyzer_for_type(analysis_type)
             analyzer_metadata = analyzer.get_metadata()
             logger.info(
@@ -162,10 +163,13 @@ class AnalysisService:
                 f"(provider: {analyzer_metadata.provider}, type: {analysis_type})"
             )
             
-            # Step 5: Process with the analyzer
+            # Step 3: Optimize prompt using selected service
+            optimized_prompt = await prompt_optimizer.process(user_input)
+            
+            # Step 4: Process with the analyzer
             analysis_result = await analyzer.process(optimized_prompt)
             
-            # Step 6: Store result using AnalysisResult model if session provided
+            # Step 5: Store result using AnalysisResult model if session provided
             result_data = {
                 "analysis_type": analysis_type,
                 "optimized_prompt": optimized_prompt,
@@ -186,8 +190,8 @@ class AnalysisService:
                 "metadata": metadata or {}
             }
             
-            # Store in database if session provided
-            if session and analysis_id:
+            # Store in database if an analysis ID was provided
+            if analysis_id:
                 try:
                     analysis_record = AnalysisResult(
                         analysis_id=analysis_id,
@@ -197,9 +201,8 @@ class AnalysisService:
                         result_data=result_data,
                         status=AnalysisResultStatus.COMPLETED
                     )
-                    session.add(analysis_record)
-                    session.commit()
-                    logger.info(f"Stored analysis result in database (id: {analysis_id})")
+                    await run_in_threadpool(self._save_record, analysis_record)
+                    logger.info("Stored analysis result in database (id: %s)", analysis_id)
                 except Exception as db_error:
                     logger.warning(f"Failed to store analysis result: {str(db_error)}")
                     # Don't fail the analysis if database storage fails
@@ -273,9 +276,10 @@ class AnalysisService:
             ServiceUnavailableError: If required services are unavailable
         """
         try:
-            logger.info(f"Starting analysis workflow for user: {user_id}")
+            logger.info("Starting analysis workflow for user: %s", user_id)
             
-            # Step 1: Get prompt optimizer from registry
+            # Step 1: Resolve both services up front; Grok needs the optimized
+            # prompt, so the provider calls themselves stay sequential
             prompt_optimizer = self._get_prompt_optimizer()
             optimizer_metadata = prompt_optimizer.get_metadata()
             logger.info(
@@ -283,10 +287,6 @@ class AnalysisService:
                 f"(provider: {optimizer_metadata.provider})"
             )
             
-            # Step 2: Optimize prompt using selected service
-            optimized_prompt = await prompt_optimizer.process(user_input)
-            
-            # Step 3: Get crypto analyzer from registry
             crypto_analyzer = self._get_crypto_analyzer()
             analyzer_metadata = crypto_analyzer.get_metadata()
             logger.info(
@@ -294,7 +294,10 @@ class AnalysisService:
                 f"(provider: {analyzer_metadata.provider})"
             )
             
-            # Step 4: Get analysis from selected service
+            # Step 2: Optimize prompt using selected service
+            optimized_prompt = await prompt_optimizer.process(user_input)
+            
+            # Step 3: Get analysis from selected service
             analysis_result = await crypto_analyzer.process(optimized_prompt)
             
             logger.info(
@@ -369,7 +372,6 @@ class AnalysisService:
     async def perform_analysis_with_logging(
         self,
         user_input: str,
-        session: Session,
         user_id: str = "test_user"
     ) -> Tuple[str, str]:
         """
@@ -377,10 +379,12 @@ class AnalysisService:
         
         Executes the full analysis workflow while logging all details
         to the database for usage tracking and performance monitoring.
+        The query log is handed to the background writer after the AI calls
+        finish, so no DB connection is held while they run and the response
+        does not wait for the insert.
         
         Args:
             user_input: Raw user query
-            session: Database session for logging
             user_id: User identifier for tracking
             
         Returns:
@@ -389,7 +393,7 @@ class AnalysisService:
         Raises:
             AIServiceError: If analysis fails
         """
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         # Initialize query log
         query_log = QueryLog(
@@ -404,33 +408,37 @@ class AnalysisService:
             )
             
             # Calculate response time and log success
-            response_time_ms = int((time.time() - start_time) * 1000)
+            response_time_ms = int((time.perf_counter() - start_time) * 1000)
             query_log.optimized_prompt = optimized_prompt
             query_log.ai_result = analysis_result
             query_log.response_time_ms = response_time_ms
             query_log.success = True
             
             # Save successful query log
-            session.add(query_log)
-            session.commit()
+            await save_query_log(query_log)
             
-            logger.info(f"Analysis completed in {response_time_ms}ms")
+            logger.info("Analysis completed in %sms", response_time_ms)
             return optimized_prompt, analysis_result
             
         except Exception as e:
             # Log failed query
-            response_time_ms = int((time.time() - start_time) * 1000)
+            response_time_ms = int((time.perf_counter() - start_time) * 1000)
             query_log.response_time_ms = response_time_ms
             query_log.success = False
             query_log.error_message = str(e)
             
             # Save failed query log
-            session.add(query_log)
-            session.commit()
+            await save_query_log(query_log)
             
             logger.error(f"Analysis failed after {response_time_ms}ms: {str(e)}")
             raise
     
+    def _save_record(self, record: AnalysisResult) -> None:
+        """Persist a record in a short-lived session (blocking; call via the threadpool)."""
+        with Session(engine) as session:
+            session.add(record)
+            session.commit()
+    
     async def health_check(self) -> dict:
         """
         Perform health checks on all registered AI services.
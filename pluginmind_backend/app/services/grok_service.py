@@ -253,6 +253,7 @@ class GrokService(AIService):
             
         Raises:
             HTTPException: 502 on failure after retries
+            AIServiceError: On upstream auth failure, timeout or rate limiting
         """
         if not request_id:
             request_id = str(uuid.uuid4())[:8]
@@ -278,6 +279,9 @@ class GrokService(AIService):
         except HTTPException:
             # Re-raise HTTP exceptions from retry logic
             raise
+        except AIServiceError:
+            # Re-raise typed upstream failures (auth, timeout, rate limit)
+            raise
         except Exception as e:
             logger.error(
                 f"Unexpected error in Grok request (request_id={request_id}): {str(e)}"
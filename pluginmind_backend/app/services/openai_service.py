@@ -8,12 +8,11 @@ optimization step (Deconstruct → Diagnose → Develop).
 import json
 import uuid
 from typing import Optional, Dict, Any
-from openai import AsyncOpenAI
 from fastapi import HTTPException
 from app.core.config import settings
 from app.core.logging import get_logger, redact_headers
 from app.core.exceptions import AIServiceError, RateLimitError, ServiceUnavailableError
-from app.ash_prompt import ASH_SYSTEM_PROMPT
+from app.ash_prompt import ASH_SYSTEM_PROMPT, ASH_SYSTEM_MESSAGE, ASH_SYSTEM_MESSAGE_JSON
 from app.utils.http import http_client
 from app.services.ai_service_interface import (
     AIService, 
@@ -23,6 +22,40 @@ from app.services.ai_service_interface import (
 
 logger = get_logger(__name__)
 
+# Compact JSON encoding, matching ASH_SYSTEM_MESSAGE_JSON
+_JSON_SEPARATORS = (",", ":")
+
+
+def _dumps(value: Any) -> bytes:
+    """Encode a value as compact UTF-8 JSON."""
+    return json.dumps(value, separators=_JSON_SEPARATORS, ensure_ascii=False).encode("utf-8")
+
+
+def _encode_payload(payload: Dict[str, Any]) -> bytes:
+    """
+    Serialize a chat completion payload to JSON bytes.
+    
+    When the payload uses the shared default system message, its
+    pre-encoded JSON is spliced in rather than re-serializing the
+    (multi-kilobyte) system prompt on every request.
+    
+    Args:
+        payload: Request payload built by prepare_request
+        
+    Returns:
+        bytes: JSON request body
+    """
+    messages = payload.get("messages")
+    if not messages or messages[0] is not ASH_SYSTEM_MESSAGE:
+        return _dumps(payload)
+    
+    encoded_messages = [ASH_SYSTEM_MESSAGE_JSON] + [_dumps(message) for message in messages[1:]]
+    fields = [
+        _dumps(key) + b":" + (b"[" + b",".join(encoded_messages) + b"]" if key == "messages" else _dumps(value))
+        for key, value in payload.items()
+    ]
+    return b"{" + b",".join(fields) + b"}"
+
 
 class OpenAIService(AIService):
     """
@@ -151,11 +184,17 @@ class OpenAIService(AIService):
         temperature = kwargs.get("temperature", self._metadata.temperature)
         max_tokens = kwargs.get("max_tokens", self._metadata.max_tokens)
         
+        # Reuse the prebuilt default system message (pre-encoded in _encode_payload)
+        if system_prompt is ASH_SYSTEM_PROMPT:
+            system_message = ASH_SYSTEM_MESSAGE
+        else:
+            system_message = {"role": "system", "content": system_prompt}
+        
         # Minimal payload - let OpenAI use defaults for GPT-5
         return {
             "model": self.model,
             "messages": [
-                {"role": "system", "content": system_prompt},
+                system_message,
                 {"role": "user", "content": input_text},
             ]
         }
@@ -199,7 +238,7 @@ class OpenAIService(AIService):
             # Extract and validate response
             optimized_prompt = self._extract_response(response_data, request_id)
             
-            logger.info(f"Successfully optimized prompt via OpenAI (request_id={request_id})")
+            logger.info("Successfully optimized prompt via OpenAI (request_id=%s)", request_id)
             
             return optimized_prompt
             
@@ -233,6 +272,7 @@ class OpenAIService(AIService):
             
         Raises:
             HTTPException: 502 on failure after retries
+            AIServiceError: On upstream auth failure, timeout or rate limiting
         """
         if not request_id:
             request_id = str(uuid.uuid4())[:8]
@@ -249,7 +289,7 @@ class OpenAIService(AIService):
                 url=self.api_url,
                 request_id=request_id,
                 headers=headers,
-                json=payload
+                content=_encode_payload(payload)
             )
             
             return response.json()
@@ -257,6 +297,9 @@ class OpenAIService(AIService):
         except HTTPException:
             # Re-raise HTTP exceptions from retry logic
             raise
+        except AIServiceError:
+            # Re-raise typed upstream failures (auth, timeout, rate limit)
+            raise
         except Exception as e:
             logger.error(
                 f"Unexpected error in OpenAI request (request_id={request_id}): {str(e)}"
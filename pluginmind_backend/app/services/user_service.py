@@ -5,13 +5,31 @@ Handles user creation, lookup, and profile management for Google OAuth users
 via Supabase integration.
 """
 
-from typing import Optional
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+from sqlalchemy import update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlmodel import Session, select
 from app.models.database import User
 from app.core.logging import get_logger
+from app.utils.cache import TTLCache
 
 logger = get_logger(__name__)
 
+# Short-lived snapshots of user rows keyed by google_id; refreshed whenever
+# this process changes the usage counters
+_USER_CACHE_MAXSIZE = 10_000
+_USER_CACHE_TTL_SECONDS = 15
+_user_cache = TTLCache(maxsize=_USER_CACHE_MAXSIZE, ttl=_USER_CACHE_TTL_SECONDS)
+
+# Dialect-specific INSERT constructs supporting ON CONFLICT ... RETURNING
+_UPSERT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
 
 class UserService:
     """
@@ -32,6 +50,8 @@ class UserService:
         
         Looks up user by google_id first, then by email if provided.
         Creates new user with default subscription and usage limits if not found.
+        Users seen in the last few seconds are served from an in-process
+        cache and attached to the session without a SELECT.
         
         Args:
             session: Database session
@@ -41,12 +61,17 @@ class UserService:
         Returns:
             User: Existing or newly created user model
         """
+        user = self._get_cached_user(session, user_id)
+        if user:
+            return user
+        
         # Try to find user by google_id first
         statement = select(User).where(User.google_id == user_id)
         user = session.exec(statement).first()
         
         if user:
-            logger.debug(f"Found existing user by google_id: {user_id}")
+            logger.debug("Found existing user by google_id: %s", user_id)
+            self._cache_user(user)
             return user
         
         # If not found by google_id and email provided, try by email
@@ -61,8 +86,9 @@ class UserService:
                     session.add(user)
                     session.commit()
                     session.refresh(user)
-                    logger.info(f"Updated existing user with google_id: {email}")
+                    logger.info("Updated existing user with google_id: %s", email)
                 
+                self._cache_user(user)
                 return user
         
         # Create new user with default values
@@ -79,7 +105,8 @@ class UserService:
         session.commit()
         session.refresh(new_user)
         
-        logger.info(f"Created new user: {new_user.email} (google_id: {user_id})")
+        logger.info("Created new user: %s (google_id: %s)", new_user.email, user_id)
+        self._cache_user(new_user)
         return new_user
     
     def get_user_by_id(self, session: Session, user_id: str) -> Optional[User]:
@@ -112,9 +139,107 @@ class UserService:
         session.commit()
         session.refresh(user)
         
-        logger.debug(f"Incremented queries for user {user.email}: {user.queries_used}/{user.queries_limit}")
+        logger.debug("Incremented queries for user %s: %s/%s", user.email, user.queries_used, user.queries_limit)
+        self._cache_user(user)
         return user
     
+    def consume_query_atomic(self, session: Session, user_id: str) -> Tuple[bool, Optional[User]]:
+        """
+        Get or create the user and count one query in a single statement.
+        
+        Issues INSERT ... ON CONFLICT (google_id) DO UPDATE ... RETURNING with
+        the limit check in the conflict WHERE clause, so lookup, creation,
+        limit check and increment cost one round-trip and cannot race between
+        concurrent requests. Dialects without upsert support fall back to
+        get_or_create_user followed by a conditional UPDATE ... RETURNING.
+        
+        Args:
+            session: Database session
+            user_id: Google user ID
+            
+        Returns:
+            Tuple of (allowed, user). On denial the user holds the current
+            counters, or is None if the record could not be read back.
+        """
+        upsert = _UPSERT_INSERTS.get(session.get_bind().dialect.name)
+        if upsert is None:
+            return self._consume_query_fallback(session, user_id)
+        
+        statement = upsert(User).values(
+            email=f"user_{user_id}@unknown.com",
+            google_id=user_id,
+            created_at=datetime.now(timezone.utc),
+            subscription_tier="free",
+            queries_used=1,
+            queries_limit=10,
+            is_active=True
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[User.google_id],
+            set_={"queries_used": User.queries_used + 1},
+            where=User.queries_used < User.queries_limit
+        ).returning(User)
+        
+        user = session.scalars(
+            statement, execution_options={"populate_existing": True}
+        ).first()
+        session.commit()
+        
+        if user is not None:
+            logger.debug("Counted query for user %s: %s/%s", user_id, user.queries_used, user.queries_limit)
+            self._cache_user(user)
+            return True, user
+        
+        # Conflict row failed the limit check; report current counters
+        user = self.get_user_by_id(session, user_id)
+        if user is not None:
+            self._cache_user(user)
+        return False, user
+    
+    def _consume_query_fallback(self, session: Session, user_id: str) -> Tuple[bool, Optional[User]]:
+        """Two-statement variant of consume_query_atomic for dialects without upsert."""
+        user = self.get_or_create_user(session, user_id)
+        
+        statement = (
+            update(User)
+            .where(User.google_id == user_id, User.queries_used < User.queries_limit)
+            .values(queries_used=User.queries_used + 1)
+            .returning(User.queries_used, User.queries_limit)
+        )
+        row = session.execute(statement).first()
+        session.commit()
+        
+        if row is None:
+            session.refresh(user)
+            self._cache_user(user)
+            return False, user
+        
+        set_committed_value(user, "queries_used", row.queries_used)
+        set_committed_value(user, "queries_limit", row.queries_limit)
+        logger.debug("Counted query for user %s: %s/%s", user_id, row.queries_used, row.queries_limit)
+        self._cache_user(user)
+        return True, user
+    
+    def _cache_user(self, user: User) -> None:
+        """Store a snapshot of the user's column values."""
+        if user.google_id:
+            _user_cache.set(user.google_id, user.model_dump())
+    
+    def _get_cached_user(self, session: Session, user_id: str) -> Optional[User]:
+        """
+        Attach a cached user snapshot to the session without querying.
+        
+        Rebuilds the instance from its column values and merges it with
+        load=False, so each session gets its own copy of the row.
+        """
+        snapshot = _user_cache.get(user_id)
+        if snapshot is None:
+            return None
+        
+        user = User(**snapshot)
+        make_transient_to_detached(user)
+        return session.merge(user, load=False)
+    
     def check_query_limit(self, user: User) -> bool:
         """
         Check if user has exceeded query limit.
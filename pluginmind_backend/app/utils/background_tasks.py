@@ -5,17 +5,70 @@ Provides unified background job processing that handles the complete
 analysis workflow for asynchronous operations.
 """
 
+import asyncio
 import uuid
-from datetime import datetime
-from sqlmodel import Session, select
+from contextlib import suppress
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Set, Tuple, Type
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import bindparam, delete, update
+from sqlmodel import Session, func, select
+from app.core.config import settings
+from app.core.exceptions import AIAuthError, AITimeoutError, RateLimitError, ServiceUnavailableError
 from app.core.logging import get_logger
 from app.database import engine
 from app.models.database import AnalysisJob
 from app.models.enums import JobStatus
+from app.models.schemas import JobResult
 from app.services.analysis_service import analysis_service
+from app.utils.cache import TTLCache
 
 logger = get_logger(__name__)
 
+# Local job queue drained by MAX_BACKGROUND_JOBS worker tasks; holds at most
+# JOB_QUEUE_MAX_SIZE waiting jobs. Bound to the loop the workers run on.
+_job_queue: Optional[asyncio.Queue] = None
+_job_workers: List[asyncio.Task] = []
+_job_workers_loop: Optional[asyncio.AbstractEventLoop] = None
+
+# Jobs the workers are processing right now, and how long shutdown waits for
+# the queue to drain before failing whatever is left
+_running_job_ids: Set[str] = set()
+JOB_SHUTDOWN_DRAIN_SECONDS = 25.0
+
+# Prebuilt lookup by external job ID (job_id is unique but not the primary
+# key, so session.get() does not apply); SQLAlchemy reuses its compiled SQL
+JOB_BY_ID_STMT = select(AnalysisJob).where(AnalysisJob.job_id == bindparam("job_id"))
+
+# Results of finished jobs never change, so polling can be served from memory;
+# in-flight jobs are cached only briefly so status changes show up quickly
+TERMINAL_JOB_STATUSES = frozenset({JobStatus.COMPLETED, JobStatus.FAILED})
+job_result_cache = TTLCache(maxsize=4096, ttl=60)
+_ACTIVE_JOB_RESULT_TTL_SECONDS = 2
+
+# One-shot events set when a job changes status, for streaming clients,
+# and the number of clients waiting per job (to drop unused events)
+_job_update_events: Dict[str, asyncio.Event] = {}
+_job_update_waiters: Dict[str, int] = {}
+
+# Serialized GET /jobs pages keyed by (limit, offset). Cleared whenever a job
+# changes in this process; changes made by other workers show up within the TTL
+jobs_page_cache = TTLCache(maxsize=64, ttl=2)
+
+# Active job count served to frequent /health probes
+_ACTIVE_JOBS_CACHE_KEY = "active_jobs"
+_active_jobs_cache = TTLCache(maxsize=1, ttl=10)
+
+# How often expired jobs are purged from the database
+JOB_CLEANUP_INTERVAL_SECONDS = 300
+
+# User-facing error stored on failed jobs, by exception type
+_JOB_ERROR_DETAILS: Tuple[Tuple[Type[Exception], str], ...] = (
+    (RateLimitError, "Rate limit exceeded. Please try again later."),
+    (AIAuthError, "API authentication failed"),
+    (AITimeoutError, "Request timeout. Please try again."),
+)
+
 
 async def process_analysis_background(job_id: str, user_input: str) -> None:
     """
@@ -28,20 +81,19 @@ async def process_analysis_background(job_id: str, user_input: str) -> None:
         job_id: Unique job identifier
         user_input: User's crypto analysis query
     """
-    logger.info(f"Starting background analysis for job {job_id}")
+    logger.info("Starting background analysis for job %s", job_id)
     
     try:
-        # Update job status to processing OpenAI
-        with Session(engine) as session:
-            statement = select(AnalysisJob).where(AnalysisJob.job_id == job_id)
-            job = session.exec(statement).first()
-            if not job:
-                logger.error(f"Job {job_id} not found in database")
-                return
-            
-            job.status = JobStatus.PROCESSING_OPENAI
-            session.add(job)
-            session.commit()
+        # Claim the job by moving it to processing; a finished job is not
+        # claimed again when a queue redelivers it
+        job = await run_in_threadpool(
+            _update_job, job_id, active_only=True, status=JobStatus.PROCESSING_OPENAI
+        )
+        if not job:
+            logger.warning("Job %s not found or already finished; skipping", job_id)
+            return
+        job_result_cache.pop(job_id)
+        _notify_job_update(job_id)
         
         # Perform complete analysis workflow
         optimized_prompt, analysis_result = await analysis_service.perform_analysis(
@@ -49,44 +101,256 @@ async def process_analysis_background(job_id: str, user_input: str) -> None:
         )
         
         # Update job with successful results
-        with Session(engine) as session:
-            statement = select(AnalysisJob).where(AnalysisJob.job_id == job_id)
-            job = session.exec(statement).first()
-            if job:
-                job.status = JobStatus.COMPLETED
-                job.completed_at = datetime.now()
-                job.optimized_prompt = optimized_prompt
-                job.analysis = analysis_result
-                session.add(job)
-                session.commit()
-
-        logger.info(f"Job {job_id}: Analysis completed successfully")
+        job = await run_in_threadpool(
+            _update_job,
+            job_id,
+            status=JobStatus.COMPLETED,
+            completed_at=datetime.now(timezone.utc),
+            optimized_prompt=optimized_prompt,
+            analysis=analysis_result
+        )
+        if job:
+            cache_job_result(job)
+        _notify_job_update(job_id)
+
+        logger.info("Job %s: Analysis completed successfully", job_id)
 
     except Exception as e:
         logger.error(f"Job {job_id}: Analysis failed with error: {str(e)}")
         
-        # Determine error type for user-friendly message
-        error_detail = "Analysis failed due to internal error"
-        if "rate limit" in str(e).lower():
-            error_detail = "Rate limit exceeded. Please try again later."
-        elif "api key" in str(e).lower() or "unauthorized" in str(e).lower():
-            error_detail = "API authentication failed"
-        elif "timeout" in str(e).lower():
-            error_detail = "Request timeout. Please try again."
+        # Pick a user-friendly message by exception type
+        error_detail = next(
+            (detail for exc_type, detail in _JOB_ERROR_DETAILS if isinstance(e, exc_type)),
+            "Analysis failed due to internal error"
+        )
+        
+        await fail_job(job_id, error_detail)
+
+
+def _update_job(job_id: str, active_only: bool = False, **fields) -> Optional[AnalysisJob]:
+    """
+    Apply a job state transition in a single UPDATE ... RETURNING round trip
+    (blocking; call via the threadpool).
+    
+    Args:
+        job_id: Unique job identifier
+        active_only: Only update the job if it has not finished yet
+        **fields: Column values to set
+        
+    Returns:
+        Optional[AnalysisJob]: The updated job (usable after the session
+        closes), or None if no matching job was updated
+    """
+    stmt = update(AnalysisJob).where(AnalysisJob.job_id == job_id)
+    if active_only:
+        stmt = stmt.where(AnalysisJob.status.not_in(TERMINAL_JOB_STATUSES))
+    with Session(engine, expire_on_commit=False) as session:
+        job = session.exec(
+            stmt.values(**fields).returning(AnalysisJob)
+        ).scalars().first()
+        session.commit()
+    return job
+
+
+async def fail_job(job_id: str, error_detail: str) -> None:
+    """Mark a job as failed with a user-facing error and notify waiting clients."""
+    job = await run_in_threadpool(
+        _update_job,
+        job_id,
+        status=JobStatus.FAILED,
+        completed_at=datetime.now(timezone.utc),
+        error=error_detail
+    )
+    if job:
+        cache_job_result(job)
+    _notify_job_update(job_id)
+
+
+def _notify_job_update(job_id: str) -> None:
+    """Wake clients waiting on a job's next status change."""
+    jobs_page_cache.clear()
+    event = _job_update_events.pop(job_id, None)
+    if event is not None:
+        event.set()
+
+
+async def wait_for_job_update(job_id: str, timeout: float) -> None:
+    """
+    Wait until a job changes status or the timeout elapses.
+    
+    Only status changes made in this process are signalled (the local job
+    queue), so callers should re-read the job after waking either way.
+    
+    Args:
+        job_id: Unique job identifier
+        timeout: Maximum time to wait in seconds
+    """
+    event = _job_update_events.setdefault(job_id, asyncio.Event())
+    _job_update_waiters[job_id] = _job_update_waiters.get(job_id, 0) + 1
+    try:
+        with suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(event.wait(), timeout)
+    finally:
+        waiters = _job_update_waiters.pop(job_id) - 1
+        if waiters:
+            _job_update_waiters[job_id] = waiters
+        else:
+            _job_update_events.pop(job_id, None)
+
+
+def cache_job_result(job: AnalysisJob) -> JobResult:
+    """
+    Build the polling response for a job and cache it.
+    
+    Finished jobs are kept for the cache's default TTL; in-flight jobs
+    only for a couple of seconds so concurrent pollers share one read.
+    
+    Args:
+        job: Job loaded from the database
+        
+    Returns:
+        JobResult: Job status, results, and metadata
+    """
+    result = JobResult(
+        job_id=job.job_id,
+        status=job.status.value,
+        created_at=job.created_at,
+        completed_at=job.completed_at,
+        optimized_prompt=job.optimized_prompt,
+        analysis=job.analysis,
+        error=job.error
+    )
+    ttl = None if job.status in TERMINAL_JOB_STATUSES else _ACTIVE_JOB_RESULT_TTL_SECONDS
+    job_result_cache.set(job.job_id, result, ttl=ttl)
+    return result
+
+
+async def _analysis_worker(job_queue: asyncio.Queue) -> None:
+    """Process queued jobs one at a time until cancelled."""
+    while True:
+        job_id, user_input = await job_queue.get()
+        _running_job_ids.add(job_id)
+        try:
+            await process_analysis_background(job_id, user_input)
+        except Exception as e:
+            # process_analysis_background records its own failures; keep the worker alive
+            logger.error(f"Job {job_id}: Worker error: {str(e)}")
+        finally:
+            _running_job_ids.discard(job_id)
+            job_queue.task_done()
+
+
+def start_job_workers() -> None:
+    """
+    Start the analysis workers on the running event loop.
+    
+    Called from the application lifespan; schedule_analysis_job also calls it
+    so jobs are processed when the app runs without a lifespan. A no-op when
+    workers already run on this loop.
+    """
+    global _job_queue, _job_workers_loop
+    loop = asyncio.get_running_loop()
+    if _job_workers_loop is loop:
+        return
+    
+    _job_queue = asyncio.Queue(maxsize=settings.job_queue_max_size)
+    _job_workers_loop = loop
+    _job_workers[:] = [
+        asyncio.create_task(_analysis_worker(_job_queue))
+        for _ in range(settings.max_background_jobs)
+    ]
+    logger.info(f"Started {settings.max_background_jobs} analysis workers")
+
+
+async def stop_job_workers(drain_timeout: float = JOB_SHUTDOWN_DRAIN_SECONDS) -> None:
+    """
+    Let the workers finish the queue, then cancel them.
+    
+    Waits up to drain_timeout seconds for queued and running jobs. Jobs
+    still unfinished after that are marked failed, since no worker in
+    this process will pick them up again.
+    
+    Args:
+        drain_timeout: Seconds to wait for the queue to drain
+    """
+    global _job_queue, _job_workers_loop
+    job_queue = _job_queue
+    if job_queue is not None:
+        try:
+            await asyncio.wait_for(job_queue.join(), drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Analysis queue not drained within %ss; failing unfinished jobs", drain_timeout)
+    
+    # Snapshot running jobs before cancelling (workers forget them on cancel)
+    unfinished = list(_running_job_ids)
+    workers = list(_job_workers)
+    _job_workers.clear()
+    _job_queue = None
+    _job_workers_loop = None
+    
+    for worker in workers:
+        worker.cancel()
+    await asyncio.gather(*workers, return_exceptions=True)
+    
+    while job_queue is not None and not job_queue.empty():
+        job_id, _ = job_queue.get_nowait()
+        unfinished.append(job_id)
+    _running_job_ids.clear()
+    
+    if unfinished:
+        failed = await run_in_threadpool(_fail_unfinished_jobs, unfinished, "Server shutting down")
+        logger.warning("Marked %d unfinished analysis jobs as failed at shutdown", failed)
+        for job_id in unfinished:
+            job_result_cache.pop(job_id)
+            _notify_job_update(job_id)
+
+
+def _fail_unfinished_jobs(job_ids: List[str], error_detail: str) -> int:
+    """
+    Mark the given jobs failed unless they already finished, in one UPDATE
+    (blocking; call via the threadpool).
+    
+    Returns:
+        int: Number of jobs marked failed
+    """
+    statement = (
+        update(AnalysisJob)
+        .where(
+            AnalysisJob.job_id.in_(job_ids),
+            AnalysisJob.status.not_in(TERMINAL_JOB_STATUSES)
+        )
+        .values(status=JobStatus.FAILED, completed_at=datetime.now(timezone.utc), error=error_detail)
+    )
+    with Session(engine) as session:
+        failed = session.exec(statement).rowcount
+        session.commit()
+    return failed
+
+
+async def schedule_analysis_job(job_id: str, user_input: str) -> None:
+    """
+    Queue a job for the background analysis workers.
+    
+    At most MAX_BACKGROUND_JOBS analyses run at once and at most
+    JOB_QUEUE_MAX_SIZE more wait their turn.
+    
+    Args:
+        job_id: Unique job identifier
+        user_input: User's crypto analysis query
         
-        # Update job with error status
-        with Session(engine) as session:
-            statement = select(AnalysisJob).where(AnalysisJob.job_id == job_id)
-            job = session.exec(statement).first()
-            if job:
-                job.status = JobStatus.FAILED
-                job.completed_at = datetime.now()
-                job.error = error_detail
-                session.add(job)
-                session.commit()
+    Raises:
+        ServiceUnavailableError: If the queue is full (the job is marked failed)
+    """
+    start_job_workers()
+    try:
+        _job_queue.put_nowait((job_id, user_input))
+    except asyncio.QueueFull:
+        logger.warning(f"Job {job_id}: Rejected, analysis queue is full")
+        await fail_job(job_id, "Analysis queue is full. Please try again later.")
+        raise ServiceUnavailableError("Analysis job queue is full")
 
 
-def create_analysis_job(user_input: str, user_id: str = "test_user") -> str:
+def create_analysis_job(user_input: str, user_id: str = "test_user") -> AnalysisJob:
     """
     Create a new analysis job in the database.
     
@@ -95,7 +359,7 @@ def create_analysis_job(user_input: str, user_id: str = "test_user") -> str:
         user_id: User identifier for tracking
         
     Returns:
-        Job ID for tracking the analysis
+        AnalysisJob: Persisted job with its job_id and created_at populated
     """
     job_id = str(uuid.uuid4())
     
@@ -110,5 +374,70 @@ def create_analysis_job(user_input: str, user_id: str = "test_user") -> str:
         session.commit()
         session.refresh(analysis_job)
     
-    logger.info(f"Created analysis job {job_id}")
-    return job_id
\ No newline at end of file
+    jobs_page_cache.clear()
+    logger.info("Created analysis job %s", job_id)
+    return analysis_job
+
+
+def count_active_jobs() -> int:
+    """
+    Count jobs that have not reached a terminal status.
+    
+    Returns:
+        int: Number of queued or in-progress jobs
+    """
+    statement = select(func.count()).select_from(AnalysisJob).where(
+        AnalysisJob.status.not_in(TERMINAL_JOB_STATUSES)
+    )
+    with Session(engine) as session:
+        return session.exec(statement).one()
+
+
+async def count_active_jobs_cached() -> int:
+    """
+    Count active jobs, reusing the result for a few seconds.
+    
+    Returns:
+        int: Number of queued or in-progress jobs
+    """
+    count: Optional[int] = _active_jobs_cache.get(_ACTIVE_JOBS_CACHE_KEY)
+    if count is None:
+        count = await run_in_threadpool(count_active_jobs)
+        _active_jobs_cache.set(_ACTIVE_JOBS_CACHE_KEY, count)
+    return count
+
+
+def delete_expired_jobs() -> int:
+    """
+    Delete finished jobs older than JOB_CLEANUP_HOURS.
+    
+    Returns:
+        int: Number of jobs deleted
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=settings.job_cleanup_hours)
+    statement = delete(AnalysisJob).where(
+        AnalysisJob.created_at < cutoff,
+        AnalysisJob.status.in_(TERMINAL_JOB_STATUSES)
+    )
+    with Session(engine) as session:
+        deleted = session.exec(statement).rowcount
+        session.commit()
+    
+    if deleted:
+        logger.info(f"Cleaned up {deleted} expired analysis jobs")
+    return deleted
+
+
+async def run_job_cleanup_loop(interval_seconds: float = JOB_CLEANUP_INTERVAL_SECONDS) -> None:
+    """
+    Periodically delete expired jobs until cancelled.
+    
+    Args:
+        interval_seconds: Delay between cleanup runs
+    """
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await run_in_threadpool(delete_expired_jobs)
+        except Exception as e:
+            logger.warning(f"Job cleanup failed: {str(e)}")
@@ -0,0 +1,89 @@
+"""
+In-process caching utilities.
+
+Provides a small bounded LRU cache with per-entry expiry for memoizing
+hot-path lookups (verified tokens, user rows, job results) within a
+single worker process.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    Bounded LRU cache with per-entry time-to-live.
+
+    Entries expire after their TTL and the least recently used entry is
+    evicted once the cache is full. Safe to share between the event loop
+    and threadpool-dispatched dependencies.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        """
+        Initialize TTL cache.
+
+        Args:
+            maxsize: Maximum number of entries kept in the cache
+            ttl: Default entry lifetime in seconds
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get a cached value if present and not expired.
+
+        Args:
+            key: Cache key
+            default: Value returned on miss or expiry
+
+        Returns:
+            Cached value or default
+        """
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Store a value, evicting the least recently used entry if full.
+
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl: Optional lifetime override in seconds
+        """
+        lifetime = self.ttl if ttl is None else ttl
+        if lifetime <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + lifetime, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove an entry and return its value (expired or not)."""
+        with self._lock:
+            item = self._data.pop(key, None)
+        return default if item is None else item[1]
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -6,16 +6,34 @@ Provides retry logic, timeouts, and error handling for external service calls.
 
 import asyncio
 import uuid
-from typing import Any, Callable, Optional, Dict
+from typing import Any, Callable, Iterable, Optional, Dict
+from urllib.parse import urlsplit
 import httpx
 from fastapi import HTTPException
 
 from app.core.config import settings
 from app.core.logging import get_logger
-from app.core.exceptions import ServiceUnavailableError
+from app.core.exceptions import (
+    AIAuthError,
+    AITimeoutError,
+    RateLimitError,
+    ServiceUnavailableError
+)
 
 logger = get_logger(__name__)
 
+# Upper bound for each warm-up request so a slow provider cannot stall startup
+WARM_UP_TIMEOUT_SECONDS = 5.0
+
+
+def _http2_available() -> bool:
+    """Return True if the optional h2 package needed for HTTP/2 is installed."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
 
 class HTTPClient:
     """
@@ -26,15 +44,30 @@ class HTTPClient:
     """
     
     def __init__(self):
-        """Initialize HTTP client with configured limits and timeouts."""
+        """
+        Initialize HTTP client with configured limits and timeouts.
+        
+        A single pooled client is shared by every AI service so keep-alive
+        connections (and their TLS sessions) are reused across requests.
+        HTTP/2 is negotiated when enabled and h2 is installed, letting
+        concurrent calls to the same provider multiplex over one connection.
+        """
+        http2 = settings.http2_enabled and _http2_available()
+        if settings.http2_enabled and not http2:
+            logger.warning("HTTP2_ENABLED is set but the h2 package is not installed; using HTTP/1.1")
+        
         self.client = httpx.AsyncClient(
+            http2=http2,
             timeout=settings.http_timeout_seconds,
             limits=httpx.Limits(
                 max_keepalive_connections=settings.http_max_keepalive,
                 max_connections=settings.http_max_connections
             )
         )
-        logger.info("HTTP client initialized with timeout=%ss", settings.http_timeout_seconds)
+        logger.info(
+            "HTTP client initialized with timeout=%ss, http2=%s",
+            settings.http_timeout_seconds, http2
+        )
     
     async def request_with_retries(
         self,
@@ -59,7 +92,10 @@ class HTTPClient:
             httpx.Response: Successful response
             
         Raises:
-            HTTPException: 502 on permanent failure after retries
+            AIAuthError: If the upstream rejects our credentials (401/403)
+            AITimeoutError: If every attempt timed out
+            RateLimitError: If the upstream was still rate limiting after retries
+            ServiceUnavailableError: On any other permanent failure
         """
         if not request_id:
             request_id = str(uuid.uuid4())[:8]
@@ -100,6 +136,8 @@ class HTTPClient:
                         "HTTP request failed permanently with status %d (request_id=%s): %s",
                         response.status_code, request_id, response.text[:200]
                     )
+                    if response.status_code in (401, 403):
+                        raise AIAuthError(f"Upstream authentication failed (HTTP {response.status_code})")
                     raise ServiceUnavailableError("Upstream service unavailable")
                     
             except httpx.RequestError as e:
@@ -110,8 +148,8 @@ class HTTPClient:
                 )
                 last_exception = e
                 
-            except HTTPException:
-                # Re-raise our own HTTP exceptions
+            except (HTTPException, AIAuthError):
+                # Re-raise our own exceptions
                 raise
                 
             except Exception as e:
@@ -136,8 +174,34 @@ class HTTPClient:
             "HTTP request failed after %d attempts (request_id=%s): %s",
             settings.http_max_retries + 1, request_id, str(last_exception)
         )
+        if isinstance(last_exception, httpx.TimeoutException):
+            raise AITimeoutError("Upstream request timed out")
+        if isinstance(last_exception, HTTPException) and last_exception.status_code == 429:
+            raise RateLimitError("Upstream rate limit exceeded")
         raise ServiceUnavailableError("Upstream service unavailable")
     
+    async def warm_up(self, urls: Iterable[str]) -> None:
+        """
+        Open pooled connections to the origins of the given URLs.
+        
+        Sends one HEAD request per origin so the first real API call reuses
+        an established TCP/TLS connection. Any response counts as success;
+        failures are logged and ignored.
+        
+        Args:
+            urls: Endpoint URLs whose origins should be connected
+        """
+        origins = {f"{parts.scheme}://{parts.netloc}/" for parts in map(urlsplit, urls)}
+        
+        async def _connect(origin: str) -> None:
+            try:
+                await self.client.head(origin, timeout=WARM_UP_TIMEOUT_SECONDS)
+                logger.info(f"HTTP connection pre-warmed: {origin}")
+            except httpx.HTTPError as e:
+                logger.warning(f"HTTP connection pre-warm failed for {origin}: {type(e).__name__}")
+        
+        await asyncio.gather(*(_connect(origin) for origin in origins))
+    
     async def close(self):
         """Close the HTTP client and clean up connections."""
         await self.client.aclose()
@@ -13,12 +13,17 @@ from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Proxy header names (lowercase, as stored by Starlette)
+_XFF = "x-forwarded-for"
+_XRI = "x-real-ip"
+
 
 def extract_client_ip(request: Request) -> str:
     """
     Extract client IP address with hardened validation.
     
-    Attempts to extract IP from various sources with proper validation:
+    Attempts to extract IP from various sources with proper validation
+    (the result is memoized on request.state for the rest of the request):
     1. Direct client IP (if available)
     2. X-Forwarded-For header (first valid IP)
     3. X-Real-IP header
@@ -30,6 +35,18 @@ def extract_client_ip(request: Request) -> str:
     Returns:
         str: Validated IP address or "unknown" if no valid IP found
     """
+    # The client IP is fixed for a request; reuse it if already extracted
+    cached_ip = getattr(request.state, "client_ip", None)
+    if cached_ip is not None:
+        return cached_ip
+    
+    client_ip = _extract_client_ip(request)
+    request.state.client_ip = client_ip
+    return client_ip
+
+
+def _extract_client_ip(request: Request) -> str:
+    """Extract and validate the client IP without per-request caching."""
     # Try direct client IP first
     if request.client and request.client.host:
         ip = _validate_ip(request.client.host)
@@ -37,16 +54,16 @@ def extract_client_ip(request: Request) -> str:
             return ip
     
     # Try X-Forwarded-For header (proxy/load balancer)
-    forwarded_for = request.headers.get("x-forwarded-for")
+    forwarded_for = request.headers.get(_XFF)
     if forwarded_for:
-        # Take first IP from comma-separated list
-        first_ip = forwarded_for.split(",")[0].strip()
+        # Take first IP from comma-separated list without splitting the whole chain
+        first_ip = forwarded_for.partition(",")[0].strip()
         ip = _validate_ip(first_ip)
         if ip:
             return ip
     
     # Try X-Real-IP header
-    real_ip = request.headers.get("x-real-ip")
+    real_ip = request.headers.get(_XRI)
     if real_ip:
         ip = _validate_ip(real_ip.strip())
         if ip:
@@ -86,5 +103,5 @@ def _validate_ip(ip_str: str) -> Optional[str]:
         ip_obj = ipaddress.ip_address(ip_str)
         return str(ip_obj)
     except (ipaddress.AddressValueError, ValueError):
-        logger.debug(f"Invalid IP address format: {ip_str}")
+        logger.debug("Invalid IP address format: %s", ip_str)
         return None
\ No newline at end of file
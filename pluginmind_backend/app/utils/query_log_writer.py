@@ -0,0 +1,120 @@
+"""
+Batched background persistence for query logs.
+
+Query logs only feed usage statistics, so /analyze hands them to a
+background writer instead of committing before it responds. The writer
+collects whatever arrives within a short window and inserts it in one
+transaction.
+"""
+
+import asyncio
+from typing import List, Optional
+from fastapi.concurrency import run_in_threadpool
+from sqlmodel import Session
+from app.core.logging import get_logger
+from app.database import engine
+from app.models.database import QueryLog
+
+logger = get_logger(__name__)
+
+# Logs waiting to be written, the most written per transaction, and how long
+# the writer waits after the first log for more to arrive
+QUERY_LOG_QUEUE_MAX_SIZE = 10_000
+QUERY_LOG_BATCH_SIZE = 50
+QUERY_LOG_FLUSH_SECONDS = 0.1
+
+# Queue and writer task, bound to the loop the writer runs on
+_log_queue: Optional[asyncio.Queue] = None
+_writer_task: Optional[asyncio.Task] = None
+_writer_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _write_query_logs(records: List[QueryLog]) -> None:
+    """Insert query logs in one transaction (blocking; call via the threadpool)."""
+    with Session(engine) as session:
+        session.add_all(records)
+        session.commit()
+
+
+async def _write_batch(batch: List[QueryLog]) -> None:
+    """
+    Write a batch of logs, isolating rows that make the insert fail.
+
+    A failed batch is retried one row at a time so a single bad row only
+    drops itself; rows that still fail are logged and dropped.
+    """
+    try:
+        await run_in_threadpool(_write_query_logs, batch)
+        return
+    except Exception as e:
+        if len(batch) == 1:
+            logger.error(f"Failed to write query log: {str(e)}")
+            return
+        logger.warning(f"Failed to write {len(batch)} query logs, retrying individually: {str(e)}")
+
+    for record in batch:
+        try:
+            await run_in_threadpool(_write_query_logs, [record])
+        except Exception as e:
+            logger.error(f"Failed to write query log: {str(e)}")
+
+
+async def _query_log_writer(log_queue: asyncio.Queue) -> None:
+    """Write queued logs in batches until cancelled."""
+    while True:
+        batch = [await log_queue.get()]
+        await asyncio.sleep(QUERY_LOG_FLUSH_SECONDS)
+        while len(batch) < QUERY_LOG_BATCH_SIZE and not log_queue.empty():
+            batch.append(log_queue.get_nowait())
+        try:
+            await _write_batch(batch)
+        finally:
+            for _ in batch:
+                log_queue.task_done()
+
+
+def start_query_log_writer() -> None:
+    """
+    Start the query log writer on the running event loop.
+
+    Called from the application lifespan. A no-op when the writer already
+    runs on this loop.
+    """
+    global _log_queue, _writer_task, _writer_loop
+    loop = asyncio.get_running_loop()
+    if _writer_loop is loop:
+        return
+
+    _log_queue = asyncio.Queue(maxsize=QUERY_LOG_QUEUE_MAX_SIZE)
+    _writer_loop = loop
+    _writer_task = asyncio.create_task(_query_log_writer(_log_queue))
+
+
+async def stop_query_log_writer() -> None:
+    """Write every queued log, then stop the writer."""
+    global _log_queue, _writer_task, _writer_loop
+    log_queue, writer = _log_queue, _writer_task
+    _log_queue = _writer_task = _writer_loop = None
+    if writer is None:
+        return
+
+    await log_queue.join()
+    writer.cancel()
+    await asyncio.gather(writer, return_exceptions=True)
+
+
+async def save_query_log(record: QueryLog) -> None:
+    """
+    Persist a query log without waiting for the database when possible.
+
+    Queues the log for the background writer; writes it directly when the
+    writer is not running on this loop (e.g. outside the app lifespan) or
+    its queue is full.
+    """
+    if _log_queue is not None and _writer_loop is asyncio.get_running_loop():
+        try:
+            _log_queue.put_nowait(record)
+            return
+        except asyncio.QueueFull:
+            logger.warning("Query log queue full; writing synchronously")
+    await run_in_threadpool(_write_query_logs, [record])
@@ -2,12 +2,14 @@
 Token-bucket rate limiter implementation.
 
 Provides in-memory, per-process rate limiting using token bucket algorithm
-with asyncio locks for thread safety.
+with asyncio locks for thread safety. Multi-process deployments can switch
+to the Redis token-bucket limiter with RATE_LIMIT_STORAGE=redis.
 """
 
 import asyncio
 import time
-from typing import Dict, Optional, Tuple
+from contextlib import AsyncExitStack
+from typing import Dict, List, Optional, Sequence, Tuple
 
 from app.core.config import settings
 from app.core.logging import get_logger
@@ -34,7 +36,7 @@ class TokenBucket:
         self.capacity = capacity
         self.refill_rate = refill_rate
         self.tokens = float(capacity)
-        self.last_refill = time.time()
+        self.last_refill = time.monotonic()
         self.lock = asyncio.Lock()
     
     async def consume(self, tokens: int = 1) -> Tuple[bool, int]:
@@ -48,31 +50,35 @@ class TokenBucket:
             Tuple of (success: bool, remaining_tokens: int)
         """
         async with self.lock:
-            now = time.time()
-            
-            # Refill bucket based on time elapsed
-            time_elapsed = now - self.last_refill
-            self.tokens = min(
-                self.capacity,
-                self.tokens + (time_elapsed * self.refill_rate)
-            )
-            self.last_refill = now
-            
-            # Treat negative tokens as zero consumption
-            if tokens < 0:
-                tokens = 0
-            
-            # Check if we have enough tokens
-            if self.tokens >= tokens:
-                self.tokens -= tokens
-                return True, int(self.tokens)
-            else:
-                return False, int(self.tokens)
+            return self._consume_locked(tokens)
+    
+    def _consume_locked(self, tokens: int) -> Tuple[bool, int]:
+        """Refill and consume tokens; caller must hold ``self.lock``."""
+        now = time.monotonic()
+        
+        # Refill bucket based on time elapsed
+        time_elapsed = now - self.last_refill
+        self.tokens = min(
+            self.capacity,
+            self.tokens + (time_elapsed * self.refill_rate)
+        )
+        self.last_refill = now
+        
+        # Treat negative tokens as zero consumption
+        if tokens < 0:
+            tokens = 0
+        
+        # Check if we have enough tokens
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return True, int(self.tokens)
+        else:
+            return False, int(self.tokens)
     
     async def get_remaining(self) -> int:
         """Get current number of tokens without consuming."""
         async with self.lock:
-            now = time.time()
+            now = time.monotonic()
             time_elapsed = now - self.last_refill
             current_tokens = min(
                 self.capacity,
@@ -103,12 +109,25 @@ class RateLimiter:
     async def _get_or_create_bucket(self, key: str, capacity_override: Optional[int] = None, refill_rate_override: Optional[float] = None) -> TokenBucket:
         """Get existing bucket or create new one for key."""
         async with self.lock:
-            if key not in self.buckets:
-                effective_capacity = capacity_override or self.capacity
-                effective_refill_rate = refill_rate_override or self.refill_rate
-                self.buckets[key] = TokenBucket(effective_capacity, effective_refill_rate)
-                logger.debug(f"Created new rate limit bucket for key: {key} (capacity={effective_capacity}, refill_rate={effective_refill_rate:.2f})")
-            return self.buckets[key]
+            return self._get_or_create_bucket_locked(key, capacity_override, refill_rate_override)
+    
+    async def _get_or_create_buckets(self, limits: Sequence[Tuple[str, Optional[int], Optional[float]]]) -> List[TokenBucket]:
+        """Resolve buckets for several keys under a single registry lock acquisition."""
+        async with self.lock:
+            return [
+                self._get_or_create_bucket_locked(key, capacity_override, refill_rate_override)
+                for key, capacity_override, refill_rate_override in limits
+            ]
+    
+    def _get_or_create_bucket_locked(self, key: str, capacity_override: Optional[int], refill_rate_override: Optional[float]) -> TokenBucket:
+        """Get or create bucket for key; caller must hold ``self.lock``."""
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            effective_capacity = capacity_override or self.capacity
+            effective_refill_rate = refill_rate_override or self.refill_rate
+            bucket = self.buckets[key] = TokenBucket(effective_capacity, effective_refill_rate)
+            logger.debug("Created new rate limit bucket for key: %s (capacity=%s, refill_rate=%.2f)", key, effective_capacity, effective_refill_rate)
+        return bucket
     
     async def consume(self, key: str, tokens: int = 1, capacity_override: Optional[int] = None, refill_rate_override: Optional[float] = None) -> Tuple[bool, int, Optional[int]]:
         """
@@ -125,7 +144,50 @@ class RateLimiter:
         """
         bucket = await self._get_or_create_bucket(key, capacity_override, refill_rate_override)
         allowed, remaining = await bucket.consume(tokens)
+        return self._finalize(key, tokens, allowed, remaining, refill_rate_override)
+    
+    async def consume_many(
+        self,
+        limits: Sequence[Tuple[str, Optional[int], Optional[float]]],
+        tokens: int = 1
+    ) -> List[Tuple[bool, int, Optional[int]]]:
+        """
+        Atomically consume tokens from several buckets in one call.
+        
+        All bucket locks are held together (acquired in key order to avoid
+        deadlocks), so concurrent requests cannot interleave between the
+        individual checks of a multi-limit decision.
+        
+        Args:
+            limits: Sequence of (key, capacity_override, refill_rate_override)
+            tokens: Number of tokens to consume from each bucket
+            
+        Returns:
+            List of (allowed, remaining_tokens, retry_after_seconds), one per entry in limits
+        """
+        buckets = await self._get_or_create_buckets(limits)
         
+        results: List[Tuple[bool, int]] = [(False, 0)] * len(buckets)
+        async with AsyncExitStack() as stack:
+            for index in sorted(range(len(limits)), key=lambda i: limits[i][0]):
+                await stack.enter_async_context(buckets[index].lock)
+            for index, bucket in enumerate(buckets):
+                results[index] = bucket._consume_locked(tokens)
+        
+        return [
+            self._finalize(key, tokens, allowed, remaining, refill_rate_override)
+            for (key, _, refill_rate_override), (allowed, remaining) in zip(limits, results)
+        ]
+    
+    def _finalize(
+        self,
+        key: str,
+        tokens: int,
+        allowed: bool,
+        remaining: int,
+        refill_rate_override: Optional[float]
+    ) -> Tuple[bool, int, Optional[int]]:
+        """Compute retry-after and log the outcome of a bucket check."""
         # Use override refill rate for retry calculation if provided
         effective_refill_rate = refill_rate_override or self.refill_rate
         
@@ -138,7 +200,7 @@ class RateLimiter:
         if not allowed:
             logger.warning(f"Rate limit exceeded for key: {key} (remaining: {remaining})")
         else:
-            logger.debug(f"Rate limit check passed for key: {key} (remaining: {remaining})")
+            logger.debug("Rate limit check passed for key: %s (remaining: %s)", key, remaining)
         
         return allowed, remaining, retry_after
     
@@ -148,5 +210,19 @@ class RateLimiter:
         return await bucket.get_remaining()
 
 
+def create_rate_limiter():
+    """
+    Create the rate limiter for the configured storage backend.
+    
+    Returns:
+        RedisRateLimiter when RATE_LIMIT_STORAGE=redis, otherwise the
+        in-memory RateLimiter
+    """
+    if settings.rate_limit_storage == "redis":
+        from app.utils.rate_limit_redis import RedisRateLimiter
+        return RedisRateLimiter(settings.redis_url)
+    return RateLimiter()
+
+
 # Global rate limiter instance
-rate_limiter = RateLimiter()
\ No newline at end of file
+rate_limiter = create_rate_limiter()
\ No newline at end of file
@@ -0,0 +1,160 @@
+"""
+Redis-backed token-bucket rate limiter.
+
+Provides rate limiting shared across worker processes and replicas using
+a Redis hash per key holding only the token level and last refill time.
+Each check runs as a single Lua script so refill, check and consume are
+atomic and cost one round-trip.
+
+Requires a single-node Redis (or a primary with replicas). The user and
+IP buckets of one request are updated by the same script, and their keys
+hash to different slots, so Redis Cluster rejects the call with CROSSSLOT.
+"""
+
+from typing import List, Optional, Sequence, Tuple, Union
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Key namespace as bytes so redis-py sends keys without re-encoding them
+_KEY_PREFIX = b"ratelimit:"
+
+
+# KEYS: rate limit keys
+# ARGV[1 + 3*(i-1) ...]: capacity, refill rate (tokens/second), tokens for KEYS[i]
+# Returns a flat array of {allowed, remaining, retry_after_ms} per key.
+# Time comes from the Redis server clock so every app replica refills
+# buckets against the same clock regardless of host clock skew.
+_TOKEN_BUCKET_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local results = {}
+for i, key in ipairs(KEYS) do
+    local base = 1 + (i - 1) * 3
+    local capacity = tonumber(ARGV[base])
+    local rate = tonumber(ARGV[base + 1])
+    local tokens = tonumber(ARGV[base + 2])
+
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local level = tonumber(state[1])
+    local ts = tonumber(state[2])
+    if level == nil or ts == nil then
+        level = capacity
+        ts = now
+    end
+
+    level = math.min(capacity, level + math.max(0, now - ts) * rate / 1000)
+    local allowed = 0
+    local retry_after = 0
+    if level >= tokens then
+        level = level - tokens
+        allowed = 1
+    else
+        retry_after = math.ceil((tokens - level) / rate * 1000)
+    end
+
+    redis.call('HSET', key, 'tokens', tostring(level), 'ts', now)
+    redis.call('PEXPIRE', key, math.ceil(capacity / rate * 1000))
+
+    table.insert(results, allowed)
+    table.insert(results, math.floor(level))
+    table.insert(results, retry_after)
+end
+return results
+"""
+
+
+class RedisRateLimiter:
+    """
+    Token-bucket rate limiter backed by Redis hashes.
+
+    Mirrors the RateLimiter interface so it can be swapped in via the
+    RATE_LIMIT_STORAGE setting, with the same burst capacity and refill
+    rate. Idle keys expire once their bucket would be full again.
+    """
+
+    def __init__(self, redis_url: str):
+        """
+        Initialize Redis rate limiter.
+
+        Args:
+            redis_url: Redis connection URL
+
+        Raises:
+            ImportError: If the redis package is not installed
+        """
+        try:
+            from redis import asyncio as redis_asyncio
+        except ImportError as e:
+            raise ImportError(
+                "RATE_LIMIT_STORAGE=redis requires the 'redis' package (pip install redis)"
+            ) from e
+
+        self.client = redis_asyncio.from_url(redis_url)
+        self.script = self.client.register_script(_TOKEN_BUCKET_SCRIPT)
+        self.capacity = settings.rate_limit_burst
+        self.refill_rate = settings.rate_limit_per_min / 60.0  # Convert per-minute to per-second
+
+        logger.info(f"Redis rate limiter initialized: capacity={self.capacity}, refill_rate={self.refill_rate:.2f}/s")
+
+    async def consume(self, key: str, tokens: int = 1, capacity_override: Optional[int] = None, refill_rate_override: Optional[float] = None) -> Tuple[bool, int, Optional[int]]:
+        """
+        Attempt to consume tokens for given key.
+
+        Args:
+            key: Rate limit key (e.g., "user:123" or "ip:1.2.3.4")
+            tokens: Number of tokens to consume
+            capacity_override: Override bucket capacity for this call
+            refill_rate_override: Override refill rate for this call
+
+        Returns:
+            Tuple of (allowed: bool, remaining_tokens: int, retry_after_seconds: Optional[int])
+        """
+        results = await self.consume_many([(key, capacity_override, refill_rate_override)], tokens=tokens)
+        return results[0]
+
+    async def consume_many(
+        self,
+        limits: Sequence[Tuple[str, Optional[int], Optional[float]]],
+        tokens: int = 1
+    ) -> List[Tuple[bool, int, Optional[int]]]:
+        """
+        Atomically consume tokens from several keys in one round-trip.
+
+        Args:
+            limits: Sequence of (key, capacity_override, refill_rate_override)
+            tokens: Number of tokens to consume for each key
+
+        Returns:
+            List of (allowed, remaining_tokens, retry_after_seconds), one per entry in limits
+        """
+        # Treat negative tokens as zero consumption
+        tokens = max(0, tokens)
+
+        keys: List[bytes] = []
+        args: List[Union[int, float]] = []
+        for key, capacity_override, refill_rate_override in limits:
+            keys.append(_KEY_PREFIX + key.encode())
+            args.extend([
+                capacity_override or self.capacity,
+                refill_rate_override or self.refill_rate,
+                tokens
+            ])
+
+        raw = await self.script(keys=keys, args=args)
+
+        results: List[Tuple[bool, int, Optional[int]]] = []
+        for index, (key, _, _) in enumerate(limits):
+            allowed = bool(int(raw[index * 3]))
+            remaining = max(0, int(raw[index * 3 + 1]))
+            retry_after = None
+            if not allowed:
+                retry_after = max(1, -(-int(raw[index * 3 + 2]) // 1000))
+                logger.warning(f"Rate limit exceeded for key: {key} (remaining: {remaining})")
+            else:
+                logger.debug("Rate limit check passed for key: %s (remaining: %s)", key, remaining)
+            results.append((allowed, remaining, retry_after))
+
+        return results
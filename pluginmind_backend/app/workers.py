@@ -0,0 +1,73 @@
+"""
+arq worker for async analysis jobs.
+
+Runs analysis jobs outside the API process when JOB_QUEUE_BACKEND=arq:
+
+    arq app.workers.WorkerSettings
+
+The worker initializes its own AI service registry, processes jobs
+enqueued by app.queue.enqueue_analysis and purges expired jobs every
+five minutes.
+"""
+
+from typing import Any, Dict
+
+from arq import cron
+from arq.connections import RedisSettings
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.logging import setup_logging, get_logger
+from app.services.service_initialization import initialize_ai_services, cleanup_ai_services
+from app.utils.background_tasks import delete_expired_jobs, process_analysis_background
+
+setup_logging()
+logger = get_logger(__name__)
+
+# Deliveries of one job before arq gives up on it, and headroom added to the
+# job timeout for database work around the AI calls
+JOB_MAX_TRIES = 3
+JOB_TIMEOUT_MARGIN_SECONDS = 60
+
+
+async def run_analysis_job(ctx: Dict[str, Any], job_id: str, user_input: str) -> None:
+    """Process one queued analysis job (registered as app.queue.ANALYSIS_TASK_NAME)."""
+    await process_analysis_background(job_id, user_input)
+
+
+async def cleanup_expired_jobs(ctx: Dict[str, Any]) -> None:
+    """Delete finished jobs older than JOB_CLEANUP_HOURS."""
+    await run_in_threadpool(delete_expired_jobs)
+
+
+async def startup(ctx: Dict[str, Any]) -> None:
+    """Register AI services before the worker accepts jobs."""
+    initialize_ai_services()
+    logger.info("Analysis worker started")
+
+
+async def shutdown(ctx: Dict[str, Any]) -> None:
+    """Release AI services and HTTP connections."""
+    cleanup_ai_services()
+
+    from app.utils.http import http_client
+    await http_client.close()
+    logger.info("Analysis worker stopped")
+
+
+class WorkerSettings:
+    """arq worker configuration."""
+
+    functions = [run_analysis_job]
+    cron_jobs = [cron(cleanup_expired_jobs, minute=set(range(0, 60, 5)))]
+    on_startup = startup
+    on_shutdown = shutdown
+    redis_settings = RedisSettings.from_dsn(settings.redis_url)
+    max_jobs = settings.max_background_jobs
+    # Jobs stay in Redis until they finish and are redelivered if a worker
+    # dies mid-job. The timeout must cover both AI calls with all retries,
+    # or slow jobs are cancelled and rerun; finished jobs are never rerun
+    job_timeout = (settings.http_timeout_seconds + settings.grok_timeout_seconds) * (
+        settings.http_max_retries + 1
+    ) + JOB_TIMEOUT_MARGIN_SECONDS
+    max_tries = JOB_MAX_TRIES
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+PluginMind Environment Baking Script
+
+Compiles a .env file into app/core/_env_baked.py at build/deploy time so
+workers import a plain dict (served from the .pyc cache) instead of
+parsing .env on every boot. Values already set in the process
+environment still take precedence at runtime.
+
+The generated module contains secrets: keep it out of version control
+(it is listed in .gitignore) and treat it like the .env it came from.
+"""
+
+import pprint
+from pathlib import Path
+import click
+from dotenv import dotenv_values
+
+app_dir = Path(__file__).resolve().parent.parent
+BAKED_MODULE = app_dir / "app" / "core" / "_env_baked.py"
+
+
+@click.command()
+@click.option('--env-file', '-e', default=str(app_dir / ".env"), show_default=True, help='Environment file to bake')
+@click.option('--output', '-o', default=str(BAKED_MODULE), show_default=True, help='Generated module path')
+def bake(env_file: str, output: str):
+    """Write the variables from ENV_FILE into a generated Python module."""
+    if not Path(env_file).exists():
+        raise click.ClickException(f"Environment file not found: {env_file}")
+    
+    # Variables without a value (bare "KEY" lines) are skipped, as load_dotenv does
+    env = {key: value for key, value in dotenv_values(env_file).items() if value is not None}
+    
+    Path(output).write_text(
+        '"""Generated by scripts/bake_env.py - do not edit or commit."""\n\n'
+        f"ENV = {pprint.pformat(env, width=100, sort_dicts=True)}\n"
+    )
+    click.echo(f"✅ Baked {len(env)} variables from {env_file} into {output}")
+
+
+if __name__ == '__main__':
+    bake()
@@ -330,6 +330,26 @@ class TestAnalysisServiceWithRegistry:
         with pytest.raises(ServiceUnavailableError):
             await analysis_service.perform_analysis("test input", "test_user")
 
+    @pytest.mark.asyncio
+    @patch('app.services.analysis_service.ai_service_registry')
+    async def test_missing_analyzer_skips_optimizer_call(self, mock_registry):
+        """Test that the optimizer is not called when no analyzer can take its output."""
+        from app.services.analysis_service import AnalysisService
+
+        mock_optimizer = MockAIService("Mock OpenAI", "OpenAI")
+        mock_registry.get_preferred_service.side_effect = lambda service_type: {
+            AIServiceType.PROMPT_OPTIMIZER: mock_optimizer
+        }.get(service_type)
+        mock_registry.get_services_by_capability.return_value = []
+
+        analysis_service = AnalysisService()
+        analysis_service.registry = mock_registry
+
+        with pytest.raises(ServiceUnavailableError):
+            await analysis_service.perform_analysis("test input", "test_user", use_fallback=False)
+
+        assert not mock_optimizer.process_called
+
 
 class TestServiceMonitoringEndpoints:
     """Test the new service monitoring endpoints."""
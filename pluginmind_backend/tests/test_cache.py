@@ -0,0 +1,152 @@
+"""
+Tests for the in-process TTL cache and verified-token memoization.
+
+Tests expiry, LRU eviction, and that repeated token verification
+and user lookups skip the Google signature check and the database.
+"""
+
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from app.utils.cache import TTLCache
+from app.middleware import auth
+from app.models.database import User
+from app.services import user_service as user_service_module
+from app.services.user_service import user_service
+
+
+def test_ttl_cache_get_set():
+    """Test basic set and get."""
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+    assert cache.get("missing") is None
+    assert cache.get("missing", "default") == "default"
+
+
+def test_ttl_cache_expiry():
+    """Test entries expire after their TTL."""
+    cache = TTLCache(maxsize=10, ttl=0.05)
+    cache.set("a", 1)
+
+    time.sleep(0.1)
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_ttl_cache_non_positive_ttl_not_stored():
+    """Test values with a non-positive lifetime are not cached."""
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1, ttl=0)
+    cache.set("b", 2, ttl=-5)
+
+    assert len(cache) == 0
+
+
+def test_ttl_cache_lru_eviction():
+    """Test least recently used entry is evicted when full."""
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "b" is now least recently used
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_verify_google_id_token_memoized():
+    """Test a verified token is served from cache on the second call."""
+    auth._token_cache.clear()
+    claims = {"email": "cached@example.com", "exp": time.time() + 3600}
+
+    with patch.object(auth, "verify_google_id_token_claims", return_value=claims) as mock_claims:
+        assert auth.verify_google_id_token("token-a") == "cached@example.com"
+        assert auth.verify_google_id_token("token-a") == "cached@example.com"
+        assert mock_claims.call_count == 1
+
+    auth._token_cache.clear()
+
+
+def test_verify_google_id_token_not_cached_past_expiry():
+    """Test tokens that are already expired are not cached."""
+    auth._token_cache.clear()
+    claims = {"email": "expired@example.com", "exp": time.time() - 1}
+
+    with patch.object(auth, "verify_google_id_token_claims", return_value=claims) as mock_claims:
+        auth.verify_google_id_token("token-b")
+        auth.verify_google_id_token("token-b")
+        assert mock_claims.call_count == 2
+
+    auth._token_cache.clear()
+
+
+def test_verify_google_id_token_cached_entry_rechecks_exp():
+    """Test a cached entry whose token has expired is re-verified."""
+    auth._token_cache.clear()
+    cache_key = auth.hashlib.sha256(b"token-c").digest()
+    auth._token_cache.set(cache_key, ("stale@example.com", time.time() - 1))
+    claims = {"email": "fresh@example.com", "exp": time.time() + 3600}
+
+    with patch.object(auth, "verify_google_id_token_claims", return_value=claims) as mock_claims:
+        assert auth.verify_google_id_token("token-c") == "fresh@example.com"
+        assert mock_claims.call_count == 1
+
+    auth._token_cache.clear()
+
+
+def test_verify_google_id_token_failure_not_cached():
+    """Test tokens failing verification are evicted and not cached."""
+    auth._token_cache.clear()
+
+    with patch.object(auth, "verify_google_id_token_claims", return_value={"exp": time.time() + 3600}):
+        with pytest.raises(auth.AuthenticationError):
+            auth.verify_google_id_token("token-d")
+
+    assert len(auth._token_cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_verify_google_id_token_async_cache_hit_inline():
+    """Test the async verifier answers cached tokens without the threadpool."""
+    auth._token_cache.clear()
+    cache_key = auth.hashlib.sha256(b"token-e").digest()
+    auth._token_cache.set(cache_key, ("cached@example.com", time.time() + 3600))
+
+    with patch.object(auth, "run_in_threadpool") as mock_threadpool:
+        assert await auth.verify_google_id_token_async("token-e") == "cached@example.com"
+        mock_threadpool.assert_not_called()
+
+    auth._token_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_verify_google_id_token_async_miss_uses_threadpool():
+    """Test the async verifier runs a cache-miss verification in the threadpool."""
+    auth._token_cache.clear()
+
+    with patch.object(auth, "run_in_threadpool", return_value="fresh@example.com") as mock_threadpool:
+        assert await auth.verify_google_id_token_async("token-f") == "fresh@example.com"
+        mock_threadpool.assert_awaited_once_with(auth.verify_google_id_token, "token-f")
+
+
+def test_get_or_create_user_served_from_cache():
+    """Test a recently seen user is merged into the session without a SELECT."""
+    user_service_module._user_cache.clear()
+    user_service._cache_user(User(id=7, email="cached@example.com", google_id="g-7", queries_used=3))
+    session = Mock()
+    session.merge.side_effect = lambda instance, load: instance
+
+    user = user_service.get_or_create_user(session, "g-7")
+
+    session.exec.assert_not_called()
+    assert session.merge.call_args.kwargs == {"load": False}
+    assert user.email == "cached@example.com"
+    assert user.queries_used == 3
+
+    user_service_module._user_cache.clear()
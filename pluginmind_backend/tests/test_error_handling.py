@@ -29,8 +29,15 @@ except ImportError:
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 from app.main import app
-from app.middleware.error_handler import EXCEPTION_MAP, EXCEPTION_MESSAGES, raise_api_error, setup_error_handlers
+from app.middleware.error_handler import (
+    EXCEPTION_MAP,
+    EXCEPTION_MESSAGES,
+    raise_api_error,
+    resolve_exception,
+    setup_error_handlers
+)
 from app.core.exceptions import (
+    PluginMindBaseException,
     AuthenticationError,
     UserAccessError,
     QueryLimitExceededError,
@@ -38,6 +45,8 @@ from app.core.exceptions import (
     ServiceUnavailableError,
     RateLimitError,
     AIServiceError,
+    AIAuthError,
+    AITimeoutError,
     InvalidInputError,
     JobNotFoundError,
     DatabaseError,
@@ -118,6 +127,17 @@ class TestExceptionMapping:
         
         assert str(exc_info.value) == "Test user not found"
 
+    def test_unmapped_subclass_uses_nearest_base(self):
+        """Test that unmapped subclasses resolve to their closest mapped base class."""
+        class ProviderQuotaError(AIServiceError):
+            pass
+
+        assert resolve_exception(ProviderQuotaError) == (
+            502, ErrorCodes.AI_SERVICE_ERROR, EXCEPTION_MESSAGES[AIServiceError]
+        )
+        assert resolve_exception(AITimeoutError)[0] == 504
+        assert resolve_exception(PluginMindBaseException) is None
+
 
 class TestErrorResponseFormat:
     """Test the error response format in actual API calls."""
@@ -378,7 +398,9 @@ class TestExceptionStatusCodes:
             (UserAccessError, 500),
             (DatabaseError, 500),
             (AIServiceError, 502),
-            (ServiceUnavailableError, 503)
+            (AIAuthError, 502),
+            (ServiceUnavailableError, 503),
+            (AITimeoutError, 504)
         ]
         
         for exc_type, expected_status in server_error_exceptions:
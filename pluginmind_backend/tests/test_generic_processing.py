@@ -176,7 +176,7 @@ class TestGenericProcessingEndpoint:
             assert "custom_output" in result
             assert "services_used" in data
     
-    @patch('app.services.analysis_service.analysis_service.perform_analysis_with_logging')
+    @patch('app.services.analysis_service.analysis_service.perform_analysis')
     def test_legacy_crypto_analysis_still_works(self, mock_analyze):
         """Test that legacy /analyze endpoint still works for crypto."""
         mock_analyze.return_value = (
@@ -202,6 +202,39 @@ class TestGenericProcessingEndpoint:
             result = json.loads(data["analysis"])
             assert "price_analysis" in result
     
+    @patch('app.services.analysis_service.analysis_service.perform_analysis')
+    def test_legacy_analysis_repeated_input_served_from_cache(self, mock_analyze):
+        """Test an identical /analyze input is answered without new AI calls."""
+        from app.api.routes import analysis as analysis_routes
+        analysis_routes._analysis_cache.clear()
+        mock_analyze.return_value = ("Optimized ETH prompt", '{"price_analysis": "Sideways"}')
+        
+        with patch('app.middleware.auth.verify_google_id_token_claims') as mock_verify, \
+             patch.object(analysis_routes, 'save_query_log') as mock_save_log:
+            mock_verify.return_value = {"email": "cache_user@example.com", "sub": "456"}
+            
+            responses = [
+                self.client.post(
+                    "/analyze",
+                    json={"user_input": "Analyze Ethereum cache check"},
+                    headers={"Authorization": "Bearer fake-token"}
+                )
+                for _ in range(2)
+            ]
+        
+        assert [response.status_code for response in responses] == [200, 200]
+        assert responses[0].json() == responses[1].json()
+        assert mock_analyze.call_count == 1
+        
+        # Both requests are recorded in the query log, the cached one included
+        assert mock_save_log.await_count == 2
+        cached_log = mock_save_log.await_args.args[0]
+        assert cached_log.user_input == "Analyze Ethereum cache check"
+        assert cached_log.ai_result == '{"price_analysis": "Sideways"}'
+        assert cached_log.success is True
+        
+        analysis_routes._analysis_cache.clear()
+    
     def test_process_without_auth(self):
         """Test that /process requires authentication."""
         response = self.client.post(
@@ -243,7 +276,23 @@ class TestGenericProcessingEndpoint:
             
             assert response.status_code == 422  # Validation error
             assert "error" in response.json()
-    
+
+    @patch('app.services.analysis_service.analysis_service.analyze_generic')
+    def test_process_rejects_input_without_words(self, mock_analyze):
+        """Test /process rejects symbol-only input before calling any AI service."""
+        with patch('app.middleware.auth.verify_google_id_token_claims') as mock_verify:
+            mock_verify.return_value = {"email": "test_user@example.com", "sub": "123"}
+
+            response = self.client.post(
+                "/process",
+                json={"user_input": "?? 123 !!", "analysis_type": "custom"},
+                headers={"Authorization": "Bearer fake-token"}
+            )
+
+            assert response.status_code == 422
+            assert response.json()["error"]["code"] == "INVALID_INPUT"
+            mock_analyze.assert_not_called()
+
     @patch('app.services.analysis_service.analysis_service.analyze_generic')
     def test_process_with_options(self, mock_analyze):
         """Test /process endpoint with custom options."""
@@ -274,4 +323,53 @@ class TestGenericProcessingEndpoint:
             # Verify basic response structure
             assert "optimized_prompt" in data
             assert "analysis_result" in data
-            assert "services_used" in data
\ No newline at end of file
+            assert "services_used" in data
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_analyses_share_one_call():
+    """Test identical /analyze inputs arriving together run the AI workflow once
+    but each request writes its own query log."""
+    import asyncio
+    from types import SimpleNamespace
+    from app.api.routes import analysis as analysis_routes
+    from app.models.schemas import AnalysisRequest
+    analysis_routes._analysis_cache.clear()
+    release = asyncio.Event()
+
+    async def slow_analysis(user_input, user_id):
+        await release.wait()
+        return "Optimized SOL prompt", '{"price_analysis": "Up"}'
+
+    reserved = []
+
+    def reserve(user_id):
+        reserved.append(user_id)
+        return SimpleNamespace(google_id=user_id, email=user_id, queries_used=1, queries_limit=10)
+
+    key = analysis_routes._analysis_cache_key("Analyze Solana")
+    with patch.object(
+        analysis_routes.analysis_service, "perform_analysis",
+        AsyncMock(side_effect=slow_analysis)
+    ) as mock_analyze, \
+         patch.object(analysis_routes, "_reserve_user_query", side_effect=reserve), \
+         patch.object(analysis_routes, "save_query_log") as mock_save_log:
+        pending = [
+            asyncio.create_task(
+                analysis_routes.analyze(AnalysisRequest(user_input="Analyze Solana"), user, None)
+            )
+            for user in ("user-a", "user-b", "user-c")
+        ]
+        while len(reserved) < 3:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05)
+        release.set()
+        responses = await asyncio.gather(*pending)
+
+    assert mock_analyze.await_count == 1
+    assert responses[0] == responses[1] == responses[2]
+    assert analysis_routes._analysis_inflight == {}
+    assert analysis_routes._analysis_cache.get(key) == responses[0]
+    logged_users = sorted(call.args[0].user_id for call in mock_save_log.await_args_list)
+    assert logged_users == ["user-a", "user-b", "user-c"]
+
+    analysis_routes._analysis_cache.clear()
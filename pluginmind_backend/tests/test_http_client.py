@@ -90,6 +90,19 @@ async def test_http_pool_limits_configuration():
         # Settings were loaded correctly, so limits should be applied
 
 
+@pytest.mark.asyncio
+async def test_http2_falls_back_without_h2():
+    """Test that the shared client still builds over HTTP/1.1 when h2 is missing."""
+    import app.utils.http
+
+    with patch.object(app.utils.http.settings, "http2_enabled", True), \
+         patch.object(app.utils.http, "_http2_available", return_value=False):
+        client = app.utils.http.HTTPClient()
+
+    assert isinstance(client.client, httpx.AsyncClient)
+    await client.close()
+
+
 @pytest.mark.asyncio
 async def test_grok_timeout_configuration():
     """Test that Grok granular timeouts are configurable."""
@@ -226,4 +239,88 @@ async def test_httpx_timeout_object_creation():
     assert granular_timeout.connect == settings.grok_connect_timeout
     assert granular_timeout.read == settings.grok_timeout_seconds
     assert granular_timeout.write == settings.grok_write_timeout
-    assert granular_timeout.pool == settings.grok_pool_timeout
\ No newline at end of file
+    assert granular_timeout.pool == settings.grok_pool_timeout
+
+
+@pytest.mark.asyncio
+async def test_upstream_failures_raise_typed_errors():
+    """Test that auth and timeout failures surface as dedicated exception types."""
+    import app.utils.http
+    from app.core.exceptions import AIAuthError, AITimeoutError
+
+    def reject(request):
+        return httpx.Response(401, text="invalid api key")
+
+    def time_out(request):
+        raise httpx.ReadTimeout("timed out", request=request)
+
+    client = app.utils.http.HTTPClient()
+    with patch.object(app.utils.http.settings, "http_max_retries", 0):
+        client.client = httpx.AsyncClient(transport=httpx.MockTransport(reject))
+        with pytest.raises(AIAuthError):
+            await client.request_with_retries("POST", "https://api.example.com/v1")
+        await client.close()
+
+        client.client = httpx.AsyncClient(transport=httpx.MockTransport(time_out))
+        with pytest.raises(AITimeoutError):
+            await client.request_with_retries("POST", "https://api.example.com/v1")
+        await client.close()
+
+
+@pytest.mark.asyncio
+async def test_services_propagate_typed_upstream_errors():
+    """Test OpenAI and Grok surface auth, timeout and rate limit errors unchanged."""
+    import app.utils.http
+    from app.core.exceptions import AIAuthError, AITimeoutError, RateLimitError
+    from app.services import openai_service, grok_service
+
+    def reject(request):
+        return httpx.Response(401, text="invalid api key")
+
+    def time_out(request):
+        raise httpx.ReadTimeout("timed out", request=request)
+
+    def throttle(request):
+        return httpx.Response(429, text="slow down")
+
+    client = app.utils.http.HTTPClient()
+    with patch.object(app.utils.http.settings, "http_max_retries", 0):
+        for module, service_class in (
+            (openai_service, openai_service.OpenAIService),
+            (grok_service, grok_service.GrokService),
+        ):
+            with patch.object(module, "http_client", client):
+                service = service_class()
+                for handler, error in ((reject, AIAuthError), (time_out, AITimeoutError), (throttle, RateLimitError)):
+                    client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+                    with pytest.raises(error):
+                        await service.process("What is the outlook for BTC?")
+                    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_warm_up_connects_once_per_origin():
+    """Test warm-up sends one HEAD per provider origin and tolerates failures."""
+    import app.utils.http
+
+    seen = []
+
+    def handler(request):
+        seen.append((request.method, str(request.url)))
+        if request.url.host == "down.example.com":
+            raise httpx.ConnectError("refused", request=request)
+        return httpx.Response(404)
+
+    client = app.utils.http.HTTPClient()
+    client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    await client.warm_up((
+        "https://api.example.com/v1/chat/completions",
+        "https://api.example.com/v1/models",
+        "https://down.example.com/v1/chat/completions",
+    ))
+    await client.close()
+
+    assert sorted(seen) == [
+        ("HEAD", "https://api.example.com/"),
+        ("HEAD", "https://down.example.com/"),
+    ]
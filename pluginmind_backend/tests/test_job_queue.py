@@ -0,0 +1,236 @@
+"""
+Tests for async analysis job dispatch.
+
+Tests that enqueue_analysis routes jobs to the in-process workers or
+the arq pool depending on JOB_QUEUE_BACKEND, the job housekeeping
+helpers used by /health and polling, and the job status stream.
+"""
+
+import asyncio
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app import queue
+from app.api.routes import analysis as analysis_routes
+from app.core.config import settings
+from app.core.exceptions import ServiceUnavailableError
+from app.models.database import AnalysisJob
+from app.models.enums import JobStatus
+from app.utils import background_tasks
+
+
+@pytest.mark.asyncio
+async def test_enqueue_analysis_local_backend():
+    """Test the local backend schedules an in-process task."""
+    with patch.object(settings, "job_queue_backend", "local"), \
+         patch.object(queue, "schedule_analysis_job") as mock_schedule:
+        await queue.enqueue_analysis("job-1", "analyze BTC")
+
+    mock_schedule.assert_awaited_once_with("job-1", "analyze BTC")
+
+
+@pytest.mark.asyncio
+async def test_enqueue_analysis_arq_backend():
+    """Test the arq backend enqueues by task name with the job ID for deduplication."""
+    pool = AsyncMock()
+
+    with patch.object(settings, "job_queue_backend", "arq"), \
+         patch.object(queue, "_get_arq_pool", AsyncMock(return_value=pool)), \
+         patch.object(queue, "schedule_analysis_job") as mock_schedule:
+        await queue.enqueue_analysis("job-2", "analyze ETH")
+
+    pool.enqueue_job.assert_awaited_once_with(
+        queue.ANALYSIS_TASK_NAME, "job-2", "analyze ETH", _job_id="job-2"
+    )
+    mock_schedule.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_count_active_jobs_cached():
+    """Test the active job count is reused within its TTL."""
+    background_tasks._active_jobs_cache.clear()
+
+    with patch.object(background_tasks, "count_active_jobs", return_value=3) as mock_count:
+        assert await background_tasks.count_active_jobs_cached() == 3
+        assert await background_tasks.count_active_jobs_cached() == 3
+        assert mock_count.call_count == 1
+
+    background_tasks._active_jobs_cache.clear()
+
+
+def test_cache_job_result_short_ttl_for_active_jobs():
+    """Test in-flight jobs use the short TTL and finished jobs the default one."""
+    background_tasks.job_result_cache.clear()
+    queued = AnalysisJob(job_id="job-q", user_input="x", status=JobStatus.QUEUED, created_at=datetime.now(timezone.utc))
+    done = AnalysisJob(job_id="job-d", user_input="x", status=JobStatus.COMPLETED, created_at=datetime.now(timezone.utc))
+
+    with patch.object(background_tasks, "_ACTIVE_JOB_RESULT_TTL_SECONDS", 0):
+        assert background_tasks.cache_job_result(queued).status == "queued"
+        assert background_tasks.cache_job_result(done).status == "completed"
+
+    assert background_tasks.job_result_cache.get("job-q") is None
+    assert background_tasks.job_result_cache.get("job-d") is not None
+
+    background_tasks.job_result_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_job_status_stream_wakes_on_update():
+    """Test the SSE stream emits each status change and ends on completion."""
+    queued = background_tasks.cache_job_result(
+        AnalysisJob(job_id="job-s", user_input="x", status=JobStatus.QUEUED, created_at=datetime.now(timezone.utc))
+    )
+    done = background_tasks.cache_job_result(
+        AnalysisJob(job_id="job-s", user_input="x", status=JobStatus.COMPLETED, created_at=datetime.now(timezone.utc))
+    )
+
+    async def finish_job():
+        await asyncio.sleep(0.05)
+        background_tasks._notify_job_update("job-s")
+
+    with patch.object(analysis_routes, "_load_job_result", return_value=done), \
+         patch.object(analysis_routes, "_STREAM_RECHECK_SECONDS", 30):
+        notifier = asyncio.create_task(finish_job())
+        frames = [frame async for frame in analysis_routes._job_status_events("job-s", queued)]
+        await notifier
+
+    assert len(frames) == 2
+    assert '"status":"queued"' in frames[0]
+    assert '"status":"completed"' in frames[1]
+    assert "job-s" not in background_tasks._job_update_events
+
+    background_tasks.job_result_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_schedule_analysis_job_rejects_when_queue_full():
+    """Test workers drain the local queue and a full queue rejects new jobs."""
+    release = asyncio.Event()
+    started = []
+
+    async def slow_job(job_id, user_input):
+        started.append(job_id)
+        await release.wait()
+
+    with patch.object(settings, "max_background_jobs", 1), \
+         patch.object(settings, "job_queue_max_size", 1), \
+         patch.object(background_tasks, "process_analysis_background", slow_job), \
+         patch.object(background_tasks, "fail_job") as mock_fail:
+        await background_tasks.schedule_analysis_job("job-1", "x")
+        await asyncio.sleep(0)
+        await background_tasks.schedule_analysis_job("job-2", "x")
+
+        with pytest.raises(ServiceUnavailableError):
+            await background_tasks.schedule_analysis_job("job-3", "x")
+        mock_fail.assert_awaited_once()
+        assert mock_fail.call_args.args[0] == "job-3"
+
+        release.set()
+        await background_tasks._job_queue.join()
+        await background_tasks.stop_job_workers()
+
+    assert started == ["job-1", "job-2"]
+
+
+def test_jobs_page_cached_until_job_update():
+    """Test /jobs pages are served from cache until a job changes in this process."""
+    from types import SimpleNamespace
+    from unittest.mock import MagicMock
+    from app.api.routes import jobs as jobs_routes
+
+    background_tasks.jobs_page_cache.clear()
+    row = SimpleNamespace(
+        job_id="job-p", status=JobStatus.COMPLETED, created_at=datetime(2025, 1, 1),
+        completed_at=None, user_id="u1", has_error=0
+    )
+    session = MagicMock()
+    session.exec.return_value.all.return_value = [row]
+    session.exec.return_value.one.return_value = 1
+
+    first = jobs_routes.list_jobs(session, limit=10, offset=0)
+    second = jobs_routes.list_jobs(session, limit=10, offset=0)
+    assert first.body == second.body
+    assert b'"job-p":{"status":"completed"' in first.body
+    assert session.exec.call_count == 2
+
+    background_tasks._notify_job_update("job-p")
+    jobs_routes.list_jobs(session, limit=10, offset=0)
+    assert session.exec.call_count == 4
+
+    background_tasks.jobs_page_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_process_analysis_background_completes_job():
+    """Test a local job is processed for its owner and its result cached as completed."""
+    job = background_tasks.create_analysis_job("analyze SOL", user_id="owner-1")
+
+    with patch.object(
+        background_tasks.analysis_service, "perform_analysis",
+        AsyncMock(return_value=("Optimized SOL prompt", "SOL analysis"))
+    ) as mock_analysis:
+        await background_tasks.process_analysis_background(job.job_id, "analyze SOL")
+
+    mock_analysis.assert_awaited_once_with("analyze SOL", "owner-1")
+    result = background_tasks.job_result_cache.get(job.job_id)
+    assert result.status == "completed"
+    assert result.analysis == "SOL analysis"
+
+    background_tasks.job_result_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_process_analysis_background_skips_finished_job():
+    """Test a redelivered job that already finished is not analyzed again."""
+    job = background_tasks.create_analysis_job("analyze ADA", user_id="owner-2")
+    await background_tasks.fail_job(job.job_id, "Request timeout. Please try again.")
+
+    with patch.object(background_tasks.analysis_service, "perform_analysis", AsyncMock()) as mock_analysis:
+        await background_tasks.process_analysis_background(job.job_id, "analyze ADA")
+
+    mock_analysis.assert_not_called()
+
+    background_tasks.job_result_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_stop_job_workers_fails_jobs_left_after_drain():
+    """Test shutdown fails the running and queued jobs the drain timeout leaves behind."""
+    started = asyncio.Event()
+
+    async def stuck_job(job_id, user_input):
+        started.set()
+        await asyncio.Event().wait()
+
+    with patch.object(settings, "max_background_jobs", 1), \
+         patch.object(background_tasks, "process_analysis_background", stuck_job), \
+         patch.object(background_tasks, "_fail_unfinished_jobs", return_value=2) as mock_fail:
+        await background_tasks.schedule_analysis_job("job-run", "x")
+        await background_tasks.schedule_analysis_job("job-wait", "x")
+        await started.wait()
+
+        await background_tasks.stop_job_workers(drain_timeout=0.01)
+
+    mock_fail.assert_called_once_with(["job-run", "job-wait"], "Server shutting down")
+    assert background_tasks._running_job_ids == set()
+    assert background_tasks._job_workers == []
+
+
+@pytest.mark.asyncio
+async def test_start_async_analysis_fails_job_when_enqueue_fails():
+    """Test a job whose enqueue fails is marked failed instead of staying queued."""
+    from types import SimpleNamespace
+    from app.core.exceptions import AIServiceError
+    from app.models.schemas import AnalysisRequest
+
+    job = SimpleNamespace(job_id="job-e", created_at=datetime.now(timezone.utc))
+    with patch.object(analysis_routes, "create_analysis_job", return_value=job), \
+         patch.object(analysis_routes, "enqueue_analysis", AsyncMock(side_effect=ConnectionError("redis down"))), \
+         patch.object(analysis_routes, "fail_job") as mock_fail:
+        with pytest.raises(AIServiceError):
+            await analysis_routes.start_async_analysis(AnalysisRequest(user_input="analyze XRP"), None)
+
+    mock_fail.assert_awaited_once()
+    assert mock_fail.call_args.args[0] == "job-e"
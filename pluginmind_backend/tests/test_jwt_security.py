@@ -163,13 +163,13 @@ def test_dynamic_issuer_discovery():
         'token_endpoint': 'https://oauth2.googleapis.com/token'
     }
     
-    with patch('app.middleware.auth.http_requests.get') as mock_get:
+    with patch('app.middleware.auth._google_session.get') as mock_get:
         mock_response = MagicMock()
         mock_response.json.return_value = mock_discovery_response
         mock_get.return_value = mock_response
         
         # Mock Google's token verification to return valid claims  
-        with patch('app.middleware.auth.id_token.verify_oauth2_token') as mock_verify:
+        with patch('app.middleware.auth.google_jwt.decode') as mock_verify:
             mock_verify.return_value = {
                 'iss': 'https://accounts.google.com',  # Matches discovered issuer
                 'aud': 'test-client-id.apps.googleusercontent.com',  # Must match GOOGLE_CLIENT_ID
@@ -187,12 +187,12 @@ def test_dynamic_issuer_discovery():
     # Test 2: Discovery failure with fallback
     print("\nTest 2: Discovery failure with fallback")
     
-    with patch('app.middleware.auth.http_requests.get') as mock_get:
+    with patch('app.middleware.auth._google_session.get') as mock_get:
         # Simulate network error
         mock_get.side_effect = Exception("Network error")
         
         # Mock Google's token verification
-        with patch('app.middleware.auth.id_token.verify_oauth2_token') as mock_verify:
+        with patch('app.middleware.auth.google_jwt.decode') as mock_verify:
             mock_verify.return_value = {
                 'iss': 'https://accounts.google.com',  # Should match fallback
                 'aud': 'test-client-id.apps.googleusercontent.com',  # Must match GOOGLE_CLIENT_ID
@@ -316,6 +316,30 @@ def test_attack_vector_prevention():
     # Test passes if all attack tests passed
     assert all([attack_test_1, attack_test_2, attack_test_3]), "Some attack prevention tests failed"
 
+def test_google_certs_cached_until_max_age_or_unknown_kid():
+    """Test Google's signing certs are reused, refreshed for new key IDs only after the minimum interval."""
+    import app.middleware.auth as auth
+
+    auth._google_certs = ({}, 0.0, 0.0)
+    response = MagicMock(headers={"cache-control": "public, max-age=21600"})
+    response.json.return_value = {"key-1": "PEM-1"}
+    with patch.object(auth._google_session, "get", return_value=response) as mock_get:
+        for _ in range(3):
+            assert auth.get_google_certs("key-1") == {"key-1": "PEM-1"}
+        assert mock_get.call_count == 1
+
+        # An unknown key ID refetches only once the minimum interval has passed
+        auth.get_google_certs("key-2")
+        assert mock_get.call_count == 1
+        certs, expires_at, fetched_at = auth._google_certs
+        auth._google_certs = (certs, expires_at, fetched_at - auth._CERTS_MIN_REFRESH_SECONDS)
+        auth.get_google_certs("key-2")
+        assert mock_get.call_count == 2
+
+    assert auth._token_key_id("eyJhbGciOiJSUzI1NiIsImtpZCI6ImtleS0xIn0.e30.sig") == "key-1"
+    assert auth._token_key_id("not-a-jwt") is None
+    auth._google_certs = ({}, 0.0, 0.0)
+
 def main():
     """Run all JWT security tests."""
     print("JWT Authentication Security Test Suite")
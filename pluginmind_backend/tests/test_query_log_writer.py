@@ -0,0 +1,59 @@
+"""
+Tests for batched background query log persistence.
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from app.models.database import QueryLog
+from app.utils import query_log_writer
+
+
+@pytest.mark.asyncio
+async def test_query_logs_written_in_one_batch_on_stop():
+    """Test queued logs are inserted together and flushed before the writer stops."""
+    batches = []
+    logs = [QueryLog(user_id="u1", user_input=f"query {i}") for i in range(3)]
+
+    with patch.object(query_log_writer, "_write_query_logs", side_effect=batches.append):
+        query_log_writer.start_query_log_writer()
+        for log in logs:
+            await query_log_writer.save_query_log(log)
+        assert batches == []
+
+        await query_log_writer.stop_query_log_writer()
+
+    assert batches == [logs]
+
+
+@pytest.mark.asyncio
+async def test_query_log_written_directly_without_writer():
+    """Test logs are written immediately when no writer runs on this loop."""
+    batches = []
+    log = QueryLog(user_id="u1", user_input="query")
+
+    with patch.object(query_log_writer, "_write_query_logs", side_effect=batches.append):
+        await query_log_writer.save_query_log(log)
+
+    assert batches == [[log]]
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_retried_row_by_row():
+    """Test a failing batch is retried per row and only the bad row is dropped."""
+    written = []
+    logs = [QueryLog(user_id="u1", user_input=f"query {i}") for i in range(3)]
+
+    def write(records):
+        if logs[1] in records:
+            raise ValueError("bad row")
+        written.extend(records)
+
+    with patch.object(query_log_writer, "_write_query_logs", side_effect=write):
+        query_log_writer.start_query_log_writer()
+        for log in logs:
+            await query_log_writer.save_query_log(log)
+        await query_log_writer.stop_query_log_writer()
+
+    assert written == [logs[0], logs[2]]
@@ -11,8 +11,9 @@ import pytest
 from unittest.mock import Mock, patch
 from fastapi import Request, Response, HTTPException
 from fastapi.security import HTTPAuthorizationCredentials
+from starlette.datastructures import State
 
-from app.utils.rate_limit import TokenBucket, RateLimiter
+from app.utils.rate_limit import TokenBucket, RateLimiter, create_rate_limiter
 from app.utils.ip import extract_client_ip, _validate_ip
 from app.api.dependencies_rate_limit import rate_limiter_dependency, get_rate_limit_key
 from app.core.config import settings
@@ -135,6 +136,104 @@ class TestRateLimiter:
         assert retry_after is not None
         assert retry_after >= 1
 
+    @pytest.mark.asyncio
+    async def test_rate_limiter_consume_many(self):
+        """Test atomic multi-key consumption with per-key overrides."""
+        limiter = RateLimiter()
+
+        results = await limiter.consume_many(
+            [("user:many", None, None), ("ip:10.0.0.1", 50, 1.0)],
+            tokens=1
+        )
+
+        (user_allowed, user_remaining, _), (ip_allowed, ip_remaining, _) = results
+        assert user_allowed is True
+        assert ip_allowed is True
+        assert user_remaining == settings.rate_limit_burst - 1
+        assert ip_remaining == 49
+
+    @pytest.mark.asyncio
+    async def test_rate_limiter_consume_many_concurrent(self):
+        """Test concurrent multi-key consumption never oversubscribes a bucket."""
+        limiter = RateLimiter()
+
+        results = await asyncio.gather(*[
+            limiter.consume_many([("user:a", 5, 0.001), ("ip:shared", 5, 0.001)])
+            for _ in range(10)
+        ])
+
+        ip_allowed = [ip[0] for _, ip in results]
+        assert sum(ip_allowed) == 5
+
+    def test_create_rate_limiter_defaults_to_memory(self):
+        """Test in-memory limiter is used unless Redis storage is configured."""
+        with patch.object(settings, "rate_limit_storage", "memory"):
+            assert isinstance(create_rate_limiter(), RateLimiter)
+
+
+class TestRedisRateLimiter:
+    """Test the Redis token bucket by running its Lua script on fakeredis."""
+    
+    @pytest.fixture
+    def limiter(self):
+        """Redis limiter backed by a fresh in-process fakeredis server."""
+        fakeredis = pytest.importorskip("fakeredis")
+        pytest.importorskip("lupa")
+        from app.utils.rate_limit_redis import RedisRateLimiter
+        
+        client = fakeredis.FakeAsyncRedis(server=fakeredis.FakeServer())
+        with patch("redis.asyncio.from_url", return_value=client):
+            return RedisRateLimiter("redis://localhost:6379/0")
+    
+    @pytest.mark.asyncio
+    async def test_redis_burst_then_deny_with_retry_after(self, limiter):
+        """Test a bucket allows its burst, then denies with a retry-after."""
+        for expected_remaining in (2, 1, 0):
+            allowed, remaining, retry_after = await limiter.consume("user:burst", 1, 3, 0.5)
+            assert allowed is True
+            assert remaining == expected_remaining
+            assert retry_after is None
+        
+        allowed, remaining, retry_after = await limiter.consume("user:burst", 1, 3, 0.5)
+        assert allowed is False
+        assert remaining == 0
+        assert retry_after == 2  # one token at 0.5 tokens/second
+    
+    @pytest.mark.asyncio
+    async def test_redis_refills_against_server_clock(self, limiter):
+        """Test tokens refill from the last refill time stored in Redis."""
+        await limiter.consume("user:refill", 3, 3, 1.0)
+        allowed, _, _ = await limiter.consume("user:refill", 1, 3, 1.0)
+        assert allowed is False
+        
+        # Move the stored refill time two seconds into the past
+        key = b"ratelimit:user:refill"
+        ts = int(await limiter.client.hget(key, "ts"))
+        await limiter.client.hset(key, "ts", ts - 2000)
+        
+        allowed, remaining, retry_after = await limiter.consume("user:refill", 1, 3, 1.0)
+        assert allowed is True
+        assert remaining == 1
+        assert retry_after is None
+    
+    @pytest.mark.asyncio
+    async def test_redis_consume_many_user_and_ip(self, limiter):
+        """Test the user and IP buckets are checked in one call with their own limits."""
+        limits = [("user:dual", 2, 0.01), ("ip:10.0.0.1", 5, 0.01)]
+        
+        results = await limiter.consume_many(limits)
+        assert results == [(True, 1, None), (True, 4, None)]
+        await limiter.consume_many(limits)
+        
+        (user_allowed, _, user_retry), (ip_allowed, ip_remaining, ip_retry) = (
+            await limiter.consume_many(limits)
+        )
+        assert user_allowed is False
+        assert user_retry == 100
+        assert ip_allowed is True
+        assert ip_remaining == 2
+        assert ip_retry is None
+
 
 class TestIPExtraction:
     """Test IP address extraction utilities."""
@@ -162,6 +261,7 @@ class TestIPExtraction:
     def test_extract_client_ip_direct(self):
         """Test IP extraction from direct client."""
         request = Mock(spec=Request)
+        request.state = State()
         request.client = Mock()
         request.client.host = "192.168.1.1"
         request.headers = {}
@@ -172,6 +272,7 @@ class TestIPExtraction:
     def test_extract_client_ip_x_forwarded_for(self):
         """Test IP extraction from X-Forwarded-For header."""
         request = Mock(spec=Request)
+        request.state = State()
         request.client = None
         request.headers = {"x-forwarded-for": "203.0.113.1, 198.51.100.1"}
         
@@ -181,6 +282,7 @@ class TestIPExtraction:
     def test_extract_client_ip_x_real_ip(self):
         """Test IP extraction from X-Real-IP header."""
         request = Mock(spec=Request)
+        request.state = State()
         request.client = None
         request.headers = {"x-real-ip": "203.0.113.2"}
         
@@ -190,6 +292,7 @@ class TestIPExtraction:
     def test_extract_client_ip_fallback(self):
         """Test fallback to 'unknown' when no valid IP found."""
         request = Mock(spec=Request)
+        request.state = State()
         request.client = None
         request.headers = {}
         
@@ -210,6 +313,7 @@ class TestRateLimitDependency:
         request.method = "GET"
         request.url = Mock()
         request.url.path = "/test"
+        request.state = State()
         
         response = Mock(spec=Response)
         response.headers = {}
@@ -231,6 +335,7 @@ class TestRateLimitDependency:
         request.method = "GET"
         request.url = Mock()
         request.url.path = "/test"
+        request.state = State()
         
         response = Mock(spec=Response)
         response.headers = {}
@@ -239,7 +344,7 @@ class TestRateLimitDependency:
         credentials.credentials = "valid.jwt.token"
         
         # Mock JWT verification to return user ID
-        with patch('app.api.dependencies_rate_limit.verify_google_id_token') as mock_verify:
+        with patch('app.api.dependencies_rate_limit.verify_google_id_token_async') as mock_verify:
             mock_verify.return_value = "user123"
             
             # Should pass with dual enforcement
@@ -249,6 +354,26 @@ class TestRateLimitDependency:
             assert "X-RateLimit-Limit" in response.headers
             assert "X-RateLimit-Remaining" in response.headers
     
+    @pytest.mark.asyncio
+    async def test_reuses_verified_user_from_request_state(self):
+        """Test that an identity verified earlier in the request is not re-verified."""
+        request = Mock(spec=Request)
+        request.client = Mock()
+        request.client.host = "192.168.1.1"
+        request.headers = {}
+        request.state = State()
+        request.state.verified_user_id = "user123"
+        
+        response = Mock(spec=Response)
+        response.headers = {}
+        
+        credentials = Mock(spec=HTTPAuthorizationCredentials)
+        credentials.credentials = "valid.jwt.token"
+        
+        with patch('app.api.dependencies_rate_limit.verify_google_id_token_async') as mock_verify:
+            await rate_limiter_dependency(request, response, credentials)
+            mock_verify.assert_not_called()
+    
     @pytest.mark.asyncio
     async def test_rate_limit_exceeded_response(self):
         """Test 429 response when rate limit exceeded."""
@@ -259,6 +384,7 @@ class TestRateLimitDependency:
         request.method = "GET"
         request.url = Mock()
         request.url.path = "/test"
+        request.state = State()
         
         response = Mock(spec=Response)
         response.headers = {}
@@ -278,9 +404,11 @@ class TestRateLimitDependency:
             assert exc_info.value.detail == "Too many requests"
             assert "Retry-After" in response.headers
     
-    def test_get_rate_limit_key_authenticated(self):
+    @pytest.mark.asyncio
+    async def test_get_rate_limit_key_authenticated(self):
         """Test rate limit key generation for authenticated users."""
         request = Mock(spec=Request)
+        request.state = State()
         request.client = Mock()
         request.client.host = "192.168.1.1"
         request.headers = {}
@@ -288,25 +416,48 @@ class TestRateLimitDependency:
         credentials = Mock(spec=HTTPAuthorizationCredentials)
         credentials.credentials = "valid.jwt.token"
         
-        with patch('app.api.dependencies_rate_limit.verify_google_id_token') as mock_verify:
+        with patch('app.api.dependencies_rate_limit.verify_google_id_token_async') as mock_verify:
             mock_verify.return_value = "user123"
             
-            key = get_rate_limit_key(request, credentials)
+            key = await get_rate_limit_key(request, credentials)
             assert key == "user:user123"
     
-    def test_get_rate_limit_key_unauthenticated(self):
+    @pytest.mark.asyncio
+    async def test_get_rate_limit_key_unauthenticated(self):
         """Test rate limit key generation for unauthenticated users."""
         request = Mock(spec=Request)
+        request.state = State()
         request.client = Mock()
         request.client.host = "192.168.1.1"
         request.headers = {}
         
-        key = get_rate_limit_key(request, credentials=None)
+        key = await get_rate_limit_key(request, credentials=None)
         assert key == "ip:192.168.1.1"
     
-    def test_get_rate_limit_key_invalid_token(self):
+    @pytest.mark.asyncio
+    async def test_get_rate_limit_key_memoized_on_request_state(self):
+        """Test the rate limit key is computed once per request."""
+        request = Mock(spec=Request)
+        request.state = State()
+        request.client = Mock()
+        request.client.host = "192.168.1.1"
+        request.headers = {}
+        
+        credentials = Mock(spec=HTTPAuthorizationCredentials)
+        credentials.credentials = "valid.jwt.token"
+        
+        with patch('app.api.dependencies_rate_limit.verify_google_id_token_async') as mock_verify:
+            mock_verify.return_value = "user123"
+            
+            assert await get_rate_limit_key(request, credentials) == "user:user123"
+            assert await get_rate_limit_key(request, credentials) == "user:user123"
+            assert mock_verify.call_count == 1
+    
+    @pytest.mark.asyncio
+    async def test_get_rate_limit_key_invalid_token(self):
         """Test rate limit key generation with invalid token."""
         request = Mock(spec=Request)
+        request.state = State()
         request.client = Mock()
         request.client.host = "192.168.1.1"
         request.headers = {}
@@ -314,11 +465,11 @@ class TestRateLimitDependency:
         credentials = Mock(spec=HTTPAuthorizationCredentials)
         credentials.credentials = "invalid.jwt.token"
         
-        with patch('app.api.dependencies_rate_limit.verify_google_id_token') as mock_verify:
+        with patch('app.api.dependencies_rate_limit.verify_google_id_token_async') as mock_verify:
             from app.core.exceptions import AuthenticationError
             mock_verify.side_effect = AuthenticationError("Invalid token")
             
-            key = get_rate_limit_key(request, credentials)
+            key = await get_rate_limit_key(request, credentials)
             assert key == "ip:192.168.1.1"
 
 
@@ -367,6 +518,7 @@ class TestEdgeCases:
     def test_malformed_headers(self):
         """Test handling of malformed headers."""
         request = Mock(spec=Request)
+        request.state = State()
         request.client = None
         request.headers = {
             "x-forwarded-for": "invalid,ip,addresses",
@@ -379,6 +531,7 @@ class TestEdgeCases:
     def test_empty_headers(self):
         """Test handling of empty headers."""
         request = Mock(spec=Request)
+        request.state = State()
         request.client = None
         request.headers = {
             "x-forwarded-for": "",